@@ -27,6 +27,14 @@ def create_app(config_name='default'):
     CORS(app)
     socketio.init_app(app, cors_allowed_origins="*")
     
+    # 初始化日志订阅中心
+    from app.utils.log_hub import log_hub
+    log_hub.init_app(app, socketio)
+    
+    # 客户列表总数缓存
+    from app.models.customer import customer_counts
+    customer_counts.ttl = app.config['CUSTOMER_COUNT_CACHE_TTL']
+    
     # 注册蓝图
     from app.api import user_bp, dept_bp, emp_bp, bonus_bp, salgrade_bp, log_bp, customer_bp
     app.register_blueprint(user_bp)
@@ -37,6 +45,10 @@ def create_app(config_name='default'):
     app.register_blueprint(log_bp)
     app.register_blueprint(customer_bp)
     
+    # 注册命令行命令
+    from app.commands import customer_cli
+    app.cli.add_command(customer_cli)
+    
     # 注册页面路由
     from app.routes import routes_bp
     app.register_blueprint(routes_bp)
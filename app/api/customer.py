@@ -1,60 +1,94 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from app.models import Customer
+from app.services.customer_import import CustomerImporter, ImportFormatError, READERS, DECIMAL_FIELDS, INTEGER_FIELDS
 from app import db
 from datetime import datetime
+import csv
+import math
+import io
+import json
+from app.utils import encode_cursor, decode_cursor
 from sqlalchemy.exc import SQLAlchemyError, DatabaseError, OperationalError, IntegrityError
 
 customer_bp = Blueprint('customer', __name__, url_prefix='/api/customer')
 
+# 游标分页单页最大行数
+MAX_CURSOR_PAGE_SIZE = 1000
+# 列表总数的统计方式
+COUNT_MODES = ('exact', 'estimate', 'none')
+# 导入请求体的 Content-Type 对应的格式
+IMPORT_MIMETYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+# 流式导出的格式，按 Accept 选择，其余情况返回 JSON
+EXPORT_MIMETYPES = {
+    'application/x-ndjson': 'ndjson',
+    'text/csv': 'csv',
+}
+# 批量修改可以设置的列，company_name 唯一，不能批量设置
+BULK_UPDATE_FIELDS = ('contact_name', 'contact_title', 'phone', 'email', 'address', 'city', 'country',
+                      'credit_limit', 'credit_rating', 'status', 'industry', 'annual_revenue', 'employee_count')
+
 @customer_bp.route('/', methods=['GET'])
 def get_all_customers():
-    """All customers"""
+    """
+    All customers
+
+    Offset mode (?page=&per_page=) returns page numbers and a total.
+    Cursor mode (?after=<next_cursor>, or ?sort= without page) uses keyset
+    predicates instead of OFFSET and returns next_cursor; every page costs
+    the same as the first one.
+
+    ?count=exact|estimate|none chooses how the total is computed. Exact
+    totals are cached per filter set until customers change, so paging
+    through the same filters runs only the page query. Offset mode
+    defaults to exact, cursor mode to none.
+    """
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
-        status = request.args.get('status')
-        credit_rating = request.args.get('credit_rating')
-        city = request.args.get('city')
-        industry = request.args.get('industry')
-        search = request.args.get('search')
-        
-        query = Customer.query
-        
-        # 添加过滤条件
-        if status:
-            query = query.filter_by(status=status)
-        if credit_rating:
-            query = query.filter_by(credit_rating=credit_rating)
-        if city:
-            query = query.filter_by(city=city)
-        if industry:
-            query = query.filter_by(industry=industry)
-        if search:
-            query = query.filter(
-                (Customer.company_name.contains(search)) |
-                (Customer.contact_name.contains(search))
-            )
-        
-        # 分页查询
-        customers_pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        filters = {name: request.args.get(name) for name in Customer.FILTERS}
+        query = Customer.filter_query(**filters)
+        
+        cursor_mode = 'after' in request.args or ('sort' in request.args and 'page' not in request.args)
+        count = request.args.get('count', 'none' if cursor_mode else 'exact')
+        if count not in COUNT_MODES:
+            return jsonify({
+                'code': 400,
+                'message': f"Count must be one of {', '.join(COUNT_MODES)}"
+            }), 400
+        
+        if cursor_mode:
+            return get_customers_by_cursor(query, per_page, filters, count)
         
-        customers = customers_pagination.items
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = max(per_page, 1)
+        
+        # 多取一行判断是否有下一页，总数单独统计（可能命中缓存）
+        rows = query.order_by(Customer.customer_id) \
+            .offset((page - 1) * per_page).limit(per_page + 1).all()
+        customers = rows[:per_page]
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'total': None,
+            'pages': None,
+            'has_next': len(rows) > per_page,
+            'has_prev': page > 1
+        }
+        if count != 'none':
+            total, estimated = count_customers(filters, count)
+            pagination['total'] = total
+            pagination['pages'] = -(-total // per_page)
+            pagination['total_estimated'] = estimated
         
         return jsonify({
             'code': 200,
             'message': 'Customer list retrieved successfully',
             'data': {
                 'customers': [customer.to_dict() for customer in customers],
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': customers_pagination.total,
-                    'pages': customers_pagination.pages,
-                    'has_next': customers_pagination.has_next,
-                    'has_prev': customers_pagination.has_prev
-                }
+                'pagination': pagination
             }
         })
     except OperationalError as e:
@@ -82,6 +116,116 @@ def get_all_customers():
             'error': 'INTERNAL_ERROR'
         }), 500
 
+def count_customers(filters, count):
+    """Total for the list endpoint, (total, estimated)"""
+    return Customer.count_filtered(filters, count,
+                                   current_app.config['CUSTOMER_COUNT_ESTIMATE_SAMPLE'])
+
+def get_customers_by_cursor(query, per_page, filters, count):
+    """Keyset pagination for get_all_customers"""
+    per_page = min(max(per_page, 1), MAX_CURSOR_PAGE_SIZE)
+    after = request.args.get('after')
+    if after:
+        try:
+            cursor = decode_cursor(after)
+            sort, order = cursor['sort'], cursor['order']
+            value = cursor['value']
+            if sort == 'last_modified' and value is not None:
+                value = datetime.fromisoformat(value)
+            position = (value, int(cursor['id']))
+        except (KeyError, TypeError, ValueError):
+            return jsonify({
+                'code': 400,
+                'message': 'Invalid cursor'
+            }), 400
+    else:
+        sort = request.args.get('sort', 'customer_id')
+        order = request.args.get('order', 'asc')
+        position = None
+    
+    if sort not in Customer.KEYSET_SORTS:
+        return jsonify({
+            'code': 400,
+            'message': f"Sort must be one of {', '.join(Customer.KEYSET_SORTS)}"
+        }), 400
+    if order not in ('asc', 'desc'):
+        return jsonify({
+            'code': 400,
+            'message': 'Order must be asc or desc'
+        }), 400
+    
+    customers, has_next = Customer.keyset_page(query, sort, order == 'desc', position, per_page)
+    
+    next_cursor = None
+    if has_next:
+        value, last_id = customers[-1].keyset_value(sort)
+        next_cursor = encode_cursor({
+            'sort': sort,
+            'order': order,
+            'value': value.isoformat() if isinstance(value, datetime) else value,
+            'id': last_id
+        })
+    
+    pagination = {
+        'per_page': per_page,
+        'sort': sort,
+        'order': order,
+        'has_next': has_next,
+        'next_cursor': next_cursor
+    }
+    if count != 'none':
+        pagination['total'], pagination['total_estimated'] = count_customers(filters, count)
+    
+    return jsonify({
+        'code': 200,
+        'message': 'Customer list retrieved successfully',
+        'data': {
+            'customers': [customer.to_dict() for customer in customers],
+            'pagination': pagination
+        }
+    })
+
+def export_format():
+    """Streaming format chosen by the Accept header, None for a JSON response"""
+    best = request.accept_mimetypes.best_match(['application/json', *EXPORT_MIMETYPES])
+    return EXPORT_MIMETYPES.get(best)
+
+def stream_customers(query, fmt):
+    """
+    Stream query results as NDJSON or CSV
+
+    Rows are fetched CUSTOMER_EXPORT_CHUNK_ROWS at a time with yield_per and
+    written in chunks of the same size, so memory does not grow with the
+    result. The query runs before the response starts; database errors
+    still return the usual JSON error.
+    """
+    chunk = current_app.config['CUSTOMER_EXPORT_CHUNK_ROWS']
+    customers = iter(query.yield_per(chunk))
+    
+    def generate():
+        buffer = io.StringIO()
+        if fmt == 'csv':
+            writer = csv.writer(buffer)
+            writer.writerow(Customer.EXPORT_COLUMNS)
+            write = lambda customer: writer.writerow(customer.to_dict().values())
+        else:
+            write = lambda customer: buffer.write(json.dumps(customer.to_dict(), ensure_ascii=False) + '\n')
+        for count, customer in enumerate(customers, 1):
+            write(customer)
+            if count % chunk == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(generate()),
+                   mimetype=mimetype,
+                   headers={
+                       'Cache-Control': 'no-cache',
+                       'X-Accel-Buffering': 'no'  # 禁用Nginx缓冲
+                   })
+
 @customer_bp.route('/<int:customer_id>', methods=['GET'])
 def get_customer(customer_id):
     """获取指定客户"""
@@ -125,7 +269,20 @@ def get_customer(customer_id):
 
 @customer_bp.route('/search', methods=['GET'])
 def search_customers():
-    """Search customers"""
+    """
+    Search customers
+
+    The keyword is split into terms on spaces and punctuation, and every
+    term must appear as a substring of company_name or contact_name (each
+    term may match either column, so "acme smith" finds company "Acme"
+    with contact "John Smith"). With the SQLite trigram full-text index,
+    terms of 3 or more characters are matched through the index and
+    results are ranked by relevance; shorter terms (such as two-character
+    Chinese words) are matched with LIKE, and a keyword with only short
+    terms is ordered by customer_id. Other databases use LIKE substring
+    matching on the whole keyword. At most ?limit= rows are returned
+    (capped by CUSTOMER_SEARCH_MAX_RESULTS).
+    """
     try:
         keyword = request.args.get('keyword', '')
         if not keyword:
@@ -134,7 +291,16 @@ def search_customers():
                 'message': 'Please provide a search keyword'
             }), 400
         
-        customers = Customer.search_by_name(keyword)
+        fmt = export_format()
+        if fmt:
+            query = Customer.search_query(keyword)
+            if 'limit' in request.args:
+                query = query.limit(max(request.args.get('limit', 1, type=int), 1))
+            return stream_customers(query, fmt)
+        
+        max_results = current_app.config['CUSTOMER_SEARCH_MAX_RESULTS']
+        limit = min(max(request.args.get('limit', max_results, type=int), 1), max_results)
+        customers = Customer.search_by_name(keyword, limit)
         return jsonify({
             'code': 200,
             'message': f'Search customers successfully, found {len(customers)} records',
@@ -175,6 +341,10 @@ def get_customers_by_status(status):
                 'message': 'Status must be ACTIVE or INACTIVE'
             }), 400
         
+        fmt = export_format()
+        if fmt:
+            return stream_customers(Customer.filter_query(status=status).order_by(Customer.customer_id), fmt)
+        
         customers = Customer.get_by_status(status)
         return jsonify({
             'code': 200,
@@ -216,6 +386,10 @@ def get_customers_by_credit_rating(rating):
                 'message': 'Credit rating must be A, B, C or D'
             }), 400
         
+        fmt = export_format()
+        if fmt:
+            return stream_customers(Customer.filter_query(credit_rating=rating).order_by(Customer.customer_id), fmt)
+        
         customers = Customer.get_by_credit_rating(rating)
         return jsonify({
             'code': 200,
@@ -251,6 +425,10 @@ def get_customers_by_credit_rating(rating):
 def get_customers_by_city(city):
     """Get customers by city"""
     try:
+        fmt = export_format()
+        if fmt:
+            return stream_customers(Customer.filter_query(city=city).order_by(Customer.customer_id), fmt)
+        
         customers = Customer.get_by_city(city)
         return jsonify({
             'code': 200,
@@ -286,6 +464,10 @@ def get_customers_by_city(city):
 def get_customers_by_industry(industry):
     """Get customers by industry"""
     try:
+        fmt = export_format()
+        if fmt:
+            return stream_customers(Customer.filter_query(industry=industry).order_by(Customer.customer_id), fmt)
+        
         customers = Customer.get_by_industry(industry)
         return jsonify({
             'code': 200,
@@ -410,6 +592,284 @@ def create_customer():
             'error': 'INTERNAL_ERROR'
         }), 500
 
+@customer_bp.route('/import', methods=['POST'])
+def import_customers():
+    """Import customers from a CSV or NDJSON request body"""
+    fmt = request.args.get('format') or IMPORT_MIMETYPES.get(request.mimetype)
+    if fmt not in READERS:
+        return jsonify({
+            'code': 415,
+            'message': 'Import body must be CSV (text/csv) or NDJSON (application/x-ndjson), or set format=csv|ndjson'
+        }), 415
+
+    importer = CustomerImporter(
+        batch_size=current_app.config['CUSTOMER_IMPORT_BATCH_SIZE'],
+        max_errors=current_app.config['CUSTOMER_IMPORT_MAX_ERRORS']
+    )
+    try:
+        summary = importer.run(READERS[fmt](request.stream))
+        return jsonify({
+            'code': 200,
+            'message': f'Imported {summary["imported"]} of {summary["total"]} customers',
+            'data': summary
+        })
+    except ImportFormatError as e:
+        db.session.rollback()
+        importer.add_error(e.line, None, str(e))
+        return jsonify({
+            'code': 400,
+            'message': f'Import stopped at line {e.line}: {e}' if e.line else f'Import stopped: {e}',
+            'data': importer.summary()
+        }), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 409,
+            'message': 'Customer data conflicts with existing records. Please check for duplicate values.',
+            'error': 'DATA_CONFLICT',
+            'data': importer.summary()
+        }), 409
+    except OperationalError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 503,
+            'message': 'Database connection failed. Please try again later.',
+            'error': 'SERVICE_UNAVAILABLE',
+            'data': importer.summary()
+        }), 503
+    except DatabaseError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 500,
+            'message': 'Database operation failed. Unable to import customer data.',
+            'error': 'DATABASE_ERROR',
+            'data': importer.summary()
+        }), 500
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 500,
+            'message': 'An unexpected database error occurred while importing customers.',
+            'error': 'DATABASE_ERROR',
+            'data': importer.summary()
+        }), 500
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 500,
+            'message': 'An unexpected error occurred while importing customers.',
+            'error': 'INTERNAL_ERROR',
+            'data': importer.summary()
+        }), 500
+
+def bulk_target(data):
+    """
+    Target of a bulk request: {"ids": [...]} or {"filter": {...}} with the
+    list endpoint's filters. Returns (ids, filters, error message).
+    """
+    if not isinstance(data, dict):
+        return None, None, 'Request body must be a JSON object'
+    ids, filters = data.get('ids'), data.get('filter')
+    if (ids is None) == (filters is None):
+        return None, None, 'Specify either ids or filter'
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(type(i) is int for i in ids):
+            return None, None, 'ids must be a non-empty list of customer IDs'
+        return ids, None, None
+    if not isinstance(filters, dict):
+        return None, None, 'filter must be an object'
+    unknown = set(filters) - set(Customer.FILTERS)
+    if unknown:
+        return None, None, f"Unknown filter {', '.join(sorted(unknown))}, filter can use {', '.join(Customer.FILTERS)}"
+    filters = {name: value for name, value in filters.items() if value not in (None, '')}
+    if not all(isinstance(value, str) for value in filters.values()):
+        return None, None, 'filter values must be strings'
+    # 不允许没有条件的过滤，避免一次修改所有客户
+    if not filters:
+        return None, None, 'filter must contain at least one condition'
+    return None, filters, None
+
+def bulk_number_error(values):
+    """数值列只能是 null 或者非负数，employee_count 必须是整数；返回错误信息或 None"""
+    for field in DECIMAL_FIELDS + INTEGER_FIELDS:
+        value = values.get(field)
+        if value is None:
+            continue
+        if field in INTEGER_FIELDS:
+            valid = type(value) is int
+            kind = 'integer'
+        else:
+            valid = type(value) in (int, float) and math.isfinite(value)
+            kind = 'number'
+        if not valid or value < 0:
+            return f'{field} must be a non-negative {kind} or null'
+    return None
+
+@customer_bp.route('/bulk', methods=['PATCH'])
+def bulk_update_customers():
+    """
+    Update many customers with one UPDATE statement
+
+    Body: {"ids": [...]} or {"filter": {...}}, plus "set" with the new
+    values and optional "dry_run": true to only count matching customers.
+    """
+    try:
+        data = request.get_json(silent=True)
+        ids, filters, error = bulk_target(data)
+        if error:
+            return jsonify({
+                'code': 400,
+                'message': error
+            }), 400
+        
+        values = data.get('set')
+        if not isinstance(values, dict) or not values:
+            return jsonify({
+                'code': 400,
+                'message': 'set must be an object with the fields to update'
+            }), 400
+        
+        invalid = set(values) - set(BULK_UPDATE_FIELDS)
+        if invalid:
+            return jsonify({
+                'code': 400,
+                'message': f"Fields {', '.join(sorted(invalid))} cannot be updated in bulk"
+            }), 400
+        
+        # 验证信用评级
+        if values.get('credit_rating') and values['credit_rating'] not in ['A', 'B', 'C', 'D']:
+            return jsonify({
+                'code': 400,
+                'message': 'Credit rating must be A, B, C or D'
+            }), 400
+        
+        # 验证状态
+        if values.get('status') and values['status'] not in ['ACTIVE', 'INACTIVE']:
+            return jsonify({
+                'code': 400,
+                'message': 'Status must be ACTIVE or INACTIVE'
+            }), 400
+        
+        error = bulk_number_error(values)
+        if error:
+            return jsonify({
+                'code': 400,
+                'message': error
+            }), 400
+        
+        dry_run = data.get('dry_run') is True
+        matched = Customer.bulk_update(values, ids=ids, filters=filters, dry_run=dry_run)
+        if not dry_run:
+            db.session.commit()
+        return jsonify({
+            'code': 200,
+            'message': f'{matched} customers would be updated' if dry_run else f'Updated {matched} customers',
+            'data': {
+                'matched': matched,
+                'dry_run': dry_run
+            }
+        })
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 409,
+            'message': 'Customer data conflicts with existing records. Please check for duplicate values.',
+            'error': 'DATA_CONFLICT'
+        }), 409
+    except OperationalError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 503,
+            'message': 'Database connection failed. Please try again later.',
+            'error': 'SERVICE_UNAVAILABLE'
+        }), 503
+    except DatabaseError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 500,
+            'message': 'Database operation failed. Unable to update customer data.',
+            'error': 'DATABASE_ERROR'
+        }), 500
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 500,
+            'message': 'An unexpected database error occurred while updating customers.',
+            'error': 'DATABASE_ERROR'
+        }), 500
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 500,
+            'message': 'An unexpected error occurred while updating customers.',
+            'error': 'INTERNAL_ERROR'
+        }), 500
+
+@customer_bp.route('/bulk', methods=['DELETE'])
+def bulk_delete_customers():
+    """
+    Delete many customers with one DELETE statement
+
+    Body: {"ids": [...]} or {"filter": {...}}, optional "dry_run": true to
+    only count matching customers.
+    """
+    try:
+        data = request.get_json(silent=True)
+        ids, filters, error = bulk_target(data)
+        if error:
+            return jsonify({
+                'code': 400,
+                'message': error
+            }), 400
+        
+        dry_run = data.get('dry_run') is True
+        matched = Customer.bulk_delete(ids=ids, filters=filters, dry_run=dry_run)
+        if not dry_run:
+            db.session.commit()
+        return jsonify({
+            'code': 200,
+            'message': f'{matched} customers would be deleted' if dry_run else f'Deleted {matched} customers',
+            'data': {
+                'matched': matched,
+                'dry_run': dry_run
+            }
+        })
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 409,
+            'message': 'Cannot delete customers due to existing references in other records.',
+            'error': 'DATA_CONFLICT'
+        }), 409
+    except OperationalError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 503,
+            'message': 'Database connection failed. Please try again later.',
+            'error': 'SERVICE_UNAVAILABLE'
+        }), 503
+    except DatabaseError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 500,
+            'message': 'Database operation failed. Unable to delete customers.',
+            'error': 'DATABASE_ERROR'
+        }), 500
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 500,
+            'message': 'An unexpected database error occurred while deleting customers.',
+            'error': 'DATABASE_ERROR'
+        }), 500
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'code': 500,
+            'message': 'An unexpected error occurred while deleting customers.',
+            'error': 'INTERNAL_ERROR'
+        }), 500
+
 @customer_bp.route('/<int:customer_id>', methods=['PUT'])
 def update_customer(customer_id):
     """Update customer information"""
@@ -576,41 +1036,18 @@ def delete_customer(customer_id):
 def get_customer_stats():
     """获取客户统计信息"""
     try:
-        total_customers = Customer.query.count()
-        active_customers = Customer.query.filter_by(status='ACTIVE').count()
-        inactive_customers = Customer.query.filter_by(status='INACTIVE').count()
-        
-        # 按信用评级统计
-        credit_stats = {}
-        for rating in ['A', 'B', 'C', 'D']:
-            credit_stats[rating] = Customer.query.filter_by(credit_rating=rating).count()
-        
-        # 按城市统计前10
-        city_stats = db.session.query(
-            Customer.city, 
-            db.func.count(Customer.customer_id).label('count')
-        ).filter(Customer.city.isnot(None)).group_by(Customer.city).order_by(
-            db.func.count(Customer.customer_id).desc()
-        ).limit(10).all()
-        
-        # 按行业统计前10
-        industry_stats = db.session.query(
-            Customer.industry,
-            db.func.count(Customer.customer_id).label('count')
-        ).filter(Customer.industry.isnot(None)).group_by(Customer.industry).order_by(
-            db.func.count(Customer.customer_id).desc()
-        ).limit(10).all()
+        stats = Customer.get_stats()
         
         return jsonify({
             'code': 200,
             'message': 'Get customer stats successfully',
             'data': {
-                'total_customers': total_customers,
-                'active_customers': active_customers,
-                'inactive_customers': inactive_customers,
-                'credit_rating_stats': credit_stats,
-                'top_cities': [{'city': city, 'count': count} for city, count in city_stats],
-                'top_industries': [{'industry': industry, 'count': count} for industry, count in industry_stats]
+                'total_customers': stats['total'],
+                'active_customers': stats['status']['ACTIVE'],
+                'inactive_customers': stats['status']['INACTIVE'],
+                'credit_rating_stats': {rating: stats['credit_rating'][rating] for rating in ['A', 'B', 'C', 'D']},
+                'top_cities': [{'city': city, 'count': count} for city, count in stats['top_cities']],
+                'top_industries': [{'industry': industry, 'count': count} for industry, count in stats['top_industries']]
             }
         })
     except OperationalError as e:
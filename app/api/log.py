@@ -1,37 +1,171 @@
 from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context
-from app.utils import LogMonitor
+from app.utils import run_blocking, iter_blocking, LogMonitor, LogCursor, LogRegistry, LogFilter, LogLineIndex, LogSegment, LogRotationSet, LogDownload, LogSearch, SearchQuery, TimestampParser, LogWindow, FieldQuery, JsonLogIndex, JsonLogSearch, SubscriberQueue, log_hub, parse_interval
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from datetime import datetime
+import os
 import time
 import json
+import uuid
 
 log_bp = Blueprint('log', __name__, url_prefix='/api/log')
 
-@log_bp.route('/', methods=['GET'])
-def get_log():
-    """获取日志文件内容"""
+def source_not_found(source):
+    """日志源不存在时的响应"""
+    return jsonify({
+        'code': 404,
+        'message': f'日志源不存在: {source}',
+        'data': {
+            'source': source
+        }
+    }), 404
+
+def invalid_filter(error):
+    """过滤参数无效时的响应"""
+    return jsonify({
+        'code': 400,
+        'message': str(error)
+    }), 400
+
+def event_id(event):
+    """SSE 事件ID: "<inode>:<字节偏移>"，文件不存在时为空"""
+    if event.get('inode') is None:
+        return None
+    return f"{event['inode']}:{event['offset']}"
+
+def parse_event_id(value):
+    """
+    解析 Last-Event-ID（"<inode>:<字节偏移>" 或只有字节偏移）
+
+    Returns:
+        tuple | None: (字节偏移, inode)，无法解析时返回 None
+    """
+    inode, sep, offset = (value or '').strip().rpartition(':')
+    try:
+        return int(offset), int(inode) if sep else None
+    except ValueError:
+        return None
+
+@log_bp.route('/sources', methods=['GET'])
+def get_log_sources():
+    """获取所有日志源"""
+    sources = LogRegistry.get_sources()
+    return jsonify({
+        'code': 200,
+        'message': '获取日志源列表成功',
+        'data': [log_source.to_dict() for log_source in sources.values()]
+    })
+
+@log_bp.route('/', methods=['GET'], defaults={'source': None})
+@log_bp.route('/<source>/', methods=['GET'])
+def get_log(source):
+    """
+    获取日志文件内容
+
+    指定 since（上次响应的 offset）时为长轮询：只返回之后新增的完整行，没有新增时最多等待 timeout 秒。
+    since=-1 返回尾部快照和起始的 offset、inode；文件被轮转（inode 与参数不一致）、截断或落后太多时返回 reset 快照。
+    """
+    log_source = LogRegistry.get_source(source)
+    if log_source is None:
+        return source_not_found(source)
+    
+    try:
+        log_filter = LogFilter.from_params(request.args)
+    except ValueError as e:
+        return invalid_filter(e)
+    
     max_lines = request.args.get('max_lines', type=int)
-    log_data = LogMonitor.get_log_content(max_lines)
+    since = request.args.get('since', type=int)
+    if since is not None:
+        max_timeout = current_app.config.get('LOG_MONITOR_LONG_POLL_TIMEOUT', 25)
+        timeout = min(max(request.args.get('timeout', max_timeout, type=float), 0), max_timeout)
+        inode = request.args.get('inode', type=int)
+        try:
+            cursor = LogCursor(log_source.path, max_lines)
+            log_data = run_blocking(cursor.since, since, inode)
+            if log_data['type'] == 'append' and log_data['offset'] == since and timeout:
+                # 没有新增的行，等待共享监控线程发现变化
+                log_hub.wait_for(log_source, since, log_data['inode'], timeout)
+                log_data = run_blocking(cursor.since, since, log_data['inode'])
+        except Exception as e:
+            return jsonify({
+                'code': 500,
+                'message': f'读取日志失败: {str(e)}',
+                'data': {
+                    'file_path': log_source.path
+                }
+            }), 500
+        if log_filter and log_data['exists']:
+            log_data['content'] = log_filter.apply(log_data['content'])
+    elif request.args.get('rotated', type=int):
+        # 把轮转文件和当前文件当作一个连续的日志流读取最后 max_lines 行
+        log_data = run_blocking(LogRotationSet(log_source.path).tail,
+                                max_lines or current_app.config.get('LOG_MONITOR_MAX_LINES', 1000))
+        if log_filter:
+            log_data['content'] = log_filter.apply(log_data['content'])
+        log_data.update({
+            'file_path': log_source.path,
+            'exists': bool(log_data['segments']),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+    else:
+        log_data = run_blocking(LogMonitor.get_log_content, max_lines, log_source.path, log_filter)
+    log_data['source'] = log_source.name
+    if log_filter:
+        log_data['filter'] = log_filter.key
     return jsonify({
         'code': 200,
         'message': '获取日志内容成功',
         'data': log_data
     })
 
-@log_bp.route('/stream', methods=['GET'])
-def stream_log():
-    """流式获取日志内容（Server-Sent Events）"""
+@log_bp.route('/stream', methods=['GET'], defaults={'source': None})
+@log_bp.route('/<source>/stream', methods=['GET'])
+def stream_log(source):
+    """
+    流式获取日志内容（Server-Sent Events），支持 regex、level、contains、exclude 过滤参数
+
+    每个事件的 id 为 "<inode>:<字节偏移>"。断线重连时浏览器带上 Last-Event-ID 请求头（或 last_event_id 参数），
+    只补发错过的内容，不再重新发送完整快照。
+    """
+    log_source = LogRegistry.get_source(source)
+    if log_source is None:
+        return source_not_found(source)
+    
+    try:
+        log_filter = LogFilter.from_params(request.args)
+        interval = parse_interval(request.args.get('interval'))
+    except ValueError as e:
+        return invalid_filter(e)
+    
     max_lines = request.args.get('max_lines', type=int)
-    interval = request.args.get('interval', 
-                               type=int, 
-                               default=current_app.config.get('LOG_MONITOR_UPDATE_INTERVAL', 5))
+    
+    keepalive = current_app.config.get('LOG_MONITOR_KEEPALIVE_INTERVAL', 15)
+    resume = parse_event_id(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
     
     def generate():
+        # 订阅该日志源的共享监控线程，事件通过队列送达
+        sub_id = f'sse:{uuid.uuid4()}'
+        events = SubscriberQueue.from_config()
+        log_hub.subscribe(log_source, sub_id, 'sse', max_lines, interval, events, log_filter, resume)
         try:
-            for log_data in LogMonitor.tail_log(max_lines=max_lines, follow=True, interval=interval):
-                # 使用SSE格式
-                yield f"data: {json.dumps(log_data)}\n\n"
+            # 立即发送响应头；断线重连且没有错过的内容时不会马上有事件
+            yield ": connected\n\n"
+            while True:
+                # 客户端读取慢时，队列中待发送的事件会被合并
+                log_data = events.get(timeout=keepalive)
+                if log_data is None:
+                    # 定期发送注释行，及时发现已断开的客户端
+                    yield ": keepalive\n\n"
+                    continue
+                # 使用SSE格式，事件ID用于断线重连
+                event_id_value = event_id(log_data)
+                event_id_line = f"id: {event_id_value}\n" if event_id_value else ""
+                yield f"{event_id_line}data: {json.dumps(log_data)}\n\n"
         except GeneratorExit:
             # 客户端断开连接
             pass
+        finally:
+            log_hub.unsubscribe(sub_id)
     
     return Response(stream_with_context(generate()),
                    mimetype="text/event-stream",
@@ -41,10 +175,15 @@ def stream_log():
                        'X-Accel-Buffering': 'no'  # 禁用Nginx缓冲
                    })
 
-@log_bp.route('/info', methods=['GET'])
-def get_log_info():
+@log_bp.route('/info', methods=['GET'], defaults={'source': None})
+@log_bp.route('/<source>/info', methods=['GET'])
+def get_log_info(source):
     """获取日志文件信息"""
-    log_file = current_app.config.get('LOG_MONITOR_FILE')
+    log_source = LogRegistry.get_source(source)
+    if log_source is None:
+        return source_not_found(source)
+    
+    log_file = log_source.path
     try:
         import os
         from datetime import datetime
@@ -66,6 +205,7 @@ def get_log_info():
             'code': 200,
             'message': '获取日志文件信息成功',
             'data': {
+                'source': log_source.name,
                 'file_path': log_file,
                 'file_size': file_stats.st_size,
                 'last_modified': datetime.fromtimestamp(file_stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
@@ -79,4 +219,484 @@ def get_log_info():
             'data': {
                 'file_path': log_file
             }
-        }), 500 
\ No newline at end of file
+        }), 500
+
+@log_bp.route('/range', methods=['GET'], defaults={'source': None})
+@log_bp.route('/<source>/range', methods=['GET'])
+def get_log_range(source):
+    """按行号分页读取日志（start_line 从 0 开始，负数表示从末尾倒数）"""
+    log_source = LogRegistry.get_source(source)
+    if log_source is None:
+        return source_not_found(source)
+    
+    start_line = request.args.get('start_line', type=int)
+    count = request.args.get('count', 100, type=int)
+    max_count = current_app.config.get('LOG_MONITOR_RANGE_MAX_COUNT', 5000)
+    if start_line is None or count < 0:
+        return jsonify({
+            'code': 400,
+            'message': '请提供有效的 start_line 和 count 参数'
+        }), 400
+    
+    log_file = log_source.path
+    rotated = request.args.get('rotated', type=int)
+    if not log_file or not (rotated or os.path.exists(log_file)):
+        return jsonify({
+            'code': 404,
+            'message': f'日志文件不存在',
+            'data': {
+                'file_path': log_file,
+                'exists': False
+            }
+        }), 404
+    
+    try:
+        if rotated:
+            # 行号从最旧的轮转文件开始计数
+            log_range = run_blocking(LogRotationSet(log_file).read_range, start_line, min(count, max_count))
+        else:
+            # 第一次读取时需要建立行偏移索引，大文件可能需要几十秒
+            index = run_blocking(LogLineIndex.get, log_file)
+            log_range = run_blocking(index.read_range, start_line, min(count, max_count))
+    except Exception as e:
+        return jsonify({
+            'code': 500,
+            'message': f'读取日志失败: {str(e)}',
+            'data': {
+                'file_path': log_file
+            }
+        }), 500
+    
+    log_range.update({
+        'source': log_source.name,
+        'file_path': log_file
+    })
+    return jsonify({
+        'code': 200,
+        'message': '获取日志内容成功',
+        'data': log_range
+    })
+
+@log_bp.route('/search', methods=['GET'], defaults={'source': None})
+@log_bp.route('/<source>/search', methods=['GET'])
+def search_log(source):
+    """
+    搜索日志，结果以 NDJSON 流式返回
+
+    每个匹配行一条 {"type": "match", ...} 记录，最后一条为 {"type": "summary", ...}，达到 limit 后停止扫描。
+    """
+    log_source = LogRegistry.get_source(source)
+    if log_source is None:
+        return source_not_found(source)
+    
+    try:
+        query = SearchQuery(request.args.get('q'),
+                            regex=bool(request.args.get('regex', type=int)),
+                            ignore_case=bool(request.args.get('ignore_case', type=int)))
+    except ValueError as e:
+        return invalid_filter(e)
+    
+    config = current_app.config
+    max_results = config.get('LOG_MONITOR_SEARCH_MAX_RESULTS', 1000)
+    max_context = config.get('LOG_MONITOR_SEARCH_MAX_CONTEXT', 20)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), max_results)
+    before = min(max(request.args.get('before', 0, type=int), 0), max_context)
+    after = min(max(request.args.get('after', 0, type=int), 0), max_context)
+    rotated = request.args.get('rotated', type=int)
+    
+    log_file = log_source.path
+    if not log_file or not (rotated or os.path.exists(log_file)):
+        return jsonify({
+            'code': 404,
+            'message': f'日志文件不存在',
+            'data': {
+                'file_path': log_file,
+                'exists': False
+            }
+        }), 404
+    
+    if rotated:
+        hits = LogRotationSet(log_file).search(query, limit, before, after)
+    else:
+        hits = LogSearch.search_file(log_file, query, limit, before, after)
+    
+    def generate():
+        matches = 0
+        start = time.perf_counter()
+        try:
+            # 每批匹配结果在 tpool 中扫描，不阻塞事件循环
+            for hit in iter_blocking(hits):
+                matches += 1
+                hit['type'] = 'match'
+                yield json.dumps(hit, ensure_ascii=False) + '\n'
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'message': f'搜索日志失败: {str(e)}'}, ensure_ascii=False) + '\n'
+            return
+        finally:
+            hits.close()
+        yield json.dumps({
+            'type': 'summary',
+            'source': log_source.name,
+            'query': query.params(),
+            'matches': matches,
+            'limit': limit,
+            'truncated': matches >= limit,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+        }, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()),
+                   mimetype='application/x-ndjson',
+                   headers={
+                       'Cache-Control': 'no-cache',
+                       'X-Accel-Buffering': 'no'  # 禁用Nginx缓冲
+                   })
+
+@log_bp.route('/window', methods=['GET'], defaults={'source': None})
+@log_bp.route('/<source>/window', methods=['GET'])
+def get_log_window(source):
+    """
+    按时间范围读取日志 [from, to)
+
+    在字节偏移上二分查找行首时间戳，要求日志时间单调递增。
+    from/to 支持配置的时间格式、ISO 8601 和只有时间的 "HH:MM[:SS]"（日期取日志最后一行的日期）。
+    """
+    log_source = LogRegistry.get_source(source)
+    if log_source is None:
+        return source_not_found(source)
+    
+    log_file = log_source.path
+    if not log_file or not os.path.exists(log_file):
+        return jsonify({
+            'code': 404,
+            'message': f'日志文件不存在',
+            'data': {
+                'file_path': log_file,
+                'exists': False
+            }
+        }), 404
+    
+    if not request.args.get('from'):
+        return jsonify({
+            'code': 400,
+            'message': '请提供开始时间 from'
+        }), 400
+    
+    config = current_app.config
+    max_lines = min(request.args.get('limit', config.get('LOG_MONITOR_MAX_LINES', 1000), type=int),
+                    config.get('LOG_MONITOR_RANGE_MAX_COUNT', 5000))
+    offset = request.args.get('offset', type=int)
+    
+    try:
+        parser = TimestampParser.get(tuple(config.get('LOG_MONITOR_TIME_FORMATS')))
+        window = LogWindow(log_file, parser)
+        reference = run_blocking(window.last_timestamp, config.get('LOG_MONITOR_TAIL_BLOCK_SIZE', 64 * 1024))
+        start_time = parser.parse_param(request.args.get('from'), reference)
+        end_time = parser.parse_param(request.args.get('to'), reference) if request.args.get('to') else None
+    except ValueError as e:
+        return invalid_filter(e)
+    
+    if end_time and end_time < start_time:
+        return jsonify({
+            'code': 400,
+            'message': '结束时间不能早于开始时间'
+        }), 400
+    
+    try:
+        log_window = run_blocking(window.read, start_time, end_time, max(max_lines, 0), offset)
+    except Exception as e:
+        return jsonify({
+            'code': 500,
+            'message': f'读取日志失败: {str(e)}',
+            'data': {
+                'file_path': log_file
+            }
+        }), 500
+    
+    log_window.update({
+        'source': log_source.name,
+        'file_path': log_file,
+        'from': start_time.isoformat(sep=' '),
+        'to': end_time.isoformat(sep=' ') if end_time else None
+    })
+    return jsonify({
+        'code': 200,
+        'message': '获取日志内容成功',
+        'data': log_window
+    })
+
+@log_bp.route('/query', methods=['GET'], defaults={'source': None})
+@log_bp.route('/<source>/query', methods=['GET'])
+def query_log(source):
+    """
+    按字段查询 JSON lines 日志，如 q=level=error AND service=billing
+
+    mode=tail（默认）在最近窗口的解析缓存和字段索引中查找最后 limit 条匹配记录；
+    mode=history 从旧到新扫描整个文件（rotated=1 时包括轮转文件），结果以 NDJSON 流式返回，
+    每条匹配一条 {"type": "match", ...} 记录，最后一条为 {"type": "summary", ...}。
+    """
+    log_source = LogRegistry.get_source(source)
+    if log_source is None:
+        return source_not_found(source)
+    
+    if not log_source.structured:
+        return jsonify({
+            'code': 400,
+            'message': f'日志源不是 JSON 格式: {log_source.name}',
+            'data': {
+                'source': log_source.name,
+                'format': log_source.format
+            }
+        }), 400
+    
+    try:
+        query = FieldQuery(request.args.get('q'))
+    except ValueError as e:
+        return invalid_filter(e)
+    
+    mode = request.args.get('mode', 'tail')
+    if mode not in ('tail', 'history'):
+        return jsonify({
+            'code': 400,
+            'message': f'无效的查询模式: {mode}'
+        }), 400
+    
+    config = current_app.config
+    limit = min(max(request.args.get('limit', 100, type=int), 1), config.get('LOG_MONITOR_SEARCH_MAX_RESULTS', 1000))
+    rotated = mode == 'history' and request.args.get('rotated', type=int)
+    
+    log_file = log_source.path
+    if not log_file or not (rotated or os.path.exists(log_file)):
+        return jsonify({
+            'code': 404,
+            'message': f'日志文件不存在',
+            'data': {
+                'file_path': log_file,
+                'exists': False
+            }
+        }), 404
+    
+    if mode == 'tail':
+        start = time.perf_counter()
+        try:
+            index = run_blocking(JsonLogIndex.get, log_file)
+            result = run_blocking(index.query, query, limit)
+        except Exception as e:
+            return jsonify({
+                'code': 500,
+                'message': f'查询日志失败: {str(e)}',
+                'data': {
+                    'file_path': log_file
+                }
+            }), 500
+        result.update({
+            'source': log_source.name,
+            'query': query.params(),
+            'limit': limit,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+        })
+        return jsonify({
+            'code': 200,
+            'message': '查询日志成功',
+            'data': result
+        })
+    
+    if rotated:
+        log_set = LogRotationSet(log_file)
+        segments = log_set.segments()
+        chunk_size = log_set.chunk_size
+    else:
+        segments = [LogSegment(log_file)]
+        chunk_size = config.get('LOG_MONITOR_DECOMPRESS_CHUNK', 1024 * 1024)
+    
+    def generate():
+        matches = 0
+        stats = {'bytes': 0, 'parsed': 0, 'invalid': 0}
+        start = time.perf_counter()
+        try:
+            for segment in segments:
+                hits = JsonLogSearch.scan_blocks(segment.iter_blocks(chunk_size), query, stats,
+                                                 None if segment.compressed else 0)
+                try:
+                    # 每批最多取到 limit 为止，避免为凑满一批多扫描
+                    for hit in iter_blocking(hits, min(limit - matches, 100)):
+                        matches += 1
+                        hit['type'] = 'match'
+                        if rotated:
+                            hit['segment'] = segment.name
+                        yield json.dumps(hit, ensure_ascii=False) + '\n'
+                        if matches >= limit:
+                            break
+                finally:
+                    hits.close()
+                if matches >= limit:
+                    break
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'message': f'查询日志失败: {str(e)}'}, ensure_ascii=False) + '\n'
+            return
+        yield json.dumps({
+            'type': 'summary',
+            'source': log_source.name,
+            'query': query.params(),
+            'matches': matches,
+            'limit': limit,
+            'truncated': matches >= limit,
+            'scanned_bytes': stats['bytes'],
+            'parsed_lines': stats['parsed'],
+            'invalid_lines': stats['invalid'],
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+        }, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()),
+                   mimetype='application/x-ndjson',
+                   headers={
+                       'Cache-Control': 'no-cache',
+                       'X-Accel-Buffering': 'no'  # 禁用Nginx缓冲
+                   })
+
+@log_bp.route('/download', methods=['GET'], defaults={'source': None})
+@log_bp.route('/<source>/download', methods=['GET'])
+def download_log(source):
+    """
+    下载原始日志文件
+
+    支持 Range 断点续传和 If-None-Match / If-Modified-Since 条件请求。
+    segment 指定轮转文件名（见 /segments）时下载该文件，压缩文件原样下载；
+    gzip=1 时边读边压缩成 gzip 流。
+    """
+    log_source = LogRegistry.get_source(source)
+    if log_source is None:
+        return source_not_found(source)
+
+    if not log_source.path or not os.path.exists(log_source.path):
+        return jsonify({
+            'code': 404,
+            'message': f'日志文件不存在',
+            'data': {
+                'file_path': log_source.path,
+                'exists': False
+            }
+        }), 404
+
+    segment_name = request.args.get('segment')
+    compress = request.args.get('gzip', 'false').lower() in ('true', '1', 'yes')
+    path, codec = log_source.path, None
+    if segment_name:
+        segment = next((segment for segment in LogRotationSet(log_source.path).segments()
+                        if segment.name == segment_name), None)
+        if segment is None:
+            return jsonify({
+                'code': 404,
+                'message': f'轮转文件不存在: {segment_name}',
+                'data': {
+                    'file_path': log_source.path,
+                    'segment': segment_name
+                }
+            }), 404
+        path, codec = segment.path, segment.codec
+
+    try:
+        return LogDownload.send(path, os.path.basename(path), codec, compress)
+    except RequestedRangeNotSatisfiable as e:
+        response = jsonify({
+            'code': 416,
+            'message': f'请求的范围无效，文件大小为 {e.length} 字节',
+            'data': {
+                'file_path': path,
+                'file_size': e.length
+            }
+        })
+        response.headers['Content-Range'] = f'bytes */{e.length}'
+        return response, 416
+    except Exception as e:
+        return jsonify({
+            'code': 500,
+            'message': f'下载日志失败: {str(e)}',
+            'data': {
+                'file_path': path
+            }
+        }), 500
+
+@log_bp.route('/segments', methods=['GET'], defaults={'source': None})
+@log_bp.route('/<source>/segments', methods=['GET'])
+def get_log_segments(source):
+    """获取日志源的轮转文件列表（从旧到新，包括 gz/bz2/xz 压缩文件）"""
+    log_source = LogRegistry.get_source(source)
+    if log_source is None:
+        return source_not_found(source)
+    
+    if not log_source.path:
+        return jsonify({
+            'code': 404,
+            'message': f'日志文件不存在',
+            'data': {
+                'file_path': log_source.path,
+                'exists': False
+            }
+        }), 404
+    
+    try:
+        segments = [segment.to_dict() for segment in LogRotationSet(log_source.path).segments()]
+    except Exception as e:
+        return jsonify({
+            'code': 500,
+            'message': f'获取轮转文件失败: {str(e)}',
+            'data': {
+                'file_path': log_source.path
+            }
+        }), 500
+    
+    return jsonify({
+        'code': 200,
+        'message': '获取轮转文件列表成功',
+        'data': {
+            'source': log_source.name,
+            'file_path': log_source.path,
+            'segments': segments
+        }
+    })
+
+@log_bp.route('/stats', methods=['GET'], defaults={'source': None})
+@log_bp.route('/<source>/stats', methods=['GET'])
+def get_log_stats(source):
+    """
+    获取日志源的滚动统计（每分钟各级别行数、重复次数最多的消息）
+
+    统计由监控线程根据新增内容增量维护，第一次请求时开始监控该日志源；
+    最后一次请求 LOG_MONITOR_STATS_LEASE 秒后没有订阅者时停止监控。
+    """
+    log_source = LogRegistry.get_source(source)
+    if log_source is None:
+        return source_not_found(source)
+    
+    if not log_source.path or not os.path.exists(log_source.path):
+        return jsonify({
+            'code': 404,
+            'message': f'日志文件不存在',
+            'data': {
+                'file_path': log_source.path,
+                'exists': False
+            }
+        }), 404
+    
+    minutes = request.args.get('minutes', type=int)
+    top = min(max(request.args.get('top', 10, type=int), 0), 100)
+    watcher = log_hub.watch(log_source)
+    log_stats = watcher.metrics.summary(minutes, top)
+    log_stats.update({
+        'source': log_source.name,
+        'file_path': log_source.path
+    })
+    return jsonify({
+        'code': 200,
+        'message': '获取日志统计成功',
+        'data': log_stats
+    })
+
+@log_bp.route('/hub', methods=['GET'])
+def get_log_hub_stats():
+    """获取共享日志监控线程的订阅者数量和读取开销"""
+    return jsonify({
+        'code': 200,
+        'message': '获取日志监控统计成功',
+        'data': log_hub.stats()
+    })
@@ -0,0 +1,176 @@
+import re
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import event
+
+from app import db
+from app.models import Customer, CustomerStat
+from app.models.customer import customer_counts
+
+customer_cli = AppGroup('customer', help='客户数据维护命令')
+
+# 检查执行计划的请求: (说明, 请求路径或直接调用的函数, 是否允许全表扫描)
+# 允许全表扫描的只有不带条件按主键取一页；关键词搜索需要迁移 2620e56f72b5 创建的全文索引
+PLAN_CHECKS = [
+    ('list', '/api/customer/?page=2', True),
+    ('list status', '/api/customer/?status=ACTIVE&page=2', False),
+    ('list credit_rating', '/api/customer/?credit_rating=A', False),
+    ('list city', '/api/customer/?city=Shanghai', False),
+    ('list industry', '/api/customer/?industry=IT', False),
+    ('list status+credit_rating', '/api/customer/?status=ACTIVE&credit_rating=A', False),
+    ('list status+city', '/api/customer/?status=ACTIVE&city=Shanghai', False),
+    ('list status+industry', '/api/customer/?status=ACTIVE&industry=IT', False),
+    ('list count=estimate', '/api/customer/?status=ACTIVE&count=estimate', False),
+    ('list search', '/api/customer/?search=abc', False),
+    ('list status+search', '/api/customer/?status=ACTIVE&search=abc&count=estimate', False),
+    ('search', '/api/customer/search?keyword=abc', False),
+    ('cursor customer_id', '/api/customer/?sort=customer_id&status=ACTIVE', False),
+    ('cursor company_name', '/api/customer/?sort=company_name&order=desc', False),
+    ('cursor last_modified', '/api/customer/?sort=last_modified', False),
+    ('cursor status+company_name', '/api/customer/?sort=company_name&status=INACTIVE', False),
+    ('cursor status+last_modified', '/api/customer/?sort=last_modified&order=desc&status=ACTIVE', False),
+    ('by id', '/api/customer/1', False),
+    ('by status', '/api/customer/status/ACTIVE', False),
+    ('by credit rating', '/api/customer/credit-rating/A', False),
+    ('by city', '/api/customer/city/Shanghai', False),
+    ('by industry', '/api/customer/industry/IT', False),
+    ('stats', '/api/customer/stats', False),
+    ('company name (create/update)', lambda: Customer.get_by_company_name('Acme'), False),
+]
+
+# SQLite 的全表扫描: "SCAN customers"，没有 USING INDEX
+FULL_SCAN = re.compile(r'^SCAN customers$')
+
+
+def query_plans(target, client):
+    """
+    执行一个 PLAN_CHECKS 请求，返回其中每条客户查询的执行计划
+
+    Args:
+        target: 请求路径或直接调用的函数
+        client: 应用的测试客户端
+
+    Returns:
+        list: (SQL, 执行计划明细列表)
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if 'customers' in statement and not statement.startswith('EXPLAIN'):
+            statements.append((statement, parameters))
+
+    # 总数有缓存时不会执行 COUNT
+    customer_counts.invalidate()
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        if callable(target):
+            target()
+        else:
+            response = client.get(target)
+            if response.status_code >= 500:
+                raise RuntimeError(f'{target} returned {response.status_code}')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    plans = []
+    with db.engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = [row[3] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)]
+            plans.append((statement, plan))
+    return plans
+
+
+def full_scan(plan):
+    """执行计划中是否有 customers 的全表扫描"""
+    return any(FULL_SCAN.match(detail) for detail in plan)
+
+
+@customer_cli.command('check-plans')
+@click.option('-v', '--verbose', is_flag=True, help='输出每条语句的执行计划')
+def check_plans(verbose):
+    """
+    检查客户接口每条查询的执行计划
+
+    通过测试客户端调用各个读取接口，记录执行的 SQL，再用 EXPLAIN QUERY PLAN 检查，
+    出现全表扫描时以非 0 状态退出。接口会真正执行查询，建议在开发库或 CI 的库上运行；
+    tests/test_customer_query_plans.py 在迁移后的临时库上做同样的检查。
+    """
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('check-plans only supports SQLite (EXPLAIN QUERY PLAN)')
+
+    client = current_app.test_client()
+    failures = 0
+    for name, target, scan_ok in PLAN_CHECKS:
+        try:
+            plans = query_plans(target, client)
+        except RuntimeError as e:
+            raise click.ClickException(f'{name}: {e}')
+
+        failed = 0
+        for statement, plan in plans:
+            scan = full_scan(plan) and not scan_ok
+            failed += scan
+            if scan or verbose:
+                click.echo(f"[{'FAIL' if scan else 'ok'}] {name}: {' '.join(statement.split())}")
+                for detail in plan:
+                    click.echo(f'    {detail}')
+        if not verbose and not failed:
+            click.echo(f'[ok] {name} ({len(plans)} statements)')
+        failures += failed
+
+    if failures:
+        raise click.ClickException(f'{failures} statements use a full table scan')
+    click.echo('All customer queries use an index')
+
+
+def require_stats():
+    if not Customer.stats_enabled():
+        raise click.ClickException('customer_stats is not maintained on this database '
+                                   '(SQLite with migration 8d1c5e0b7a43 required)')
+
+
+@customer_cli.command('rebuild-stats')
+def rebuild_stats():
+    """按 customers 的当前数据重建 customer_stats 汇总表"""
+    require_stats()
+    CustomerStat.rebuild()
+    db.session.commit()
+    counts = CustomerStat.read()
+    click.echo(f"Rebuilt customer_stats: {counts['total']} customers, "
+               f"{sum(len(counts[dimension]) for dimension in CustomerStat.DIMENSIONS)} groups")
+
+
+@customer_cli.command('check-stats')
+@click.option('--repair', is_flag=True, help='不一致时重建汇总表')
+def check_stats(repair):
+    """
+    检查 customer_stats 汇总表与 customers 是否一致
+
+    在同一个读事务中读取汇总表并扫描 customers，列出不一致的计数，不一致时以非 0 状态退出（--repair 时重建）。
+    """
+    require_stats()
+    summary = CustomerStat.read()
+    actual = Customer.scan_stats()
+    db.session.rollback()
+
+    differences = []
+    if summary['total'] != actual['total']:
+        differences.append(('total', '', summary['total'], actual['total']))
+    for dimension in CustomerStat.DIMENSIONS:
+        for value in sorted(set(summary[dimension]) | set(actual[dimension])):
+            if summary[dimension][value] != actual[dimension][value]:
+                differences.append((dimension, value, summary[dimension][value], actual[dimension][value]))
+
+    if not differences:
+        click.echo(f"customer_stats is consistent ({actual['total']} customers)")
+        return
+    for dimension, value, expected, found in differences:
+        click.echo(f'{dimension}={value}: summary {expected}, customers {found}')
+    if repair:
+        CustomerStat.rebuild()
+        db.session.commit()
+        click.echo(f'Repaired {len(differences)} counts')
+        return
+    raise click.ClickException(f'{len(differences)} counts differ, run with --repair or rebuild-stats')
@@ -29,6 +29,7 @@ from .dept import Dept
 from .emp import Emp
 from .bonus import Bonus
 from .salgrade import Salgrade
+from .customer_stat import CustomerStat
 from .customer import Customer
 
-__all__ = ['User', 'Role', 'Menu', 'Dept', 'Emp', 'Bonus', 'Salgrade', 'Customer']
+__all__ = ['User', 'Role', 'Menu', 'Dept', 'Emp', 'Bonus', 'Salgrade', 'Customer', 'CustomerStat']
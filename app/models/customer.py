@@ -1,27 +1,87 @@
+import re
+from collections import Counter
 from app import db
+from app.models.customer_stat import CustomerStat
+from app.utils.count_cache import CountCache
 from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+# 列表接口总数和客户统计的缓存，客户数据提交后失效，ttl 在 create_app 中按配置设置
+customer_counts = CountCache()
+
+# FTS5 外部内容表，由迁移 2620e56f72b5 创建（c5d2e8a41f96 改为 trigram 分词），通过触发器与 customers 同步（只有 SQLite）
+customers_fts = db.table('customers_fts', db.column('rowid'))
+# 各数据库引擎上是否有迁移中用 SQL 创建的对象: (engine, 类型, 名称) -> bool
+_sqlite_objects = {}
+
+
+def _sqlite_has(type_, name):
+    """当前数据库是否为 SQLite 且有指定的表或触发器"""
+    engine = db.engine
+    key = (engine, type_, name)
+    exists = _sqlite_objects.get(key)
+    if exists is None:
+        exists = engine.dialect.name == 'sqlite' and db.session.execute(
+            db.text('SELECT 1 FROM sqlite_master WHERE type = :type AND name = :name'),
+            {'type': type_, 'name': name}
+        ).first() is not None
+        _sqlite_objects[key] = exists
+    return exists
+
 
 class Customer(db.Model):
     """客户表"""
     __tablename__ = 'customers'
+    __table_args__ = (
+        # 列表接口中和 status 组合使用的过滤条件；前两列服务 status + credit_rating 过滤，
+        # 四列一起让 get_stats 一次扫描这个覆盖索引完成分组统计
+        db.Index('ix_customers_status_rating_city_industry', 'status', 'credit_rating', 'city', 'industry'),
+        db.Index('ix_customers_status_city', 'status', 'city'),
+        db.Index('ix_customers_status_industry', 'status', 'industry'),
+        # 按 status 过滤时游标分页的排序
+        db.Index('ix_customers_status_company_name', 'status', 'company_name'),
+        db.Index('ix_customers_status_last_modified', 'status', 'last_modified'),
+    )
     
     customer_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    company_name = db.Column(db.String(100), nullable=False)
+    company_name = db.Column(db.String(100), nullable=False, unique=True, index=True)
     contact_name = db.Column(db.String(50))
     contact_title = db.Column(db.String(50))
     phone = db.Column(db.String(20))
     email = db.Column(db.String(100))
     address = db.Column(db.String(200))
-    city = db.Column(db.String(50))
+    city = db.Column(db.String(50), index=True)
     country = db.Column(db.String(50))
     credit_limit = db.Column(db.Numeric(12, 2))
-    credit_rating = db.Column(db.String(10))
+    credit_rating = db.Column(db.String(10), index=True)
     created_date = db.Column(db.DateTime, default=datetime.utcnow)
-    last_modified = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    status = db.Column(db.String(10), default='ACTIVE')
-    industry = db.Column(db.String(50))
+    last_modified = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    status = db.Column(db.String(10), default='ACTIVE', index=True)
+    industry = db.Column(db.String(50), index=True)
     annual_revenue = db.Column(db.Numeric(15, 2))
     employee_count = db.Column(db.Integer)
+
+    # 键集分页支持的排序列
+    KEYSET_SORTS = ('customer_id', 'company_name', 'last_modified')
+    # 列表接口的过滤条件
+    FILTERS = ('status', 'credit_rating', 'city', 'industry', 'search')
+    # 修改后会影响过滤结果行数的列
+    FILTER_COLUMNS = ('status', 'credit_rating', 'city', 'industry', 'company_name', 'contact_name')
+    # 估算总数时抽样的主键区间数
+    ESTIMATE_WINDOWS = 4
+    # 搜索结果排序时 company_name、contact_name 的 bm25 权重
+    SEARCH_WEIGHTS = (2.0, 1.0)
+    # trigram 分词器能匹配的最短的词（字符数），更短的词用 LIKE 匹配
+    FTS_MIN_TERM = 3
+    # 流式导出 CSV 的列，与 to_dict 的键顺序相同
+    EXPORT_COLUMNS = ('customer_id', 'company_name', 'contact_name', 'contact_title', 'phone', 'email', 'address',
+                      'city', 'country', 'credit_limit', 'credit_rating', 'created_date', 'last_modified', 'status',
+                      'industry', 'annual_revenue', 'employee_count')
+    # 批量修改、删除时一条语句的 IN 中最多的主键数（Oracle 的 IN 列表最多 1000 个）
+    BULK_ID_CHUNK = 1000
+    # bulk_insert 时改为按集合维护的插入触发器（迁移 2620e56f72b5、8d1c5e0b7a43 创建）
+    DEFERRED_TRIGGERS = ('customers_fts_insert', 'customer_stats_insert')
     
     def __repr__(self):
         return f'<Customer {self.company_name}>'
@@ -36,6 +96,84 @@ class Customer(db.Model):
         db.session.delete(self)
         db.session.commit()
     
+    @classmethod
+    def bulk_insert(cls, rows):
+        """
+        用一条 executemany 插入多行（在调用方的事务中执行，需要调用方提交）
+
+        rows 是列名到值的 dict，每行的列相同。SQLite 上逐行触发器的开销比插入本身还大，
+        所以先在事务中删除插入触发器，插入后用集合语句更新 customers_fts 和 customer_stats，
+        再按原来的定义重建触发器。DDL 和插入在同一个事务中，回滚时触发器一起恢复；
+        事务持有写锁，其他连接的写入仍然经过触发器。
+        """
+        session = db.session
+        deferred = []
+        if db.engine.dialect.name == 'sqlite':
+            conn = session.connection()
+            # pysqlite 只在 INSERT/UPDATE/DELETE 前自动开始事务，在这之前执行的 DDL 会立即生效
+            if not conn.connection.dbapi_connection.in_transaction:
+                conn.exec_driver_sql('BEGIN IMMEDIATE')
+            deferred = session.execute(
+                db.text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'customers' "
+                        "AND name IN :names").bindparams(db.bindparam('names', expanding=True)),
+                {'names': list(cls.DEFERRED_TRIGGERS)}
+            ).all()
+        if deferred:
+            after_id = session.scalar(db.select(db.func.max(cls.customer_id))) or 0
+            for name, sql in deferred:
+                conn.exec_driver_sql(f'DROP TRIGGER {name}')
+
+        session.execute(cls.__table__.insert(), rows)
+        # Core 语句不经过 flush，也没有映射的实体
+        session.info['customers_changed'] = True
+
+        names = {name for name, sql in deferred}
+        if 'customers_fts_insert' in names:
+            session.execute(db.text(
+                'INSERT INTO customers_fts(rowid, company_name, contact_name) '
+                'SELECT customer_id, company_name, contact_name FROM customers WHERE customer_id > :after_id'
+            ), {'after_id': after_id})
+        if 'customer_stats_insert' in names:
+            CustomerStat.add_customers(after_id)
+        for name, sql in deferred:
+            conn.exec_driver_sql(sql)
+
+    @classmethod
+    def bulk_update(cls, values, ids=None, filters=None, dry_run=False):
+        """
+        用一条 UPDATE 修改按主键列表或列表过滤条件选中的客户，同时更新 last_modified（需要调用方提交）
+
+        Returns:
+            int: 匹配的行数；dry_run 时只统计不修改
+        """
+        queries = cls.bulk_queries(ids, filters)
+        if dry_run:
+            return sum(cls._count(query) for query in queries)
+        values = dict(values, last_modified=datetime.utcnow())
+        return sum(query.update(values, synchronize_session=False) for query in queries)
+
+    @classmethod
+    def bulk_delete(cls, ids=None, filters=None, dry_run=False):
+        """
+        用一条 DELETE 删除按主键列表或列表过滤条件选中的客户（需要调用方提交）
+
+        Returns:
+            int: 匹配的行数；dry_run 时只统计不删除
+        """
+        queries = cls.bulk_queries(ids, filters)
+        if dry_run:
+            return sum(cls._count(query) for query in queries)
+        return sum(query.delete(synchronize_session=False) for query in queries)
+
+    @classmethod
+    def bulk_queries(cls, ids=None, filters=None):
+        """批量修改、删除的查询：主键列表每 BULK_ID_CHUNK 个一条，否则按 filter_query 的过滤条件"""
+        if ids is None:
+            return [cls.filter_query(**filters)]
+        ids = sorted(set(ids))
+        return [cls.query.filter(cls.customer_id.in_(ids[start:start + cls.BULK_ID_CHUNK]))
+                for start in range(0, len(ids), cls.BULK_ID_CHUNK)]
+
     @classmethod
     def get_all(cls):
         """获取所有客户"""
@@ -72,13 +210,253 @@ class Customer(db.Model):
         return cls.query.filter_by(industry=industry).all()
     
     @classmethod
-    def search_by_name(cls, keyword):
-        """通过关键词搜索客户（公司名称或联系人姓名）"""
-        return cls.query.filter(
-            (cls.company_name.contains(keyword)) |
-            (cls.contact_name.contains(keyword))
-        ).all()
-    
+    def search_by_name(cls, keyword, limit=None):
+        """
+        通过关键词搜索客户（公司名称或联系人姓名）
+
+        有全文索引时每个词按子串匹配，结果按 bm25 相关度排序；否则使用包含匹配，按 customer_id 排序。
+        """
+        query = cls.search_query(keyword)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    @classmethod
+    def search_query(cls, keyword):
+        """search_by_name 的查询，流式导出时分批读取"""
+        terms = cls.search_terms(keyword) if cls.fts_enabled() else []
+        match = cls.fts_query(terms)
+        if match:
+            fts = db.literal_column('customers_fts')
+            return cls.query.join(customers_fts, customers_fts.c.rowid == cls.customer_id) \
+                .filter(fts.op('MATCH')(match), *cls.short_term_conditions(terms)) \
+                .order_by(db.func.bm25(fts, *cls.SEARCH_WEIGHTS), cls.customer_id)
+        return cls.query.filter(cls.search_condition(keyword)).order_by(cls.customer_id)
+
+    @classmethod
+    def filter_query(cls, status=None, credit_rating=None, city=None, industry=None, search=None):
+        """按列表接口的过滤条件构造查询"""
+        query = cls.query
+        if status:
+            query = query.filter_by(status=status)
+        if credit_rating:
+            query = query.filter_by(credit_rating=credit_rating)
+        if city:
+            query = query.filter_by(city=city)
+        if industry:
+            query = query.filter_by(industry=industry)
+        if search:
+            query = query.filter(cls.search_condition(search))
+        return query
+
+    @classmethod
+    def search_condition(cls, keyword):
+        """
+        列表接口 search 参数的过滤条件
+
+        有全文索引时每个词都要出现在公司名称或联系人中：不少于 FTS_MIN_TERM 个字符的词通过全文索引匹配，
+        更短的词（如两个字的中文词）用 LIKE 匹配。没有全文索引时整个关键词用 LIKE 包含匹配。
+        """
+        terms = cls.search_terms(keyword) if cls.fts_enabled() else []
+        if not terms:
+            return (cls.company_name.contains(keyword)) | (cls.contact_name.contains(keyword))
+        conditions = cls.short_term_conditions(terms)
+        match = cls.fts_query(terms)
+        if match:
+            matched = db.select(customers_fts.c.rowid).where(db.literal_column('customers_fts').op('MATCH')(match))
+            conditions.insert(0, cls.customer_id.in_(matched))
+        return db.and_(*conditions)
+
+    @classmethod
+    def fts_enabled(cls):
+        """当前数据库是否有 customers_fts 全文索引（SQLite 且已执行迁移）"""
+        return _sqlite_has('table', 'customers_fts')
+
+    @classmethod
+    def stats_enabled(cls):
+        """
+        当前数据库是否有触发器维护的 customer_stats 汇总表（SQLite 且已执行迁移）
+
+        检查触发器而不是表：create_all() 也会建表，但没有触发器时表中的计数不会更新。
+        """
+        return _sqlite_has('trigger', 'customer_stats_insert')
+
+    @staticmethod
+    def search_terms(keyword):
+        """把关键词切分成词，字母、数字（包括中文）以外的字符都是分隔符"""
+        return re.findall(r'[^\W_]+', keyword)
+
+    @classmethod
+    def fts_query(cls, terms):
+        """
+        把词转成 FTS5 查询：trigram 分词器按子串匹配（不区分大小写），多个词需要同时出现
+
+        短于 FTS_MIN_TERM 个字符的词 trigram 无法匹配，不放入查询；没有可用的词时返回空字符串。
+        """
+        return ' AND '.join(f'"{term}"' for term in terms if len(term) >= cls.FTS_MIN_TERM)
+
+    @classmethod
+    def short_term_conditions(cls, terms):
+        """短于 FTS_MIN_TERM 个字符的词的 LIKE 条件，每个词出现在公司名称或联系人中"""
+        return [(cls.company_name.contains(term)) | (cls.contact_name.contains(term))
+                for term in terms if len(term) < cls.FTS_MIN_TERM]
+
+    @classmethod
+    def get_stats(cls, top=10):
+        """
+        客户统计：总数、各状态、各信用评级的数量，以及数量最多的城市和行业
+
+        有汇总表时读取 customer_stats，开销只与分组数有关；否则用 scan_stats 扫描，
+        结果和列表总数一样缓存在 customer_counts 中，客户数据提交后失效。
+        """
+        if cls.stats_enabled():
+            counts = CustomerStat.read()
+        else:
+            cached = customer_counts.get(('stats',))
+            if cached is not None:
+                counts = cached[0]
+            else:
+                generation = customer_counts.begin()
+                counts = cls.scan_stats()
+                customer_counts.set(('stats',), counts, generation)
+
+        def ranked(counter):
+            return sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:top]
+
+        return {
+            'total': counts['total'],
+            'status': counts['status'],
+            'credit_rating': counts['credit_rating'],
+            'top_cities': ranked(counts['city']),
+            'top_industries': ranked(counts['industry'])
+        }
+
+    @classmethod
+    def scan_stats(cls):
+        """
+        从 customers 直接统计，返回与 CustomerStat.read() 相同结构的计数
+
+        按 (status, credit_rating, city, industry) 分组只扫描一遍覆盖索引 ix_customers_status_rating_city_industry，
+        索引顺序与分组顺序一致，不需要排序；几百个分组在 Python 中汇总成各维度的计数。
+        """
+        columns = [getattr(cls, dimension) for dimension in CustomerStat.DIMENSIONS]
+        rows = db.session.query(*columns, db.func.count()).group_by(*columns).all()
+        counts = {dimension: Counter() for dimension in CustomerStat.DIMENSIONS}
+        counts['total'] = 0
+        for *values, count in rows:
+            counts['total'] += count
+            for dimension, value in zip(CustomerStat.DIMENSIONS, values):
+                if value is not None:
+                    counts[dimension][value] += count
+        return counts
+
+    @classmethod
+    def count_filtered(cls, filters, mode='exact', sample=10000):
+        """
+        按过滤条件统计总数
+
+        精确总数按过滤条件缓存在 customer_counts 中，客户数据提交后失效，同样的条件翻页时不再重复 COUNT。
+        estimate 优先使用已缓存的精确值，否则在几个分散的主键区间中抽样统计匹配比例，乘以表的总行数；
+        主键范围不超过 sample 时直接精确统计。
+
+        Args:
+            filters: 过滤条件，键见 FILTERS
+            mode: exact 或 estimate
+            sample: 估算时抽样的主键数
+
+        Returns:
+            tuple: (总数, 是否为估算值)
+        """
+        key = tuple((name, filters[name]) for name in cls.FILTERS if filters.get(name))
+        cached = customer_counts.get(key)
+        if cached is not None:
+            return cached[0], False
+
+        generation = customer_counts.begin()
+        query = cls.filter_query(**dict(key))
+        if mode == 'estimate' and key:
+            total = cls._estimate_count(query, sample)
+            if total is not None:
+                return total, True
+        total = cls._count(query)
+        customer_counts.set(key, total, generation)
+        return total, False
+
+    @classmethod
+    def _count(cls, query):
+        # 使用 count(*)，没有过滤条件时 SQLite 可以直接统计最小的索引
+        statement = query.statement.with_only_columns(db.func.count()).select_from(cls.__table__).order_by(None)
+        return db.session.execute(statement).scalar()
+
+    @classmethod
+    def _estimate_count(cls, query, sample):
+        """在 ESTIMATE_WINDOWS 个均匀分布的主键区间内抽样估算，主键范围太小时返回 None"""
+        key = cls.customer_id
+        # min 和 max 分开查询，SQLite 只有单独一个 min/max 时才直接读索引两端
+        low = db.session.query(db.func.min(key)).scalar()
+        high = db.session.query(db.func.max(key)).scalar()
+        if low is None or high - low + 1 <= sample:
+            return None
+        width = sample // cls.ESTIMATE_WINDOWS
+        step = (high - low + 1) // cls.ESTIMATE_WINDOWS
+        windows = db.or_(*(key.between(low + i * step, low + i * step + width - 1)
+                           for i in range(cls.ESTIMATE_WINDOWS)))
+        sampled = cls._count(cls.query.filter(windows))
+        if not sampled:
+            return None
+        matched = cls._count(query.filter(windows))
+        rows, _ = cls.count_filtered({})
+        return round(rows * matched / sampled)
+
+    @classmethod
+    def keyset_page(cls, query, sort='customer_id', descending=False, after=None, limit=20):
+        """
+        键集（游标）分页
+
+        按 (sort, customer_id) 排序，用上一页最后一行的值作为条件定位下一页，不使用 OFFSET，
+        第 N 页和第一页的开销相同。last_modified 可能为 NULL：SQLite 中 NULL 升序时排在最前，降序时排在最后。
+
+        Args:
+            query: filter_query 构造的查询
+            sort: 排序列，取值见 KEYSET_SORTS
+            descending: 是否降序
+            after: 上一页最后一行的 (排序列的值, customer_id)，为空时返回第一页
+            limit: 每页行数
+
+        Returns:
+            tuple: (本页的客户列表, 是否还有下一页)
+        """
+        column = getattr(cls, sort)
+        key = cls.customer_id
+        if after is not None:
+            value, last_id = after
+            if sort == 'customer_id':
+                query = query.filter(key < last_id if descending else key > last_id)
+            elif value is None:
+                # 上一页停在 NULL 值的行中
+                tie = key < last_id if descending else key > last_id
+                query = query.filter(db.and_(column.is_(None), tie) if descending
+                                     else db.or_(db.and_(column.is_(None), tie), column.isnot(None)))
+            elif descending:
+                condition = db.and_(column <= value, db.or_(column < value, key < last_id))
+                if cls.__table__.c[sort].nullable:
+                    condition = db.or_(condition, column.is_(None))
+                query = query.filter(condition)
+            else:
+                # column >= value 让数据库可以按索引范围扫描
+                query = query.filter(column >= value, db.or_(column > value, key > last_id))
+
+        if sort == 'customer_id':
+            order = [key.desc() if descending else key]
+        else:
+            order = [column.desc(), key.desc()] if descending else [column, key]
+        rows = query.order_by(*order).limit(limit + 1).all()
+        return rows[:limit], len(rows) > limit
+
+    def keyset_value(self, sort):
+        """本行在键集分页中的位置: (排序列的值, customer_id)"""
+        return getattr(self, sort), self.customer_id
+
     def to_dict(self):
         """转换为字典格式"""
         return {
@@ -99,4 +477,41 @@ class Customer(db.Model):
             'industry': self.industry,
             'annual_revenue': float(self.annual_revenue) if self.annual_revenue else None,
             'employee_count': self.employee_count
-        } 
\ No newline at end of file
+        }
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_customer_changes(session, flush_context):
+    """记录本事务是否改变了会影响列表总数的客户数据"""
+    if session.info.get('customers_changed'):
+        return
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Customer):
+            session.info['customers_changed'] = True
+            return
+    for obj in session.dirty:
+        if isinstance(obj, Customer):
+            attrs = inspect(obj).attrs
+            if any(attrs[name].history.has_changes() for name in Customer.FILTER_COLUMNS):
+                session.info['customers_changed'] = True
+                return
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_customer_statements(orm_execute_state):
+    """批量 insert/update/delete 语句不经过 flush"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is Customer:
+            orm_execute_state.session.info['customers_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_customer_counts(session):
+    if session.info.pop('customers_changed', False):
+        customer_counts.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_customer_changes(session):
+    session.info.pop('customers_changed', None)
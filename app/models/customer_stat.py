@@ -0,0 +1,70 @@
+from collections import Counter
+from app import db
+
+
+class CustomerStat(db.Model):
+    """
+    客户统计汇总表
+
+    每行是一个维度取值的客户数，如 ('status', 'ACTIVE', 500535)，('total', '') 是客户总数。
+    SQLite 上由 customers 的触发器在同一事务中增量维护（迁移 8d1c5e0b7a43），NULL 值不计入各维度。
+    计数减到 0 的行保留，读取时跳过，rebuild() 时清理。
+    """
+    __tablename__ = 'customer_stats'
+
+    dimension = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    # 汇总的维度，与 customers 的列同名
+    DIMENSIONS = ('status', 'credit_rating', 'city', 'industry')
+
+    def __repr__(self):
+        return f'<CustomerStat {self.dimension}={self.value}: {self.count}>'
+
+    @classmethod
+    def read(cls):
+        """
+        读取汇总表
+
+        Returns:
+            dict: {'total': 客户总数, 维度: Counter(取值 -> 客户数)}
+        """
+        counts = {dimension: Counter() for dimension in cls.DIMENSIONS}
+        counts['total'] = 0
+        for dimension, value, count in db.session.query(cls.dimension, cls.value, cls.count).filter(cls.count > 0):
+            if dimension == 'total':
+                counts['total'] = count
+            elif dimension in counts:
+                counts[dimension][value] = count
+        return counts
+
+    @classmethod
+    def rebuild(cls):
+        """按 customers 的当前数据重建汇总表（在调用方的事务中执行，需要调用方提交）"""
+        db.session.query(cls).delete()
+        db.session.execute(db.text(
+            "INSERT INTO customer_stats (dimension, value, count) SELECT 'total', '', COUNT(*) FROM customers"
+        ))
+        for dimension in cls.DIMENSIONS:
+            db.session.execute(db.text(
+                f"INSERT INTO customer_stats (dimension, value, count) "
+                f"SELECT '{dimension}', {dimension}, COUNT(*) FROM customers "
+                f"WHERE {dimension} IS NOT NULL GROUP BY {dimension}"
+            ))
+
+    @classmethod
+    def add_customers(cls, after_id):
+        """把 customer_id 大于 after_id 的客户计入汇总表（批量插入时代替逐行触发器，需要调用方提交）"""
+        db.session.execute(db.text(
+            "INSERT INTO customer_stats (dimension, value, count) "
+            "SELECT 'total', '', COUNT(*) FROM customers WHERE customer_id > :after_id "
+            "ON CONFLICT (dimension, value) DO UPDATE SET count = count + excluded.count"
+        ), {'after_id': after_id})
+        for dimension in cls.DIMENSIONS:
+            db.session.execute(db.text(
+                f"INSERT INTO customer_stats (dimension, value, count) "
+                f"SELECT '{dimension}', {dimension}, COUNT(*) FROM customers "
+                f"WHERE customer_id > :after_id AND {dimension} IS NOT NULL GROUP BY {dimension} "
+                f"ON CONFLICT (dimension, value) DO UPDATE SET count = count + excluded.count"
+            ), {'after_id': after_id})
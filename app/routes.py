@@ -1,4 +1,5 @@
 from flask import Blueprint, render_template, current_app
+from app.utils import LogRegistry
 
 routes_bp = Blueprint('routes', __name__)
  
@@ -6,4 +7,5 @@ routes_bp = Blueprint('routes', __name__)
 def log_monitor():
     """日志监控页面"""
     log_file = current_app.config.get('LOG_MONITOR_FILE', '未配置')
-    return render_template('log_monitor.html', log_file=log_file) 
\ No newline at end of file
+    sources = LogRegistry.get_sources()
+    return render_template('log_monitor.html', log_file=log_file, sources=sources) 
\ No newline at end of file
@@ -1,4 +1,4 @@
 from .user_service import UserService
+from .customer_import import CustomerImporter, ImportFormatError
 
-__all__ = ['UserService']
-
+__all__ = ['UserService', 'CustomerImporter', 'ImportFormatError']
@@ -0,0 +1,232 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Customer
+
+# 可以导入的列，其余列（customer_id、created_date、last_modified）由导入时生成
+IMPORT_FIELDS = ('company_name', 'contact_name', 'contact_title', 'phone', 'email', 'address', 'city',
+                 'country', 'credit_limit', 'credit_rating', 'status', 'industry', 'annual_revenue',
+                 'employee_count')
+DECIMAL_FIELDS = ('credit_limit', 'annual_revenue')
+INTEGER_FIELDS = ('employee_count',)
+TEXT_FIELDS = tuple(field for field in IMPORT_FIELDS if field not in DECIMAL_FIELDS + INTEGER_FIELDS)
+CREDIT_RATINGS = ('A', 'B', 'C', 'D')
+STATUSES = ('ACTIVE', 'INACTIVE')
+# 查询已有公司名称时每条 IN 的最多取值数（Oracle 的 IN 列表最多 1000 个）
+LOOKUP_CHUNK = 1000
+
+
+class ImportFormatError(ValueError):
+    """请求体无法继续读取（CSV 表头缺少列、编码错误等），已提交的批次保留"""
+
+    def __init__(self, message, line=None):
+        super().__init__(message)
+        self.line = line
+
+
+def read_csv(stream):
+    """
+    逐行读取 CSV 请求体，第一行是列名
+
+    Yields:
+        (行号, dict, None)；列名以外的列忽略
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    try:
+        if not reader.fieldnames or 'company_name' not in reader.fieldnames:
+            raise ImportFormatError('CSV header must contain company_name', 1)
+        for row in reader:
+            yield reader.line_num, row, None
+    except csv.Error as e:
+        raise ImportFormatError(f'Unable to read CSV: {e}', reader.line_num + 1)
+    except UnicodeDecodeError as e:
+        # 按块解码，出错的位置不能对应到行号
+        raise ImportFormatError(f'Request body is not valid UTF-8: {e}')
+
+
+def read_ndjson(stream):
+    """
+    逐行读取 NDJSON 请求体，每行一个 JSON 对象，空行跳过
+
+    Yields:
+        (行号, dict, None)，或者该行无法解析时 (行号, None, 错误信息)
+    """
+    try:
+        for line_no, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8-sig'), 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f'Invalid JSON: {e}'
+                continue
+            if not isinstance(data, dict):
+                yield line_no, None, 'Row must be a JSON object'
+                continue
+            yield line_no, data, None
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(f'Request body is not valid UTF-8: {e}')
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+class CustomerImporter:
+    """
+    批量导入客户
+
+    按批校验和写入：每批用一次 IN 查询找出已存在的公司名称，不通过校验的行记录错误后跳过，
+    其余行用 Customer.bulk_insert 插入并提交，一批失败不影响已提交的批次。
+    """
+
+    def __init__(self, batch_size=10000, max_errors=1000):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.total = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, records):
+        """
+        导入 read_csv/read_ndjson 读出的记录
+
+        Returns:
+            dict: 读取行数、导入行数、失败行数和每行的错误（最多 max_errors 条）
+        """
+        batch = []
+        for line, data, error in records:
+            self.total += 1
+            if error:
+                self.add_error(line, None, error)
+                continue
+            batch.append((line, data))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        return self.summary()
+
+    def summary(self):
+        return {
+            'total': self.total,
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': sorted(self.errors, key=lambda error: error['line'] or 0),
+            'errors_truncated': self.failed > len(self.errors)
+        }
+
+    def add_error(self, line, company_name, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'company_name': company_name, 'error': message})
+
+    def import_batch(self, batch):
+        """校验、去重并插入一批记录，提交后返回"""
+        now = datetime.utcnow()
+        rows = []
+        for line, data in batch:
+            row, error = self.validate(data)
+            if error:
+                self.add_error(line, data.get('company_name'), error)
+                continue
+            row['created_date'] = now
+            row['last_modified'] = now
+            rows.append((line, row))
+
+        # 第一次查询后其他请求仍可能插入同名客户，唯一索引冲突时重新查询一次
+        for attempt in range(2):
+            rows = self.remove_duplicates(rows)
+            if not rows:
+                return
+            try:
+                Customer.bulk_insert([row for line, row in rows])
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                if attempt:
+                    raise
+                continue
+            self.imported += len(rows)
+            return
+
+    def remove_duplicates(self, rows):
+        """去掉与已有客户或本批前面的行公司名称重复的行"""
+        names = list({row['company_name'] for line, row in rows})
+        existing = set()
+        for start in range(0, len(names), LOOKUP_CHUNK):
+            existing.update(db.session.scalars(
+                db.select(Customer.company_name).where(Customer.company_name.in_(names[start:start + LOOKUP_CHUNK]))
+            ))
+
+        unique = []
+        for line, row in rows:
+            name = row['company_name']
+            if name in existing:
+                self.add_error(line, name, f'Company name {name} already exists')
+                continue
+            existing.add(name)
+            unique.append((line, row))
+        return unique
+
+    @staticmethod
+    def validate(data):
+        """
+        按创建客户接口的规则校验一行，空字符串视为未填写
+
+        Returns:
+            (插入的行, None)，或者 (None, 错误信息)
+        """
+        row = {}
+        for field in IMPORT_FIELDS:
+            value = data.get(field)
+            if value.__class__ is not str:
+                if isinstance(value, (dict, list)):
+                    return None, f'{field} must be a scalar value'
+            elif not value:
+                value = None
+            row[field] = value
+
+        if not row['company_name']:
+            return None, 'Company name cannot be empty'
+        if row['credit_rating'] is not None and row['credit_rating'] not in CREDIT_RATINGS:
+            return None, 'Credit rating must be A, B, C or D'
+        if row['status'] is None:
+            row['status'] = 'ACTIVE'
+        elif row['status'] not in STATUSES:
+            return None, 'Status must be ACTIVE or INACTIVE'
+
+        for field in DECIMAL_FIELDS:
+            value = row[field]
+            if value is None:
+                continue
+            try:
+                if isinstance(value, bool):
+                    raise InvalidOperation
+                value = Decimal(str(value))
+            except InvalidOperation:
+                return None, f'{field} must be a number'
+            if not value.is_finite():
+                return None, f'{field} must be a number'
+            row[field] = value
+        for field in INTEGER_FIELDS:
+            value = row[field]
+            if value is None:
+                continue
+            try:
+                if isinstance(value, (bool, float)):
+                    raise ValueError
+                row[field] = int(value)
+            except ValueError:
+                return None, f'{field} must be an integer'
+        for field in TEXT_FIELDS:
+            if row[field] is not None:
+                row[field] = str(row[field])
+        return row, None
@@ -1,7 +1,5 @@
-import time
-import threading
 from flask import current_app
-from app.utils import LogMonitor
+from app.utils import run_blocking, LogMonitor, LogRegistry, LogFilter, LogLineIndex, log_hub, parse_interval, parse_max_lines
 from flask_socketio import emit, disconnect
 import socketio
 
@@ -10,13 +8,6 @@ class LogNamespace:
     
     def __init__(self, socketio):
         self.socketio = socketio
-        self.threads = {}
-        self.stop_events = {}
-        self.app = None
-        
-        # 保存应用实例引用（稍后在线程中使用）
-        if current_app:
-            self.app = current_app._get_current_object()
         
         # 注册事件处理函数
         @socketio.on('connect', namespace='/logs')
@@ -26,90 +17,83 @@ class LogNamespace:
         @socketio.on('disconnect', namespace='/logs')
         def handle_disconnect():
             print('客户端断开连接 - 日志监控')
-            # 停止该客户端的监控线程
+            # 取消该客户端的订阅
             client_id = get_client_id()
             self.stop_log_monitor(client_id)
         
         @socketio.on('start_log_monitor', namespace='/logs')
         def handle_start_monitor(data):
             client_id = get_client_id()
-            max_lines = data.get('max_lines')
-            interval = data.get('interval')
-            self.start_log_monitor(client_id, max_lines, interval)
-            return {'status': 'success', 'message': '开始监控日志'}
+            source = data.get('source')
+            log_source = LogRegistry.get_source(source)
+            if log_source is None:
+                return {'status': 'error', 'message': f'日志源不存在: {source}'}
+            try:
+                log_filter = LogFilter.from_params(data)
+                max_lines = parse_max_lines(data.get('max_lines'))
+                interval = parse_interval(data.get('interval'))
+            except ValueError as e:
+                return {'status': 'error', 'message': str(e)}
+            room = self.start_log_monitor(client_id, log_source, max_lines, interval, log_filter)
+            return {'status': 'success', 'message': '开始监控日志', 'room': room}
         
         @socketio.on('stop_log_monitor', namespace='/logs')
-        def handle_stop_monitor():
+        def handle_stop_monitor(data=None):
             client_id = get_client_id()
-            self.stop_log_monitor(client_id)
+            source = (data or {}).get('source')
+            self.stop_log_monitor(client_id, source)
             return {'status': 'success', 'message': '停止监控日志'}
         
         @socketio.on('get_log', namespace='/logs')
         def handle_get_log(data):
-            max_lines = data.get('max_lines')
-            log_data = LogMonitor.get_log_content(max_lines)
+            source = data.get('source')
+            log_source = LogRegistry.get_source(source)
+            if log_source is None:
+                return {'status': 'error', 'message': f'日志源不存在: {source}'}
+            try:
+                log_filter = LogFilter.from_params(data)
+                max_lines = parse_max_lines(data.get('max_lines'))
+            except ValueError as e:
+                return {'status': 'error', 'message': str(e)}
+            log_data = run_blocking(LogMonitor.get_log_content, max_lines, log_source.path, log_filter)
+            log_data['source'] = log_source.name
             return log_data
     
-    def start_log_monitor(self, client_id, max_lines=None, interval=None):
-        """启动日志监控线程"""
-        # 如果已有监控线程，先停止
-        self.stop_log_monitor(client_id)
-        
-        # 创建停止事件
-        stop_event = threading.Event()
-        self.stop_events[client_id] = stop_event
+        @socketio.on('get_log_range', namespace='/logs')
+        def handle_get_log_range(data):
+            """跳转到第 start_line 行并读取 count 行"""
+            source = data.get('source')
+            log_source = LogRegistry.get_source(source)
+            if log_source is None:
+                return {'status': 'error', 'message': f'日志源不存在: {source}'}
+            try:
+                start_line = int(data.get('start_line', 0))
+                count = min(int(data.get('count', 100)), current_app.config.get('LOG_MONITOR_RANGE_MAX_COUNT', 5000))
+                index = run_blocking(LogLineIndex.get, log_source.path)
+                log_range = run_blocking(index.read_range, start_line, count)
+            except (TypeError, ValueError, OSError) as e:
+                return {'status': 'error', 'message': f'读取日志失败: {str(e)}'}
+            log_range['source'] = log_source.name
+            return log_range
+    
+    def start_log_monitor(self, client_id, log_source, max_lines=None, interval=None, log_filter=None):
+        """
+        订阅日志源的共享监控线程
         
-        # 创建并启动监控线程
-        log_thread = threading.Thread(
-            target=self._log_monitor_worker,
-            args=(client_id, stop_event, max_lines, interval)
-        )
-        log_thread.daemon = True
-        log_thread.start()
+        客户端加入该日志源（及过滤条件）的房间，先收到自己的快照，之后与其他客户端共享同一份 append/reset 事件。
+        事件经过每个客户端自己的发送队列，客户端确认（ack）上一个事件后才发送下一个，期间的更新会被合并。
+        一个客户端可以同时订阅多个日志源。
         
-        self.threads[client_id] = log_thread
-    
-    def stop_log_monitor(self, client_id):
-        """停止日志监控线程"""
-        if client_id in self.stop_events:
-            self.stop_events[client_id].set()
-            if client_id in self.threads:
-                # 等待线程结束，但不阻塞太久
-                self.threads[client_id].join(timeout=0.5)
-                del self.threads[client_id]
-            del self.stop_events[client_id]
+        Returns:
+            str: 客户端加入的房间名
+        """
+        print(f"开始监控日志源: {log_source.name} ({log_source.path})")
+        watcher, _ = log_hub.subscribe(log_source, client_id, 'socket', max_lines, interval, log_filter=log_filter)
+        return watcher.room_for(log_filter)
     
-    def _log_monitor_worker(self, client_id, stop_event, max_lines=None, interval=None):
-        """日志监控线程工作函数"""
-        if not self.app:
-            print("警告: 没有有效的应用实例，无法监控日志")
-            return
-            
-        # 使用应用上下文
-        with self.app.app_context():
-            if interval is None:
-                interval = current_app.config.get('LOG_MONITOR_UPDATE_INTERVAL', 5)
-            
-            log_file = current_app.config.get('LOG_MONITOR_FILE')
-            print(f"开始监控日志文件: {log_file}")
-            
-            # 先发送一次日志数据
-            try:
-                log_data = LogMonitor.get_log_content(max_lines)
-                self.socketio.emit('log_update', log_data, namespace='/logs', to=client_id)
-                
-                while not stop_event.is_set():
-                    # 检查日志文件是否有变化
-                    new_log_data = LogMonitor.get_log_content(max_lines)
-                    if new_log_data['file_size'] != log_data['file_size']:
-                        self.socketio.emit('log_update', new_log_data, namespace='/logs', to=client_id)
-                        log_data = new_log_data
-                    
-                    # 等待一段时间
-                    stop_event.wait(interval)
-            except Exception as e:
-                print(f"日志监控错误: {str(e)}")
-                self.socketio.emit('log_error', {'error': str(e)}, namespace='/logs', to=client_id)
+    def stop_log_monitor(self, client_id, source=None):
+        """取消订阅（不指定日志源时取消全部），日志源没有订阅者时其监控线程随之停止"""
+        log_hub.unsubscribe(client_id, source)
 
 def get_client_id():
     """获取当前客户端的ID"""
@@ -6,9 +6,35 @@ from .tokens import (
 
 from .message import to_dict_msg
 
+from .green import green_threads, run_blocking, iter_blocking
+
 from .auth import login_required
 
-from .log_monitor import LogMonitor
+from .pagination import encode_cursor, decode_cursor
+
+from .count_cache import CountCache
+
+from .log_monitor import LogMonitor, LogCursor
+
+from .log_filter import LogFilter
+
+from .log_index import LogLineIndex
+
+from .log_search import SearchQuery, LogSearch
+
+from .log_window import TimestampParser, LogWindow
+
+from .log_json import FieldQuery, JsonLogIndex, JsonLogSearch
+
+from .log_rotation import LogSegment, LogRotationSet
+
+from .log_download import LogDownload
+
+from .log_sources import LogSource, LogRegistry
+
+from .log_metrics import LogMetrics
+
+from .log_hub import SubscriberQueue, LogHub, log_hub, parse_interval, parse_max_lines
 
 __all__ = [
     'generate_auth_token',
@@ -16,5 +42,32 @@ __all__ = [
     'get_token_expiration',
     'login_required',
     'to_dict_msg',
-    'LogMonitor'
+    'encode_cursor',
+    'decode_cursor',
+    'CountCache',
+    'green_threads',
+    'run_blocking',
+    'iter_blocking',
+    'LogMonitor',
+    'LogCursor',
+    'LogSource',
+    'LogRegistry',
+    'LogFilter',
+    'LogLineIndex',
+    'SearchQuery',
+    'LogSearch',
+    'TimestampParser',
+    'LogWindow',
+    'FieldQuery',
+    'JsonLogIndex',
+    'JsonLogSearch',
+    'LogSegment',
+    'LogRotationSet',
+    'LogDownload',
+    'LogMetrics',
+    'SubscriberQueue',
+    'LogHub',
+    'log_hub',
+    'parse_interval',
+    'parse_max_lines'
 ]
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CountCache:
+    """
+    查询结果行数的缓存
+
+    按过滤条件缓存 COUNT 的结果，写入时调用 invalidate() 让所有缓存失效（递增代数，不逐个删除）。
+    ttl 用于兜底其他进程或直接写库造成的变化；超过 capacity 个条件时淘汰最久未使用的。
+    """
+
+    def __init__(self, ttl=60, capacity=1024):
+        """
+        Args:
+            ttl: 缓存有效期(秒)
+            capacity: 最多缓存的条件数
+        """
+        self.ttl = ttl
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Returns:
+            tuple | None: (行数, 缓存时的代数)，不存在或已失效时返回 None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] != self.generation or time.monotonic() - entry[2] > self.ttl:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def begin(self):
+        """开始计数前调用，返回当前代数，传给 set() 以免缓存计数期间已被写入改变的结果"""
+        with self.lock:
+            return self.generation
+
+    def set(self, key, value, generation):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = (value, generation, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def invalidate(self):
+        """数据已改变，之前缓存的所有行数都失效"""
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'generation': self.generation,
+                'hits': self.hits,
+                'misses': self.misses
+            }
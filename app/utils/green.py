@@ -0,0 +1,55 @@
+import contextvars
+import threading
+from itertools import islice
+
+try:
+    from eventlet import patcher, tpool
+except ImportError:
+    patcher = tpool = None
+
+
+def green_threads():
+    """threading 等标准库模块是否已被 eventlet 替换成绿色线程版本（见 run.py）"""
+    return patcher is not None and patcher.is_monkey_patched('thread')
+
+
+def run_blocking(func, *args, **kwargs):
+    """
+    执行阻塞的文件读取
+
+    使用绿色线程时交给 eventlet 的 tpool 原生线程池执行，当前绿色线程让出，
+    事件循环继续处理其他连接；否则直接调用。func 在复制的上下文中执行，可以使用 current_app。
+    func 中不能使用绿色线程的锁、条件变量等同步原语。
+    """
+    if green_threads():
+        return tpool.execute(contextvars.copy_context().run, func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def iter_blocking(iterator, batch_size=100):
+    """
+    逐条产生阻塞的生成器（如日志搜索）的结果
+
+    每批最多 batch_size 条结果在 run_blocking 中取出，扫描文件时事件循环不被阻塞。
+    """
+    iterator = iter(iterator)
+    while True:
+        batch = run_blocking(_take, iterator, batch_size)
+        yield from batch
+        if len(batch) < batch_size:
+            return
+
+
+def _take(iterator, count):
+    return list(islice(iterator, count))
+
+
+def native_lock(reentrant=False):
+    """
+    创建原生线程锁，用于在 run_blocking 中访问的共享数据（如日志索引缓存）
+
+    monkey_patch 之后 threading.Lock 是绿色线程的锁，不能在 tpool 的原生线程中等待；
+    原生锁只阻塞等待它的 tpool 线程，所以持有这种锁的代码只能在 run_blocking 中执行。
+    """
+    module = patcher.original('threading') if green_threads() else threading
+    return module.RLock() if reentrant else module.Lock()
@@ -0,0 +1,189 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+
+# inotify 事件掩码（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# 文件本身的写入、截断、移动和删除
+FILE_MASK = IN_MODIFY | IN_ATTRIB | IN_MOVE_SELF | IN_DELETE_SELF
+# 所在目录中出现同名新文件（logrotate 之后重新创建）
+DIR_MASK = IN_CREATE | IN_MOVED_TO
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+    """加载 libc 中的 inotify 函数，非 Linux 或不支持时返回 None"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+class FileNotifier:
+    """
+    等待单个文件发生变化
+
+    Linux 上通过 inotify 在文件被写入、移动、删除或同名文件重新创建时立即唤醒；
+    inotify 不可用时 wait() 退化为可被 wake() 打断的定时等待，由调用方继续轮询。
+    每次 select 返回可读后只读取一次：eventlet 替换后的 os.read 遇到 EAGAIN 时会等待而不是抛出异常，
+    没有读完的事件会让下一次 wait() 立即返回。
+    """
+
+    def __init__(self, path, enabled=True):
+        """
+        Args:
+            path: 要监听的文件路径
+            enabled: 是否尝试启用 inotify
+        """
+        self.path = os.path.abspath(path) if path else path
+        self.fd = None
+        self.file_wd = None
+        self.dir_wd = None
+        self.inode = None
+        self._wake_r, self._wake_w = os.pipe()
+        # wake() 可能在监控线程已经 close() 之后才被调用，不能写入已关闭（或被复用）的描述符
+        self._close_lock = threading.Lock()
+        self._closed = False
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+
+        if enabled and _libc is not None and self.path:
+            fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self.fd = fd
+                self._watch_dir()
+                self._watch_file()
+
+    @property
+    def active(self):
+        """inotify 是否在工作"""
+        return self.fd is not None
+
+    def wait(self, timeout=None):
+        """
+        阻塞直到文件发生变化、被 wake() 唤醒或超时
+
+        Returns:
+            bool: 是否收到了文件变化事件
+        """
+        fds = [self._wake_r] if self.fd is None else [self._wake_r, self.fd]
+        try:
+            readable, _, _ = select.select(fds, [], [], timeout)
+        except InterruptedError:
+            return False
+
+        if self._wake_r in readable:
+            self._drain(self._wake_r)
+        if self.fd is not None and self.fd in readable:
+            return self._read_events()
+        return False
+
+    def wake(self):
+        """从其他线程唤醒 wait()"""
+        with self._close_lock:
+            if self._closed:
+                return
+            try:
+                os.write(self._wake_w, b'x')
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        """关闭 inotify 和唤醒管道"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            for fd in (self.fd, self._wake_r, self._wake_w):
+                if fd is not None:
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
+            self.fd = None
+
+    def _watch_dir(self):
+        directory = os.path.dirname(self.path)
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(directory), DIR_MASK)
+        self.dir_wd = wd if wd >= 0 else None
+
+    def _watch_file(self):
+        """监听路径当前对应的文件；文件被轮转后换成新文件"""
+        try:
+            inode = os.stat(self.path).st_ino
+        except OSError:
+            inode = None
+        if inode == self.inode and self.file_wd is not None:
+            return
+
+        if self.file_wd is not None:
+            _libc.inotify_rm_watch(self.fd, self.file_wd)
+            self.file_wd = None
+        self.inode = inode
+        if inode is not None:
+            wd = _libc.inotify_add_watch(self.fd, os.fsencode(self.path), FILE_MASK)
+            self.file_wd = wd if wd >= 0 else None
+
+    def _read_events(self):
+        """读取并解析所有待处理事件，返回是否与监听的文件有关"""
+        changed = False
+        rewatch = False
+        name = os.path.basename(self.path)
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return False
+            raise
+
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, pos)
+            event_name = data[pos + _EVENT_HEADER.size:pos + _EVENT_HEADER.size + length].rstrip(b'\0')
+            pos += _EVENT_HEADER.size + length
+
+            if wd == self.dir_wd:
+                if os.fsdecode(event_name) == name:
+                    changed = rewatch = True
+            elif wd == self.file_wd:
+                changed = True
+                if mask & IN_IGNORED:
+                    # 内核已经移除了这个 watch
+                    self.file_wd = None
+                if mask & (IN_MOVE_SELF | IN_DELETE_SELF | IN_IGNORED):
+                    rewatch = True
+
+        if rewatch:
+            self._watch_file()
+        return changed
+
+    @staticmethod
+    def _drain(fd):
+        try:
+            os.read(fd, 4096)
+        except BlockingIOError:
+            pass
@@ -0,0 +1,144 @@
+import os
+import zlib
+from urllib.parse import quote
+from flask import current_app, request
+from werkzeug.wsgi import FileWrapper, wrap_file
+from app.utils.green import run_blocking
+
+# 压缩的轮转文件原样下载时的 Content-Type
+CODEC_MIMETYPES = {
+    '.gz': 'application/gzip',
+    '.bz2': 'application/x-bzip2',
+    '.xz': 'application/x-xz',
+}
+
+
+class BoundedFileWrapper(FileWrapper):
+    """
+    只读取到 end 字节偏移的 FileWrapper
+
+    Werkzeug 自带的 FileWrapper 一直读到 EOF，而日志文件在下载过程中还在增长，
+    开发服务器和 eventlet 都不会按 Content-Length 截断，多出的内容会破坏响应。
+    """
+
+    def __init__(self, file, end, buffer_size=8192):
+        super().__init__(file, buffer_size)
+        self.end = end
+
+    def __next__(self):
+        remaining = self.end - self.file.tell()
+        if remaining <= 0:
+            raise StopIteration()
+        data = run_blocking(self.file.read, min(self.buffer_size, remaining))
+        if data:
+            return data
+        raise StopIteration()
+
+
+class LogDownload:
+    """
+    日志文件下载
+
+    以打开文件时 fstat 得到的大小为准，之后追加的内容不在本次下载范围内。
+    ETag 由 inode、大小和修改时间组成，支持 If-None-Match / If-Modified-Since 和 Range（含 If-Range），
+    由 Werkzeug 的 make_conditional 处理。
+
+    完整下载优先交给 WSGI 服务器的 wsgi.file_wrapper（gunicorn 用 sendfile(2) 按 Content-Length 发送，
+    不经过 Python 缓冲区）；配置了 USE_X_SENDFILE 或 LOG_MONITOR_X_ACCEL_PREFIX 时直接交给前端服务器发送。
+    其余情况按块读取，内存占用不超过一个块；eventlet 下每块的读取和压缩在 tpool 中执行。
+    """
+
+    @staticmethod
+    def etag(file_stats):
+        return f'{file_stats.st_ino:x}-{file_stats.st_size:x}-{file_stats.st_mtime_ns:x}'
+
+    @staticmethod
+    def send(path, download_name, codec=None, compress=False):
+        """
+        发送文件
+
+        Args:
+            path: 文件路径
+            download_name: 下载的文件名
+            codec: 压缩的轮转文件的后缀（.gz、.bz2、.xz），原样发送
+            compress: 是否边读边压缩成 gzip 流（不支持 Range，没有 Content-Length）
+
+        Returns:
+            Response
+
+        Raises:
+            OSError: 文件无法打开
+            RequestedRangeNotSatisfiable: Range 超出文件大小
+        """
+        config = current_app.config
+        chunk_size = config.get('LOG_MONITOR_DOWNLOAD_CHUNK', 1024 * 1024)
+        f = open(path, 'rb')
+        try:
+            file_stats = os.fstat(f.fileno())
+            etag = LogDownload.etag(file_stats)
+            if compress and not codec:
+                rv = current_app.response_class(
+                    LogDownload._gzip_stream(f, file_stats.st_size, chunk_size,
+                                             config.get('LOG_MONITOR_DOWNLOAD_GZIP_LEVEL', 6)),
+                    mimetype='application/gzip', direct_passthrough=True
+                )
+                rv.call_on_close(f.close)
+                LogDownload._set_headers(rv, download_name + '.gz', etag + '-gzip', file_stats)
+                return rv.make_conditional(request.environ)
+
+            mimetype = CODEC_MIMETYPES.get(codec, 'text/plain')
+            x_accel_prefix = config.get('LOG_MONITOR_X_ACCEL_PREFIX')
+            if x_accel_prefix or config.get('USE_X_SENDFILE'):
+                # 由前端服务器（nginx / Apache / lighttpd）直接发送文件
+                f.close()
+                rv = current_app.response_class(mimetype=mimetype)
+                if x_accel_prefix:
+                    rv.headers['X-Accel-Redirect'] = x_accel_prefix.rstrip('/') + quote(os.path.abspath(path))
+                else:
+                    rv.headers['X-Sendfile'] = os.path.abspath(path)
+                LogDownload._set_headers(rv, download_name, etag, file_stats)
+                return rv.make_conditional(request.environ)
+
+            if 'HTTP_RANGE' not in request.environ and 'wsgi.file_wrapper' in request.environ:
+                data = wrap_file(request.environ, f, chunk_size)
+            else:
+                # Range 需要可 seek 的迭代器，服务器的 file_wrapper 不一定支持
+                data = BoundedFileWrapper(f, file_stats.st_size, chunk_size)
+            rv = current_app.response_class(data, mimetype=mimetype, direct_passthrough=True)
+            rv.call_on_close(f.close)
+            rv.content_length = file_stats.st_size
+            rv.headers['Accept-Ranges'] = 'bytes'
+            LogDownload._set_headers(rv, download_name, etag, file_stats)
+            return rv.make_conditional(request.environ, accept_ranges=True,
+                                       complete_length=file_stats.st_size)
+        except BaseException:
+            f.close()
+            raise
+
+    @staticmethod
+    def _set_headers(rv, download_name, etag, file_stats):
+        rv.headers.set('Content-Disposition', 'attachment', filename=download_name)
+        rv.set_etag(etag)
+        rv.last_modified = int(file_stats.st_mtime)
+        # 每次都向服务器确认，文件没有变化时返回 304
+        rv.cache_control.no_cache = True
+
+    @staticmethod
+    def _gzip_stream(f, size, chunk_size, level):
+        """按块读取到 size 字节并压缩成 gzip 格式，每次只保留一个块"""
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        remaining = size
+        while remaining > 0:
+            data, compressed = run_blocking(LogDownload._read_compressed, f, compressor,
+                                            min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    @staticmethod
+    def _read_compressed(f, compressor, size):
+        data = f.read(size)
+        return data, compressor.compress(data) if data else b''
@@ -0,0 +1,109 @@
+import hashlib
+import re
+from functools import lru_cache
+
+# 日志级别从低到高，WARN/FATAL 等别名与对应级别同级
+LOG_LEVELS = [
+    ('DEBUG', 'TRACE'),
+    ('INFO', 'NOTICE'),
+    ('WARNING', 'WARN'),
+    ('ERROR', 'ERR'),
+    ('CRITICAL', 'FATAL', 'ALERT', 'EMERG'),
+]
+
+
+class LogFilter:
+    """
+    服务端日志行过滤器
+
+    在增量读取时按正则、最低日志级别、固定子串和排除模式过滤日志行，
+    只有匹配的行才会被序列化发送。相同参数的过滤器通过 LogFilter.get 共享同一个已编译实例。
+    """
+
+    def __init__(self, regex=None, level=None, contains=None, exclude=()):
+        self.regex = regex or None
+        self.level = level.upper() if level else None
+        self.contains = contains or None
+        self.exclude = tuple(exclude)
+
+        try:
+            self._regex = re.compile(self.regex) if self.regex else None
+            self._exclude = re.compile('|'.join(f'(?:{p})' for p in self.exclude)) if self.exclude else None
+        except re.error as e:
+            raise ValueError(f'无效的正则表达式: {e}')
+        self._level = self._compile_level(self.level) if self.level else None
+
+        self.key = hashlib.sha1(repr(self.params()).encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def get(regex=None, level=None, contains=None, exclude=()):
+        """获取（并缓存）已编译的过滤器，参数相同的订阅者共享同一个实例"""
+        return LogFilter(regex, level, contains, tuple(exclude))
+
+    @staticmethod
+    def from_params(params):
+        """
+        从请求参数创建过滤器
+
+        Args:
+            params: request.args 或 Socket.IO 事件数据，支持 regex、level、contains、exclude
+
+        Returns:
+            LogFilter | None: 没有任何过滤条件时返回 None
+        """
+        if hasattr(params, 'getlist'):
+            exclude = params.getlist('exclude')
+        else:
+            exclude = params.get('exclude') or []
+            if isinstance(exclude, str):
+                exclude = [exclude]
+        if not isinstance(exclude, (list, tuple)) or not all(isinstance(p, str) for p in exclude):
+            raise ValueError('exclude 必须是字符串或字符串列表')
+        exclude = tuple(p for p in exclude if p)
+
+        # Socket.IO 事件数据可能是任意 JSON 类型
+        regex = params.get('regex') or None
+        level = params.get('level') or None
+        contains = params.get('contains') or None
+        for name, value in (('regex', regex), ('level', level), ('contains', contains)):
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f'{name} 必须是字符串')
+        if not (regex or level or contains or exclude):
+            return None
+        return LogFilter.get(regex, level.upper() if level else None, contains, exclude)
+
+    def params(self):
+        return {
+            'regex': self.regex,
+            'level': self.level,
+            'contains': self.contains,
+            'exclude': list(self.exclude)
+        }
+
+    def match(self, line):
+        """判断一行（str 或 bytes 解码后的文本）是否满足过滤条件"""
+        if self.contains and self.contains not in line:
+            return False
+        if self._level and not self._level.search(line):
+            return False
+        if self._regex and not self._regex.search(line):
+            return False
+        if self._exclude and self._exclude.search(line):
+            return False
+        return True
+
+    def apply(self, content):
+        """过滤多行文本，返回只包含匹配行的文本"""
+        if not content:
+            return content
+        return ''.join(line for line in content.splitlines(keepends=True) if self.match(line))
+
+    @staticmethod
+    def _compile_level(level):
+        """编译匹配指定级别及更高级别的正则"""
+        for index, names in enumerate(LOG_LEVELS):
+            if level in names:
+                accepted = [name for group in LOG_LEVELS[index:] for name in group]
+                return re.compile(r'\b(?:' + '|'.join(accepted) + r')\b')
+        raise ValueError(f'无效的日志级别: {level}')
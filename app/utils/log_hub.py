@@ -0,0 +1,739 @@
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from app.utils.log_monitor import LogCursor
+from app.utils.inotify import FileNotifier
+from app.utils.log_metrics import LogMetrics
+from app.utils.green import green_threads, run_blocking
+
+
+def parse_interval(value):
+    """
+    解析订阅者请求的轮询间隔(秒)，需要在应用上下文中调用
+
+    同一日志源的订阅者共享一个监控线程，间隔限制在 [LOG_MONITOR_MIN_INTERVAL, LOG_MONITOR_MAX_INTERVAL] 之内，
+    一个订阅者不能让监控线程为所有订阅者忙轮询。
+
+    Returns:
+        float | None: 未指定时返回 None（使用默认间隔）
+
+    Raises:
+        ValueError: 不是正数
+    """
+    if value is None or value == '':
+        return None
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        interval = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'interval 必须是正数: {value!r}')
+    if not interval > 0:
+        raise ValueError(f'interval 必须是正数: {value!r}')
+    config = current_app.config
+    return min(max(interval, config.get('LOG_MONITOR_MIN_INTERVAL', 1)), config.get('LOG_MONITOR_MAX_INTERVAL', 60))
+
+
+def parse_max_lines(value):
+    """
+    解析 Socket.IO 客户端请求的快照行数（整数或整数字符串，0 表示整个文件）
+
+    Returns:
+        int | None: 未指定时返回 None（使用配置中的值）
+
+    Raises:
+        ValueError: 不是非负整数
+    """
+    if value is None or value == '':
+        return None
+    try:
+        if isinstance(value, (bool, float)):
+            raise TypeError
+        max_lines = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'max_lines 必须是非负整数: {value!r}')
+    if max_lines < 0:
+        raise ValueError(f'max_lines 必须是非负整数: {value!r}')
+    return max_lines
+
+
+class SubscriberQueue:
+    """
+    单个订阅者的有界发送队列
+
+    每个订阅者同一时间最多只有一个事件在发送中：Socket.IO 订阅者收到确认（ack）之后才发送下一个，
+    SSE 订阅者由请求线程取走。客户端跟不上时，待发送的 append 事件合并成一个批次；
+    合并后的内容超过 max_pending 个字符时丢弃最早的行，并在事件中用 skipped 记录丢弃的行数。
+    reset/snapshot 事件会替换掉之前所有待发送的事件。因此慢客户端占用的内存和延迟都有上限，
+    也不会影响其他订阅者。
+    """
+
+    def __init__(self, max_pending=256 * 1024, ack_timeout=30, send=None):
+        """
+        Args:
+            max_pending: 待发送内容的最大字符数
+            ack_timeout: 等待 Socket.IO 确认的最长时间(秒)，超时后视为已确认
+            send: 发送函数 send(event, ack)，为空时由 get() 取走事件（SSE）
+        """
+        self.max_pending = max_pending
+        self.ack_timeout = ack_timeout
+        self.send = send
+        self.cond = threading.Condition()
+        self.pending = None
+        self.in_flight = False
+        self.sent_at = None
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped_lines = 0
+        self.ack_timeouts = 0
+        self.max_depth = 0
+
+    @staticmethod
+    def from_config():
+        """按配置创建队列，需要在应用上下文中调用"""
+        config = current_app.config
+        return SubscriberQueue(config.get('LOG_MONITOR_SUBSCRIBER_MAX_PENDING', 256 * 1024),
+                               config.get('LOG_MONITOR_ACK_TIMEOUT', 30))
+
+    @property
+    def depth(self):
+        """待发送内容的字符数"""
+        pending = self.pending
+        return len(pending.get('content') or '') if pending else 0
+
+    def put(self, event):
+        """加入一个事件，客户端空闲时立即发送，否则与待发送的事件合并"""
+        with self.cond:
+            if self.pending is None:
+                self.pending = event
+            else:
+                self.pending = self._merge(self.pending, event)
+            self.max_depth = max(self.max_depth, self.depth)
+            self.cond.notify()
+
+            if self.send is None:
+                return
+            if self.in_flight:
+                if time.monotonic() - self.sent_at < self.ack_timeout:
+                    return
+                # 客户端长时间没有确认，不再等待
+                self.ack_timeouts += 1
+            event = self._take()
+        self.send(event, self.ack)
+
+    def get(self, timeout=None):
+        """
+        取走合并后的待发送事件（SSE）
+
+        Returns:
+            dict | None: 超时时返回 None
+        """
+        with self.cond:
+            if self.pending is None:
+                self.cond.wait(timeout)
+            if self.pending is None:
+                return None
+            event = self._take()
+            self.in_flight = False
+            return event
+
+    def ack(self, *args):
+        """客户端确认收到上一个事件，有待发送的事件时立即发送"""
+        with self.cond:
+            self.in_flight = False
+            if self.pending is None or self.send is None:
+                return
+            event = self._take()
+        self.send(event, self.ack)
+
+    def stats(self):
+        with self.cond:
+            return {
+                'depth': self.depth,
+                'max_depth': self.max_depth,
+                'in_flight': self.in_flight,
+                'lag_ms': round((time.monotonic() - self.sent_at) * 1000, 1) if self.in_flight else 0,
+                'delivered': self.delivered,
+                'coalesced': self.coalesced,
+                'dropped_lines': self.dropped_lines,
+                'ack_timeouts': self.ack_timeouts
+            }
+
+    def _take(self):
+        event = self.pending
+        self.pending = None
+        self.in_flight = True
+        self.sent_at = time.monotonic()
+        self.delivered += 1
+        return event
+
+    def _merge(self, pending, event):
+        """把新事件合并到待发送的事件中"""
+        if event['type'] != 'append' or not pending.get('exists', True):
+            # reset/snapshot 包含完整的尾部内容，之前待发送的事件已经没有意义
+            return event
+
+        merged = dict(event)
+        merged['type'] = pending['type']
+        if 'reason' in pending:
+            merged['reason'] = pending['reason']
+        merged['content'] = pending['content'] + event['content']
+        skipped = pending.get('skipped', 0) + event.get('skipped', 0)
+        self.coalesced += 1
+
+        content = merged['content']
+        if len(content) > self.max_pending:
+            # 只保留最新的 max_pending 个字符（从完整的行开始）
+            cut = content.find('\n', len(content) - self.max_pending) + 1 or len(content) - self.max_pending
+            dropped = content.count('\n', 0, cut)
+            merged['content'] = content[cut:]
+            skipped += dropped
+            self.dropped_lines += dropped
+        if skipped:
+            merged['skipped'] = skipped
+        return merged
+
+
+class LogWatcher:
+    """
+    单个日志源的共享监控线程
+
+    每个日志源只有一个线程和一个游标，文件变化只读取一次，
+    然后广播给 Socket.IO 房间和所有 SSE 订阅者。
+    Linux 上由 inotify 事件唤醒，轮询只作为兜底。
+    eventlet monkey_patch 之后线程由 socketio.start_background_task 启动，是绿色线程，
+    读取文件通过 run_blocking 交给 tpool，不阻塞事件循环；否则是普通的守护线程。
+    """
+
+    def __init__(self, socketio, source, cursor, interval, notifier,
+                 fallback_interval=60, debounce=0.05, metrics=None, metrics_push_interval=5,
+                 metrics_catchup_bytes=64 * 1024 * 1024):
+        self.socketio = socketio
+        self.source = source
+        self.log_file = source.path
+        self.cursor = cursor
+        self.default_interval = interval
+        self.notifier = notifier
+        self.fallback_interval = fallback_interval
+        self.debounce = debounce
+        self.room = source.room
+        self.lock = threading.RLock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.running = False
+        # 订阅者: sub_id -> {'kind': 'socket' | 'sse', 'queue': SubscriberQueue, 'interval': 秒, 'filter': LogFilter | None}
+        self.subscribers = {}
+        self.started_at = datetime.now()
+        self.polls = 0
+        self.reads = 0
+        self.events = 0
+        self.wakeups = 0
+        self.poll_time = 0.0
+        # 滚动统计，由新增的内容增量更新
+        self.metrics = metrics or LogMetrics()
+        self.metrics_push_interval = metrics_push_interval
+        self.metrics_pushed_at = 0
+        # reset 快照跳过的内容最多补充统计的字节数
+        self.metrics_catchup_bytes = metrics_catchup_bytes
+        # 等待中的长轮询请求数，和 LogHub.watch 续期的截止时间（time.monotonic()）；
+        # 没有订阅者、没有等待的请求且已过期时监控线程停止
+        self.waiters = 0
+        self.lease_until = 0
+        # 监控线程发现自己空闲时的回调 on_idle(watcher)，由 LogHub 设置
+        self.on_idle = None
+        # 游标前进（或文件被轮转）时通知等待中的长轮询请求
+        self.changed = threading.Condition()
+
+    @property
+    def interval(self):
+        """
+        两次检查之间的最长等待时间
+
+        inotify 可用时使用兜底间隔，否则使用所有订阅者请求的最小轮询间隔。
+        """
+        if self.notifier.active:
+            return self.fallback_interval
+        intervals = [sub['interval'] for sub in self.subscribers.values() if sub['interval']]
+        return min(intervals) if intervals else self.default_interval
+
+    @property
+    def idle(self):
+        """没有订阅者、没有等待中的长轮询请求，且 watch 的续期已过期"""
+        return not self.subscribers and not self.waiters and time.monotonic() >= self.lease_until
+
+    def start(self):
+        """定位到文件末尾并启动监控线程"""
+        run_blocking(self.cursor.snapshot)
+        self.running = True
+        if green_threads():
+            self.thread = self.socketio.start_background_task(self._run)
+        else:
+            # 没有 monkey_patch 时 eventlet 的事件循环不会运行，绿色线程无法执行
+            self.thread = threading.Thread(target=self._run, name=f'log-watcher:{self.source.name}')
+            self.thread.daemon = True
+            self.thread.start()
+
+    def stop(self):
+        """停止监控线程，线程在下一次唤醒时退出并关闭 inotify"""
+        self.stop_event.set()
+        self.notifier.wake()
+        with self.changed:
+            self.changed.notify_all()
+
+    def room_for(self, log_filter=None):
+        """
+        订阅者所在的房间
+
+        没有过滤条件的订阅者在日志源房间中，相同过滤条件的订阅者共享房间 "log:<source>:<过滤器key>"。
+        """
+        return f'{self.room}:{log_filter.key}' if log_filter else self.room
+
+    def add(self, sub_id, kind, max_lines=None, interval=None, queue=None, log_filter=None, resume=None):
+        """
+        加入订阅者并向其发送初始快照
+
+        在锁内先处理文件上尚未广播的变化，再按订阅者自己的 max_lines 和过滤条件读取快照，
+        保证订阅者先收到快照，且快照结尾与之后广播的 append 事件首尾相接。
+        指定 resume 时（断线重连）只补发客户端错过的内容，无法续传时仍然发送快照。
+
+        Args:
+            resume: (字节偏移, inode)，客户端上次收到的事件的位置
+        """
+        with self.lock:
+            snapshot = None
+            if resume is not None:
+                self._check()
+                snapshot = self._resume(resume, max_lines, log_filter)
+            for _ in range(3 if snapshot is None else 0):
+                self._check()
+                snapshot = run_blocking(self.cursor.tail, max_lines, log_filter)
+                if snapshot is not None:
+                    break
+            if snapshot is None:
+                snapshot = self._filtered(run_blocking(self.cursor.snapshot, 'reset', 'rotated'), log_filter)
+            snapshot['source'] = self.source.name
+            if log_filter:
+                snapshot['filter'] = log_filter.key
+
+            if interval and interval < self.interval:
+                # 订阅者要求更短的轮询间隔，让监控线程按新的间隔重新等待
+                self.notifier.wake()
+            if kind == 'socket':
+                self.socketio.server.enter_room(sub_id, self.room_for(log_filter), namespace='/logs')
+                queue.send = self._sender(sub_id)
+            self.subscribers[sub_id] = {'kind': kind, 'queue': queue, 'interval': interval, 'filter': log_filter}
+            if snapshot['type'] != 'append' or snapshot['content']:
+                queue.put(snapshot)
+            return snapshot
+
+    def _resume(self, resume, max_lines, log_filter):
+        """
+        读取客户端上次收到的位置到监控游标之间的内容
+
+        Returns:
+            dict | None: append 事件，结尾与之后广播的事件首尾相接；无法续传时返回 None
+        """
+        offset, inode = resume
+        cursor = LogCursor(self.log_file, max_lines, self.cursor.block_size, self.cursor.max_delta_bytes)
+        event = run_blocking(cursor.since, offset, inode, self.cursor.offset)
+        self.cursor.bytes_read += cursor.bytes_read
+        if event['type'] != 'append' or event['inode'] != self.cursor.inode or event['offset'] != self.cursor.offset:
+            return None
+        event = self._filtered(event, log_filter)
+        event['resumed'] = True
+        return event
+
+    def wait_for(self, offset, inode, timeout):
+        """
+        等待游标越过 offset（或文件被轮转、监控线程停止），用于长轮询
+
+        Returns:
+            bool: 超时前有变化时返回 True
+        """
+        deadline = time.monotonic() + timeout
+        with self.changed:
+            while self.cursor.inode == inode and self.cursor.offset <= offset and not self.stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.changed.wait(remaining)
+        return True
+
+    def _sender(self, sub_id):
+        """向单个 Socket.IO 客户端发送事件并等待确认"""
+        def send(event, ack):
+            self.socketio.emit('log_update', event, namespace='/logs', to=sub_id, callback=ack)
+        return send
+
+    def remove(self, sub_id):
+        """移除订阅者，返回剩余订阅者数量"""
+        with self.lock:
+            sub = self.subscribers.pop(sub_id, None)
+            if sub and sub['kind'] == 'socket':
+                self.socketio.server.leave_room(sub_id, self.room_for(sub['filter']), namespace='/logs')
+            return len(self.subscribers)
+
+    def broadcast(self, event):
+        """
+        把同一个事件放入所有订阅者的发送队列
+
+        订阅者按过滤条件分组，每组只过滤一次，过滤后没有内容的 append 事件不发送。
+        每个订阅者的队列各自决定立即发送还是与待发送的事件合并，慢客户端不会阻塞监控线程。
+        """
+        self.events += 1
+        event['source'] = self.source.name
+
+        groups = {}
+        for sub in self.subscribers.values():
+            log_filter = sub['filter']
+            group = groups.setdefault(log_filter.key if log_filter else None,
+                                      {'filter': log_filter, 'queues': []})
+            group['queues'].append(sub['queue'])
+
+        for group in groups.values():
+            payload = self._filtered(event, group['filter'])
+            if payload['type'] == 'append' and not payload['content']:
+                continue
+            for queue in group['queues']:
+                queue.put(payload)
+
+    @staticmethod
+    def _filtered(event, log_filter):
+        """返回按过滤条件过滤内容后的事件副本"""
+        if not log_filter:
+            return event
+        payload = dict(event)
+        if event.get('exists', True):
+            payload['content'] = log_filter.apply(event['content'])
+        payload['filter'] = log_filter.key
+        return payload
+
+    def stats(self):
+        """订阅者数量和读取开销统计"""
+        with self.lock:
+            kinds = [sub['kind'] for sub in self.subscribers.values()]
+            filters = {sub['filter'].key for sub in self.subscribers.values() if sub['filter']}
+            queues = {sub_id: dict(sub['queue'].stats(), kind=sub['kind'])
+                      for sub_id, sub in self.subscribers.items()}
+            return {
+                'source': self.source.name,
+                'file_path': self.log_file,
+                'room': self.room,
+                'socket_subscribers': kinds.count('socket'),
+                'sse_subscribers': kinds.count('sse'),
+                'filters': len(filters),
+                'interval': self.interval,
+                'inotify': self.notifier.active,
+                'wakeups': self.wakeups,
+                'offset': self.cursor.offset,
+                'polls': self.polls,
+                'reads': self.reads,
+                'bytes_read': self.cursor.bytes_read,
+                'events': self.events,
+                'avg_poll_ms': round(self.poll_time / self.polls * 1000, 3) if self.polls else 0,
+                'queue_depth': sum(queue['depth'] for queue in queues.values()),
+                'dropped_lines': sum(queue['dropped_lines'] for queue in queues.values()),
+                'queues': queues,
+                'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+                'waiters': self.waiters,
+                'lease_remaining': max(round(self.lease_until - time.monotonic()), 0),
+                'alive': self.running
+            }
+
+    def _check(self):
+        """检查一次文件变化，有变化时广播"""
+        start = time.perf_counter()
+        offset, inode = self.cursor.offset, self.cursor.inode
+        event = run_blocking(self.cursor.poll)
+        self.polls += 1
+        self.poll_time += time.perf_counter() - start
+        if event:
+            self.reads += 1
+            self._update_metrics(event, offset, inode)
+            self._push_metrics()
+            self.broadcast(event)
+            with self.changed:
+                self.changed.notify_all()
+
+    def _update_metrics(self, event, offset, inode):
+        """
+        用新增的内容更新滚动统计
+
+        reset 快照只包含尾部的行：溢出时按块重新读取上次位置到游标之间的内容；轮转时先读取旧文件
+        （按 inode 查找重命名后的文件）中上次位置之后写入的内容，再读取新文件开头到游标之间的内容。
+        无法读取的内容（截断前写入的行、已被压缩或删除的旧文件、超过 metrics_catchup_bytes 的部分）
+        把当前分钟标记为不完整。
+
+        Args:
+            offset: poll 之前游标的字节偏移
+            inode: poll 之前游标的 inode，文件不存在时为 None
+        """
+        if event['type'] == 'append':
+            self.metrics.update(event['content'])
+            return
+
+        reason = event.get('reason')
+        budget = [self.metrics_catchup_bytes]
+        complete = True
+        if reason == 'overflow':
+            complete = self._catch_up(offset, self.cursor.offset, None, inode, budget)
+        else:
+            if inode is not None:
+                # 截断（copytruncate）前写入的行在复制出的文件中，无法确定是哪个文件
+                path = run_blocking(self.cursor.rotated_path, inode) if reason != 'truncated' else None
+                complete = path is not None and self._catch_up(offset, None, path, inode, budget)
+            if event['exists']:
+                complete = self._catch_up(0, self.cursor.offset, None, event['inode'], budget) and complete
+        if not complete:
+            self.metrics.mark_incomplete()
+
+    def _catch_up(self, start, end, path, inode, budget):
+        """
+        按块读取 [start, end) 的完整行并计入统计，每块最多 max_delta_bytes 字节
+
+        Returns:
+            bool: 全部读取时返回 True，文件已不存在或超出 budget（剩余可读取的字节数）时返回 False
+        """
+        while start is not None and (end is None or start < end):
+            if budget[0] <= 0:
+                return False
+            content, next_start = run_blocking(self.cursor.read_range, start, end, path, inode)
+            if content is None:
+                return False
+            if next_start is not None:
+                budget[0] -= next_start - start
+            self.metrics.update(content)
+            start = next_start
+        return True
+
+    def _push_metrics(self):
+        """最多每 metrics_push_interval 秒向 Socket.IO 订阅者推送一次精简统计"""
+        now = time.monotonic()
+        if now - self.metrics_pushed_at < self.metrics_push_interval:
+            return
+        rooms = {self.room_for(sub['filter']) for sub in self.subscribers.values() if sub['kind'] == 'socket'}
+        if not rooms:
+            return
+        self.metrics_pushed_at = now
+        payload = self.metrics.compact()
+        payload['source'] = self.source.name
+        for room in rooms:
+            self.socketio.emit('log_stats', payload, namespace='/logs', to=room)
+
+    def _emit_error(self, error):
+        """向日志源房间和所有过滤条件的房间发送 log_error"""
+        with self.lock:
+            rooms = {self.room} | {self.room_for(sub['filter']) for sub in self.subscribers.values()
+                                   if sub['kind'] == 'socket'}
+        for room in rooms:
+            self.socketio.emit('log_error', {'error': str(error), 'source': self.source.name},
+                               namespace='/logs', to=room)
+
+    def _run(self):
+        """监控线程工作函数"""
+        try:
+            while not self.stop_event.is_set():
+                if self.notifier.wait(self.interval):
+                    self.wakeups += 1
+                    # 短暂合并连续写入产生的事件，避免每次 write 都广播一次
+                    if self.debounce:
+                        self.stop_event.wait(self.debounce)
+                if self.stop_event.is_set():
+                    break
+                try:
+                    with self.lock:
+                        self._check()
+                except Exception as e:
+                    print(f"日志监控错误: {str(e)}")
+                    self._emit_error(e)
+                if self.on_idle and self.idle:
+                    # watch 的续期过期后由 LogHub 停止
+                    self.on_idle(self)
+        except Exception as e:
+            # 线程退出后由 LogHub._watcher 在下一次订阅时替换
+            print(f"日志监控线程异常退出: {str(e)}")
+        finally:
+            self.running = False
+            self.notifier.close()
+
+
+class LogHub:
+    """日志订阅中心，保证每个日志源只有一个 LogWatcher"""
+
+    def __init__(self, socketio=None):
+        self.socketio = socketio
+        self.lock = threading.Lock()
+        # 日志源名称 -> LogWatcher
+        self.watchers = {}
+        # 订阅者订阅的日志源: sub_id -> {日志源名称}
+        self.subscriptions = {}
+
+    def init_app(self, app, socketio):
+        self.socketio = socketio
+        app.extensions['log_hub'] = self
+
+    def subscribe(self, source, sub_id, kind='socket', max_lines=None, interval=None, queue=None, log_filter=None,
+                  resume=None):
+        """
+        订阅日志源，需要在应用上下文中调用
+
+        同一订阅者可以同时订阅多个日志源，重复订阅同一日志源时按新参数重新订阅。
+
+        Args:
+            source: LogSource 日志源
+            sub_id: 订阅者ID（Socket.IO 的 sid 或 SSE 请求生成的ID）
+            kind: socket 订阅者加入房间接收事件，sse 订阅者通过 queue 接收事件
+            max_lines: 初始快照的最大行数
+            interval: 期望的轮询间隔(秒)
+            queue: SubscriberQueue 发送队列，SSE 订阅者从中取事件；为空时按配置创建
+            log_filter: LogFilter 过滤器，只发送匹配的行
+            resume: (字节偏移, inode)，断线重连时只补发之后的内容
+
+        Returns:
+            tuple: (LogWatcher, 初始快照事件)
+        """
+        self.unsubscribe(sub_id, source.name)
+        if queue is None:
+            queue = SubscriberQueue.from_config()
+
+        with self.lock:
+            watcher = self._watcher(source)
+            snapshot = watcher.add(sub_id, kind, max_lines, interval, queue, log_filter, resume)
+            self.subscriptions.setdefault(sub_id, set()).add(source.name)
+            return watcher, snapshot
+
+    def watch(self, source, lease=None):
+        """
+        监控日志源至少 lease 秒（没有订阅者时也不停止），用于滚动统计，需要在应用上下文中调用
+
+        每次调用都重新续期，过期且没有订阅者时监控线程停止。
+
+        Args:
+            lease: 续期的秒数，默认使用配置中的 LOG_MONITOR_STATS_LEASE
+
+        Returns:
+            LogWatcher: 日志源的监控线程
+        """
+        if lease is None:
+            lease = current_app.config.get('LOG_MONITOR_STATS_LEASE', 600)
+        with self.lock:
+            watcher = self._watcher(source)
+            watcher.lease_until = max(watcher.lease_until, time.monotonic() + lease)
+            return watcher
+
+    def wait_for(self, source, offset, inode, timeout):
+        """
+        长轮询：等待日志源的游标越过 offset，需要在应用上下文中调用
+
+        等待期间作为临时订阅者保持监控线程运行，结束后没有其他订阅者时停止监控线程。
+
+        Returns:
+            bool: 超时前有变化时返回 True
+        """
+        with self.lock:
+            watcher = self._watcher(source)
+            watcher.waiters += 1
+        try:
+            return watcher.wait_for(offset, inode, timeout)
+        finally:
+            with self.lock:
+                watcher.waiters -= 1
+                self._release(watcher)
+
+    def _watcher(self, source):
+        """获取日志源的监控线程，不存在时创建并启动，线程已异常退出时由新的监控线程接管"""
+        watcher = self.watchers.get(source.name)
+        if watcher is None:
+            watcher = self._create(source)
+            watcher.start()
+            self.watchers[source.name] = watcher
+        elif not watcher.running and not watcher.stop_event.is_set():
+            watcher = self._replace(watcher)
+        return watcher
+
+    def _replace(self, old):
+        """
+        用新的监控线程接管异常退出的监控线程的订阅者和统计
+
+        线程退出期间的变化没有广播，所以向所有订阅者发送 reset 快照（reason 为 restarted）重新同步。
+        """
+        watcher = self._create(old.source, old.metrics)
+        watcher.lease_until = old.lease_until
+        with old.lock:
+            watcher.subscribers = old.subscribers
+            old.subscribers = {}
+        old.stop()
+        watcher.start()
+        self.watchers[old.source.name] = watcher
+        with watcher.lock:
+            watcher.broadcast(run_blocking(watcher.cursor.snapshot, 'reset', 'restarted'))
+        return watcher
+
+    def _create(self, source, metrics=None):
+        """按配置创建（未启动的）监控线程"""
+        config = current_app.config
+        watcher = LogWatcher(
+            self.socketio,
+            source,
+            LogCursor(source.path),
+            config.get('LOG_MONITOR_UPDATE_INTERVAL', 5),
+            FileNotifier(source.path, config.get('LOG_MONITOR_INOTIFY', True)),
+            config.get('LOG_MONITOR_FALLBACK_INTERVAL', 60),
+            config.get('LOG_MONITOR_DEBOUNCE', 0.05),
+            metrics or LogMetrics(config.get('LOG_MONITOR_METRICS_MINUTES', 60),
+                                  config.get('LOG_MONITOR_METRICS_MESSAGES', 100)),
+            config.get('LOG_MONITOR_METRICS_PUSH_INTERVAL', 5),
+            config.get('LOG_MONITOR_METRICS_CATCHUP_BYTES', 64 * 1024 * 1024)
+        )
+        watcher.on_idle = self._on_idle
+        return watcher
+
+    def _release(self, watcher):
+        """监控线程空闲时停止并移除，需要持有 self.lock"""
+        if watcher.idle and self.watchers.get(watcher.source.name) is watcher:
+            watcher.stop()
+            del self.watchers[watcher.source.name]
+
+    def _on_idle(self, watcher):
+        with self.lock:
+            self._release(watcher)
+
+    def unsubscribe(self, sub_id, source_name=None):
+        """
+        取消订阅，日志源没有订阅者（且没有等待中的长轮询、watch 的续期已过期）时停止其监控线程
+
+        Args:
+            sub_id: 订阅者ID
+            source_name: 日志源名称，为空时取消该订阅者的所有订阅
+        """
+        with self.lock:
+            names = self.subscriptions.get(sub_id, set())
+            targets = [source_name] if source_name else list(names)
+            for name in targets:
+                if name not in names:
+                    continue
+                names.discard(name)
+                watcher = self.watchers.get(name)
+                if watcher is not None:
+                    watcher.remove(sub_id)
+                    self._release(watcher)
+            if not names:
+                self.subscriptions.pop(sub_id, None)
+
+    def stats(self):
+        """所有被监控日志源的统计信息"""
+        with self.lock:
+            watchers = list(self.watchers.values())
+            subscribers = len(self.subscriptions)
+        sources = [watcher.stats() for watcher in watchers]
+        return {
+            'watchers': len(watchers),
+            'subscribers': subscribers,
+            'queue_depth': sum(source['queue_depth'] for source in sources),
+            'dropped_lines': sum(source['dropped_lines'] for source in sources),
+            'sources': sources
+        }
+
+
+log_hub = LogHub()
@@ -0,0 +1,227 @@
+import hashlib
+import os
+import struct
+from array import array
+from bisect import bisect_right
+from flask import current_app
+from app.utils.green import native_lock
+
+
+class LogLineIndex:
+    """
+    日志文件的稀疏行偏移索引
+
+    大约每 K 行记录一个检查点（行号, 字节偏移），保存在紧凑的 array 中并持久化到旁路索引文件。
+    文件增长时只扫描新追加的字节；文件被轮转或截断时重新建立。
+    定位第 N 行只需二分查找检查点，再向前跳过不超过 K 行左右，读取一页的开销与文件大小无关。
+    """
+
+    MAGIC = b'LIDX'
+    VERSION = 1
+    # magic, version, every, inode, head_hash, indexed_to, total_lines, entries
+    HEADER = struct.Struct('<4sHIQ8sQQQ')
+    # 建立索引时每次读取的字节数，以及统计换行符的窗口大小
+    CHUNK_SIZE = 1024 * 1024
+    WINDOW_SIZE = 16 * 1024
+    # 用于确认文件没有被同 inode 的新内容替换的文件头长度
+    HEAD_SIZE = 4096
+
+    _cache = {}
+    _cache_lock = native_lock()
+
+    def __init__(self, log_file, index_path, every=1000):
+        """
+        Args:
+            log_file: 日志文件路径
+            index_path: 旁路索引文件路径，为空时只保存在内存中
+            every: 检查点间隔（行数）
+        """
+        self.log_file = log_file
+        self.index_path = index_path
+        self.every = every
+        self.lock = native_lock(reentrant=True)
+        self._reset()
+        self._load()
+
+    @staticmethod
+    def get(log_file):
+        """
+        获取日志文件的索引（进程内缓存，同一文件只有一个实例），需要在应用上下文中调用
+        """
+        with LogLineIndex._cache_lock:
+            index = LogLineIndex._cache.get(log_file)
+            if index is None:
+                config = current_app.config
+                index_dir = config.get('LOG_MONITOR_INDEX_DIR')
+                index_path = None
+                if index_dir:
+                    os.makedirs(index_dir, exist_ok=True)
+                    name = hashlib.sha1(os.path.abspath(log_file).encode('utf-8')).hexdigest()
+                    index_path = os.path.join(index_dir, f'{name}.idx')
+                index = LogLineIndex(log_file, index_path, config.get('LOG_MONITOR_INDEX_EVERY', 1000))
+                LogLineIndex._cache[log_file] = index
+            return index
+
+    def update(self):
+        """
+        把索引扩展到文件当前的最后一个完整行
+
+        Returns:
+            int: 文件中完整行的总数
+        """
+        with self.lock:
+            with open(self.log_file, 'rb') as f:
+                file_stats = os.fstat(f.fileno())
+                if (file_stats.st_ino != self.inode or file_stats.st_size < self.indexed_to
+                        or self._head_hash(f, self.indexed_to) != self.head):
+                    self._reset()
+                    self.inode = file_stats.st_ino
+
+                if file_stats.st_size > self.indexed_to:
+                    entries = len(self.offsets)
+                    self._scan(f, file_stats.st_size)
+                    self.head = self._head_hash(f, self.indexed_to)
+                    if len(self.offsets) != entries:
+                        self._save()
+            return self.total_lines
+
+    def locate(self, line):
+        """
+        返回第 line 行（从 0 开始）的起始字节偏移之前最近的检查点
+
+        Returns:
+            tuple: (检查点行号, 检查点字节偏移)
+        """
+        i = bisect_right(self.line_numbers, line) - 1
+        return self.line_numbers[i], self.offsets[i]
+
+    def read_range(self, start_line, count):
+        """
+        读取从 start_line 开始的 count 行
+
+        Args:
+            start_line: 起始行号（从 0 开始），负数表示从末尾倒数
+            count: 行数
+
+        Returns:
+            dict: start_line、end_line（不含）、total_lines 和 content
+        """
+        with self.lock:
+            total_lines = self.update()
+            if start_line < 0:
+                start_line = max(total_lines + start_line, 0)
+            start_line = min(start_line, total_lines)
+            count = max(min(count, total_lines - start_line), 0)
+            line, offset = self.locate(start_line)
+
+        lines = []
+        if count:
+            with open(self.log_file, 'rb') as f:
+                f.seek(offset)
+                for _ in range(start_line - line):
+                    f.readline()
+                for _ in range(count):
+                    lines.append(f.readline())
+
+        return {
+            'start_line': start_line,
+            'end_line': start_line + count,
+            'total_lines': total_lines,
+            'content': b''.join(lines).decode('utf-8', errors='replace').replace('\r\n', '\n')
+        }
+
+    def _reset(self):
+        self.inode = None
+        self.head = self._hash(b'')
+        self.indexed_to = 0
+        self.scanned_to = 0
+        self.total_lines = 0
+        self.since_checkpoint = 0
+        self.line_numbers = array('Q', [0])
+        self.offsets = array('Q', [0])
+
+    def _head_hash(self, f, length):
+        """文件已建立索引部分的开头（最多 HEAD_SIZE 字节）的摘要"""
+        f.seek(0)
+        return self._hash(f.read(min(self.HEAD_SIZE, length)))
+
+    @staticmethod
+    def _hash(data):
+        return hashlib.sha1(data).digest()[:8]
+
+    def _scan(self, f, end):
+        """从 indexed_to 扫描到 end，只统计完整行，大约每 every 行记录一个检查点"""
+        # 超过 CHUNK_SIZE 的行会有不含换行符的块：越过这些块继续读，直到行结束才推进 indexed_to；
+        # scanned_to 记录已经读过的位置，未写完的长行不会在每次更新时重新读取
+        pos = max(self.indexed_to, self.scanned_to)
+        f.seek(pos)
+        while pos < end:
+            chunk = f.read(min(self.CHUNK_SIZE, end - pos))
+            if not chunk:
+                break
+            last_newline = chunk.rfind(b'\n')
+            if last_newline < 0:
+                pos += len(chunk)
+                continue
+            limit = last_newline + 1
+
+            for start in range(0, limit, self.WINDOW_SIZE):
+                stop = min(start + self.WINDOW_SIZE, limit)
+                newlines = chunk.count(b'\n', start, stop)
+                if not newlines:
+                    continue
+                self.total_lines += newlines
+                self.since_checkpoint += newlines
+                if self.since_checkpoint >= self.every:
+                    # 检查点取窗口内最后一个换行符之后的位置
+                    self.line_numbers.append(self.total_lines)
+                    self.offsets.append(pos + chunk.rfind(b'\n', start, stop) + 1)
+                    self.since_checkpoint = 0
+
+            pos += limit
+            self.indexed_to = pos
+            f.seek(pos)
+        self.scanned_to = pos
+
+    def _load(self):
+        """从旁路索引文件加载，格式不符时忽略"""
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'rb') as f:
+                header = f.read(self.HEADER.size)
+                magic, version, every, inode, head, indexed_to, total_lines, entries = self.HEADER.unpack(header)
+                if magic != self.MAGIC or version != self.VERSION or every != self.every:
+                    return
+                line_numbers = array('Q')
+                offsets = array('Q')
+                line_numbers.frombytes(f.read(entries * 8))
+                offsets.frombytes(f.read(entries * 8))
+        except (OSError, struct.error, ValueError):
+            return
+        if len(line_numbers) != entries or len(offsets) != entries or not entries:
+            return
+
+        self.inode = inode
+        self.head = head
+        self.indexed_to = indexed_to
+        self.total_lines = total_lines
+        self.since_checkpoint = total_lines - line_numbers[-1]
+        self.line_numbers = line_numbers
+        self.offsets = offsets
+
+    def _save(self):
+        """原子地写入旁路索引文件"""
+        if not self.index_path:
+            return
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, self.every, self.inode or 0, self.head,
+                                  self.indexed_to, self.total_lines, len(self.offsets))
+        tmp_path = f'{self.index_path}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                f.write(self.line_numbers.tobytes())
+                f.write(self.offsets.tobytes())
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"保存日志索引失败: {str(e)}")
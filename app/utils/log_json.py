@@ -0,0 +1,523 @@
+import json
+import os
+import re
+from flask import current_app
+from app.utils.green import native_lock
+from app.utils.log_monitor import LogMonitor
+
+try:
+    # 可选依赖，解析速度比标准库 json 快数倍
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
+# 单个条件: 字段 运算符 值，字段支持用 "." 访问嵌套对象，值可以用引号包含空格
+CONDITION_PATTERN = re.compile(
+    r'\s*([A-Za-z_@$][\w.@$-]*)\s*(!=|>=|<=|=|>|<|~)\s*("(?:[^"\\]|\\.)*"|\'[^\']*\'|[^\s"\']+)')
+ESCAPE_PATTERN = re.compile(r'\\(["\\])')
+CONNECTOR_PATTERN = re.compile(r'\s+(AND|OR)\s+|\s*(&&|\|\|)\s*', re.IGNORECASE)
+# 可以直接在原始行中查找的值（JSON 编码后不会被转义）
+LITERAL_PATTERN = re.compile(r'[\w .:@-]+', re.ASCII)
+INTEGER_PATTERN = re.compile(r'-?\d+')
+# 选择定位候选行的字节串时统计出现次数的样本大小
+NEEDLE_SAMPLE = 64 * 1024
+
+# 记录中不存在的字段
+MISSING = object()
+
+
+def _parse_line(line):
+    """解析一行 JSON，不是 JSON 对象时返回 None"""
+    try:
+        record = json_loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def lookup(record, field):
+    """取记录中的字段值，先按完整字段名查找（如 "http.status" 本身就是键），再按 "." 分隔的嵌套路径查找"""
+    value = record.get(field, MISSING)
+    if value is not MISSING or '.' not in field:
+        return value
+    value = record
+    for key in field.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return MISSING
+        value = value[key]
+    return value
+
+
+def _index_key(value):
+    """
+    字段值在索引中的键: 字符串转小写，数字保持原值（500 与 500.0 是同一个键），
+    布尔值和 null 使用与查询值相同的字符串
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if value is None:
+        return 'null'
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, (int, float)):
+        return value
+    return MISSING
+
+
+class FieldCondition:
+    """单个字段条件，如 level=error、status>=500、message~timeout"""
+
+    def __init__(self, field, op, value):
+        self.field = field
+        self.op = op
+        self.value = value
+        self.text = value.lower()
+        try:
+            self.number = float(value)
+        except ValueError:
+            self.number = None
+        self.pattern = None
+        if op == '~':
+            try:
+                self.pattern = re.compile(value, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f'无效的正则表达式: {e}')
+
+    def match(self, record):
+        value = lookup(record, self.field)
+        if self.op == '=':
+            return self._equals(value)
+        if self.op == '!=':
+            return not self._equals(value)
+        if value is MISSING:
+            return False
+        if self.op == '~':
+            return isinstance(value, (str, int, float)) and self.pattern.search(str(value)) is not None
+        return self._compare(value)
+
+    def index_keys(self):
+        """可以与 _index_key 比较的查询值"""
+        keys = [self.text]
+        if self.number is not None:
+            keys.append(self.number)
+        return keys
+
+    def literals(self):
+        """
+        匹配的行中一定包含的字节串（小写），用于解析 JSON 之前的预过滤
+
+        Returns:
+            list: 不能确定时（如 !=、带转义字符的值、小数）不包含值的部分，只包含字段名
+        """
+        if self.op == '!=':
+            return []
+        result = []
+        # 嵌套字段只要求最后一级字段名出现，完整字段名也可能本身就是键（"http.status"）
+        key = self.field.rsplit('.', 1)[-1]
+        if LITERAL_PATTERN.fullmatch(key):
+            key = f'"{key}"' if key == self.field else f'{key}"'
+            result.append(key.lower().encode('utf-8'))
+        if (self.op == '=' and self.text and LITERAL_PATTERN.fullmatch(self.text)
+                and (self.number is None or INTEGER_PATTERN.fullmatch(self.text))):
+            result.append(self.text.encode('utf-8'))
+        return result
+
+    def _equals(self, value):
+        if isinstance(value, bool):
+            return self.text == ('true' if value else 'false')
+        if value is None:
+            return self.text == 'null'
+        if isinstance(value, str):
+            return value.lower() == self.text
+        if isinstance(value, (int, float)):
+            return self.number is not None and value == self.number
+        return False
+
+    def _compare(self, value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if self.number is None:
+                return False
+            left, right = value, self.number
+        elif isinstance(value, str):
+            # 字符串按字典序比较，适用于 ISO 8601 时间等
+            left, right = value, self.value
+        else:
+            return False
+        if self.op == '>':
+            return left > right
+        if self.op == '>=':
+            return left >= right
+        if self.op == '<':
+            return left < right
+        return left <= right
+
+    def __str__(self):
+        return f'{self.field}{self.op}{json.dumps(self.value, ensure_ascii=False)}'
+
+
+class FieldQuery:
+    """
+    JSON 日志的字段查询，如 "level=error AND service=billing"
+
+    支持 =、!=、>、>=、<、<=、~（正则），条件之间用 AND/OR（或 &&/||）连接，AND 优先于 OR，不支持括号。
+    字符串的 = 比较忽略大小写；数字按数值比较。
+    """
+
+    def __init__(self, q):
+        """
+        Raises:
+            ValueError: 查询为空或语法错误
+        """
+        q = (q or '').strip()
+        if not q:
+            raise ValueError('请提供查询条件 q')
+        self.q = q
+        # 析取范式: OR 连接的若干组，每组内的条件用 AND 连接
+        self.groups = [[]]
+        pos = 0
+        while True:
+            match = CONDITION_PATTERN.match(q, pos)
+            if not match:
+                raise ValueError(f'无效的查询条件: {q[pos:].strip()}')
+            field, op, value = match.groups()
+            if value[0] == '"':
+                # 只处理 \" 和 \\，其他反斜杠原样保留（如正则中的 \d）
+                value = ESCAPE_PATTERN.sub(r'\1', value[1:-1])
+            elif value[0] == "'":
+                value = value[1:-1]
+            self.groups[-1].append(FieldCondition(field, op, value))
+            pos = match.end()
+            if not q[pos:].strip():
+                break
+            connector = CONNECTOR_PATTERN.match(q, pos)
+            if not connector:
+                raise ValueError(f'无效的查询条件: {q[pos:].strip()}')
+            if (connector.group(1) or connector.group(2)).upper() in ('OR', '||'):
+                self.groups.append([])
+            pos = connector.end()
+
+        # 每组的预过滤字节串，有一组没有时任何行都可能匹配
+        self._literals = [[literal for condition in group for literal in condition.literals()]
+                          for group in self.groups]
+        self.prefilter_enabled = all(self._literals)
+
+    def match(self, record):
+        # 每行都会调用，避免生成器表达式的开销
+        for group in self.groups:
+            for condition in group:
+                if not condition.match(record):
+                    break
+            else:
+                return True
+        return False
+
+    def prefilter(self, line):
+        """已转为小写的原始行（bytes）是否可能匹配，不可能时不需要解析"""
+        if not self.prefilter_enabled:
+            return True
+        for literals in self._literals:
+            for literal in literals:
+                if literal not in line:
+                    break
+            else:
+                return True
+        return False
+
+    def needles(self, block):
+        """
+        用于在（转为小写的）块中定位候选行的字节串: 每组取在块开头 NEEDLE_SAMPLE 字节中出现次数最少的一个
+
+        Returns:
+            list | None: 有一组没有预过滤字节串，或者选出的字节串出现在样本中的大多数行时返回 None，
+                逐行检查比逐个查找更快
+        """
+        if not self.prefilter_enabled:
+            return None
+        sample_lines = block.count(b'\n', 0, NEEDLE_SAMPLE)
+        needles = set()
+        for literals in self._literals:
+            counts = {literal: block.count(literal, 0, NEEDLE_SAMPLE) for literal in literals}
+            needle = min(literals, key=counts.get)
+            if counts[needle] * 2 > sample_lines:
+                return None
+            needles.add(needle)
+        return sorted(needles)
+
+    def index_groups(self, fields):
+        """
+        每组中可以通过字段索引查找的 = 条件
+
+        Returns:
+            list | None: 每组的条件列表；有一组没有可用的条件时返回 None，需要检查窗口中的所有记录
+        """
+        groups = []
+        for group in self.groups:
+            indexed = [condition for condition in group if condition.op == '=' and condition.field in fields]
+            if not indexed:
+                return None
+            groups.append(indexed)
+        return groups
+
+    def params(self):
+        return {
+            'q': self.q,
+            'conditions': [[str(condition) for condition in group] for group in self.groups]
+        }
+
+
+class JsonLogIndex:
+    """
+    JSON 日志最近窗口的解析缓存和字段索引
+
+    只保留文件最后 window 条记录（不是 JSON 对象的行不计入）的解析结果；每次查询前只解析新追加的行，
+    重复查询不会再次解析同样的行。
+    对配置的字段（如 level、service）维护 值 -> 记录序号 的倒排表，等值查询直接取交集，
+    其他查询在已解析的记录上逐条判断。文件被轮转或截断时重新建立。
+    """
+
+    # 一次追加超过这个字节数时直接重新读取最后 window 行
+    MAX_APPEND = 8 * 1024 * 1024
+
+    _cache = {}
+    _cache_lock = native_lock()
+
+    def __init__(self, log_file, window=10000, fields=('level',), block_size=64 * 1024):
+        """
+        Args:
+            log_file: 日志文件路径
+            window: 保留的最近记录数
+            fields: 建立索引的字段
+            block_size: 反向读取块大小
+        """
+        self.log_file = log_file
+        self.window = window
+        self.fields = tuple(fields)
+        self.block_size = block_size
+        self.lock = native_lock(reentrant=True)
+        self.parsed_lines = 0
+        self._reset()
+
+    @staticmethod
+    def get(log_file):
+        """获取日志文件的窗口索引（进程内缓存），需要在应用上下文中调用"""
+        with JsonLogIndex._cache_lock:
+            index = JsonLogIndex._cache.get(log_file)
+            if index is None:
+                config = current_app.config
+                index = JsonLogIndex(log_file,
+                                     config.get('LOG_MONITOR_JSON_WINDOW_LINES', 10000),
+                                     config.get('LOG_MONITOR_JSON_INDEX_FIELDS') or ('level',),
+                                     config.get('LOG_MONITOR_TAIL_BLOCK_SIZE', 64 * 1024))
+                JsonLogIndex._cache[log_file] = index
+            return index
+
+    def update(self):
+        """把窗口扩展到文件当前的最后一个完整行"""
+        with self.lock:
+            with open(self.log_file, 'rb') as f:
+                file_stats = os.fstat(f.fileno())
+                size = file_stats.st_size
+                if file_stats.st_ino != self.inode or size < self.indexed_to:
+                    self._reset()
+                    self.inode = file_stats.st_ino
+                if size <= self.indexed_to:
+                    return
+                if self.indexed_to and size - self.indexed_to <= self.MAX_APPEND:
+                    f.seek(self.indexed_to)
+                    data = f.read(size - self.indexed_to)
+                    start = self.indexed_to
+                else:
+                    self._reset()
+                    self.inode = file_stats.st_ino
+                    data = LogMonitor._tail_bytes(f, size, self.window, self.block_size)
+                    start = size - len(data)
+
+            # 只处理完整行，未写完的行留给下一次
+            complete = data.rfind(b'\n') + 1
+            if complete:
+                self._ingest(data[:complete], start)
+                self.indexed_to = start + complete
+
+    def query(self, query, limit):
+        """
+        在最近窗口中查找匹配的记录
+
+        Returns:
+            dict: records（最后 limit 条匹配，从旧到新，每条包含 offset 和 record）、matches（窗口中的匹配总数）、
+                indexed（是否使用了字段索引）和窗口信息 window
+        """
+        with self.lock:
+            self.update()
+            groups = query.index_groups(self.fields)
+            if groups is None:
+                candidates = range(self.first_seq, self.next_seq)
+            else:
+                seqs = set()
+                for group in groups:
+                    seqs |= self._lookup(group)
+                candidates = sorted(seqs)
+
+            matched = [seq for seq in candidates if query.match(self._record(seq)[1])]
+            records = [{'offset': self._record(seq)[0], 'record': self._record(seq)[1]}
+                       for seq in matched[max(len(matched) - limit, 0):]]
+            return {
+                'records': records,
+                'matches': len(matched),
+                'indexed': groups is not None,
+                'candidates': len(candidates),
+                'window': self.stats()
+            }
+
+    def stats(self):
+        with self.lock:
+            return {
+                'lines': self.next_seq - self.first_seq,
+                'invalid_lines': self.invalid_lines,
+                'start_offset': self._record(self.first_seq)[0] if self.next_seq > self.first_seq else self.indexed_to,
+                'end_offset': self.indexed_to,
+                'fields': list(self.fields),
+                'parsed_lines': self.parsed_lines
+            }
+
+    def _reset(self):
+        self.inode = None
+        self.indexed_to = 0
+        # 记录序号从 0 递增；records[i] 对应序号 first_seq + i - head
+        self.records = []
+        self.head = 0
+        self.first_seq = 0
+        self.next_seq = 0
+        self.invalid_lines = 0
+        self.evicted = 0
+        self.postings = {field: {} for field in self.fields}
+
+    def _record(self, seq):
+        return self.records[self.head + seq - self.first_seq]
+
+    def _ingest(self, data, offset):
+        """解析新增的完整行，加入窗口和倒排表，并淘汰超出窗口的旧记录"""
+        pos = 0
+        for line in data.split(b'\n')[:-1]:
+            record = _parse_line(line)
+            self.parsed_lines += 1
+            if record is None:
+                self.invalid_lines += 1
+            else:
+                seq = self.next_seq
+                self.records.append((offset + pos, record))
+                self.next_seq += 1
+                for field in self.fields:
+                    key = _index_key(lookup(record, field))
+                    if key is not MISSING:
+                        self.postings[field].setdefault(key, []).append(seq)
+            pos += len(line) + 1
+
+        overflow = self.next_seq - self.first_seq - self.window
+        if overflow > 0:
+            self.head += overflow
+            self.first_seq += overflow
+            self.evicted += overflow
+            # 被淘汰的记录累计超过一个窗口时压缩列表并重建倒排表
+            if self.evicted >= self.window:
+                self._compact()
+
+    def _compact(self):
+        self.records = self.records[self.head:]
+        self.head = 0
+        self.evicted = 0
+        self.postings = {field: {} for field in self.fields}
+        for seq in range(self.first_seq, self.next_seq):
+            record = self._record(seq)[1]
+            for field in self.fields:
+                key = _index_key(lookup(record, field))
+                if key is not MISSING:
+                    self.postings[field].setdefault(key, []).append(seq)
+
+    def _lookup(self, conditions):
+        """一组 = 条件在倒排表中的交集（只包含仍在窗口中的记录）"""
+        result = None
+        for condition in conditions:
+            postings = self.postings[condition.field]
+            seqs = set()
+            for key in condition.index_keys():
+                seqs.update(postings.get(key, ()))
+            result = seqs if result is None else result & seqs
+            if not result:
+                return set()
+        return {seq for seq in result if seq >= self.first_seq}
+
+
+class JsonLogSearch:
+    """
+    在 JSON 日志的历史内容中按字段查询
+
+    先在原始字节上查找查询条件中一定出现的字段名/值（忽略大小写），只有候选行才会被解析为 JSON，
+    不满足预过滤条件的行不解析。按从旧到新的顺序产生结果，达到 limit 后立即停止。
+    """
+
+    @staticmethod
+    def scan_blocks(blocks, query, stats, base_offset=0):
+        """
+        扫描按块产生的内容，每块只包含完整行
+
+        Args:
+            blocks: 块的可迭代对象
+            query: FieldQuery 查询条件
+            stats: 统计字典，累计 bytes（扫描的字节数）、parsed（解析的行数）、invalid（不是 JSON 的候选行数）
+            base_offset: 第一块在文件中的字节偏移，为 None 时结果的 offset 为 None（压缩文件）
+
+        Yields:
+            dict: offset（行首字节偏移）和 record（解析后的 JSON 对象）
+        """
+        offset = base_offset
+        for block in blocks:
+            # bytes.lower 只转换 ASCII 字母，长度和偏移不变
+            lowered = block.lower() if query.prefilter_enabled else None
+            needles = query.needles(lowered) if lowered is not None else None
+            for line_start, line_end in JsonLogSearch._candidates(block, lowered, needles):
+                if lowered is not None and not query.prefilter(lowered[line_start:line_end]):
+                    continue
+                stats['parsed'] += 1
+                record = _parse_line(block[line_start:line_end])
+                if record is None:
+                    stats['invalid'] += 1
+                    continue
+                if query.match(record):
+                    yield {
+                        'offset': offset + line_start if offset is not None else None,
+                        'record': record
+                    }
+            stats['bytes'] += len(block)
+            if offset is not None:
+                offset += len(block)
+
+    @staticmethod
+    def _candidates(block, lowered, needles):
+        """块中包含任一 needle 的行的 (行首, 行尾) 偏移，needles 为空时产生所有行"""
+        if needles is None:
+            pos = 0
+            for line in block.split(b'\n')[:-1]:
+                end = pos + len(line)
+                yield pos, end
+                pos = end + 1
+            return
+
+        pattern = re.compile(b'|'.join(re.escape(needle) for needle in needles)) if len(needles) > 1 else None
+        end = len(lowered)
+        pos = 0
+        while pos < end:
+            if pattern is None:
+                hit = lowered.find(needles[0], pos)
+            else:
+                match = pattern.search(lowered, pos)
+                hit = match.start() if match else -1
+            if hit < 0:
+                return
+            line_start = lowered.rfind(b'\n', pos, hit) + 1 or pos
+            line_end = lowered.find(b'\n', hit)
+            if line_end < 0:
+                line_end = end
+            yield line_start, line_end
+            pos = line_end + 1
@@ -0,0 +1,179 @@
+import re
+import threading
+import time
+from datetime import datetime
+from app.utils.log_filter import LOG_LEVELS
+
+# 日志级别名称（含别名） -> 标准名称
+LEVEL_NAMES = {name: group[0] for group in LOG_LEVELS for name in group}
+LEVELS = [group[0] for group in LOG_LEVELS] + ['OTHER']
+LEVEL_PATTERN = re.compile(r'\b(' + '|'.join(LEVEL_NAMES) + r')\b')
+# 归一化消息时替换掉的可变部分：十六进制ID、数字
+VARIABLE_PATTERN = re.compile(r'\b(?:0x)?[0-9a-fA-F]{8,}\b|\d+')
+MESSAGE_LENGTH = 160
+
+
+class MetricsBucket:
+    """一分钟的统计数据"""
+
+    __slots__ = ('minute', 'lines', 'levels', 'messages', 'other_messages', 'incomplete')
+
+    def __init__(self, minute):
+        self.minute = minute
+        self.lines = 0
+        self.levels = dict.fromkeys(LEVELS, 0)
+        # (级别, 归一化消息) -> 次数，数量有上限
+        self.messages = {}
+        self.other_messages = 0
+        # 这一分钟有无法读取的内容（如截断前未读取的行），统计可能偏少
+        self.incomplete = False
+
+
+class LogMetrics:
+    """
+    日志滚动统计
+
+    固定大小的环形缓冲区，每个桶保存一分钟内各级别的行数和重复次数最多的消息（数字、十六进制ID归一化后）。
+    只根据新增的内容增量更新，不重新扫描文件；读取统计的开销只与桶的数量有关，与文件大小无关。
+    行按被读取到的时间归入对应的分钟。
+    """
+
+    def __init__(self, minutes=60, message_capacity=100):
+        """
+        Args:
+            minutes: 保留的分钟数（桶的数量）
+            message_capacity: 每个桶最多跟踪的不同消息数，超出后的新消息只计入 other_messages
+        """
+        self.minutes = minutes
+        self.message_capacity = message_capacity
+        self.buckets = [None] * minutes
+        self.lock = threading.Lock()
+        self.started_at = datetime.now()
+        self.total_lines = 0
+
+    def update(self, content, now=None):
+        """
+        统计新增的日志内容
+
+        Args:
+            content: 新增的完整行
+            now: 时间戳(秒)，默认为当前时间
+        """
+        if not content:
+            return
+        minute = int((now or time.time()) // 60)
+        with self.lock:
+            bucket = self._bucket(minute)
+            if bucket is None:
+                # 系统时间回拨，不覆盖更新的桶
+                self.total_lines += content.count('\n')
+                return
+            levels = bucket.levels
+            messages = bucket.messages
+            lines = 0
+            for line in content.splitlines():
+                lines += 1
+                match = LEVEL_PATTERN.search(line)
+                if match is None:
+                    levels['OTHER'] += 1
+                    continue
+                level = LEVEL_NAMES[match.group(1)]
+                levels[level] += 1
+
+                key = (level, VARIABLE_PATTERN.sub('#', line[match.end():].strip())[:MESSAGE_LENGTH])
+                if key in messages:
+                    messages[key] += 1
+                elif len(messages) < self.message_capacity:
+                    messages[key] = 1
+                else:
+                    bucket.other_messages += 1
+            bucket.lines += lines
+            self.total_lines += lines
+
+    def mark_incomplete(self, now=None):
+        """把当前分钟标记为不完整：有新增的内容无法读取，没有计入统计"""
+        minute = int((now or time.time()) // 60)
+        with self.lock:
+            bucket = self._bucket(minute)
+            if bucket is not None:
+                bucket.incomplete = True
+
+    def summary(self, minutes=None, top=10, now=None):
+        """
+        最近 minutes 分钟的统计
+
+        Returns:
+            dict: 每分钟的行数、各级别行数和是否不完整（从旧到新）、各级别合计和重复次数最多的 top 条消息
+        """
+        minutes = min(minutes or self.minutes, self.minutes)
+        current = int((now or time.time()) // 60)
+        series = []
+        totals = dict.fromkeys(LEVELS, 0)
+        messages = {}
+        with self.lock:
+            for minute in range(current - minutes + 1, current + 1):
+                bucket = self.buckets[minute % self.minutes]
+                if bucket is None or bucket.minute != minute:
+                    series.append({'minute': self._format(minute), 'lines': 0, 'levels': dict.fromkeys(LEVELS, 0),
+                                   'incomplete': False})
+                    continue
+                series.append({'minute': self._format(minute), 'lines': bucket.lines, 'levels': dict(bucket.levels),
+                               'incomplete': bucket.incomplete})
+                for level, count in bucket.levels.items():
+                    totals[level] += count
+                for key, count in bucket.messages.items():
+                    messages[key] = messages.get(key, 0) + count
+            total_lines = self.total_lines
+
+        top_messages = sorted(messages.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {
+            'minutes': minutes,
+            'since': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'total_lines': total_lines,
+            'levels': totals,
+            'incomplete': any(item['incomplete'] for item in series),
+            'series': series,
+            'top_messages': [{'level': level, 'message': message, 'count': count}
+                             for (level, message), count in top_messages]
+        }
+
+    def compact(self, minutes=15, now=None):
+        """
+        用于 Socket.IO 推送的精简统计
+
+        Returns:
+            dict: 当前分钟各级别的行数，以及最近 minutes 分钟每分钟的总行数和 ERROR 及以上级别的行数
+        """
+        current = int((now or time.time()) // 60)
+        lines = []
+        errors = []
+        with self.lock:
+            for minute in range(current - minutes + 1, current + 1):
+                bucket = self.buckets[minute % self.minutes]
+                if bucket is None or bucket.minute != minute:
+                    lines.append(0)
+                    errors.append(0)
+                    continue
+                lines.append(bucket.lines)
+                errors.append(bucket.levels['ERROR'] + bucket.levels['CRITICAL'])
+            bucket = self.buckets[current % self.minutes]
+            levels = dict(bucket.levels) if bucket is not None and bucket.minute == current else dict.fromkeys(LEVELS, 0)
+        return {
+            'minute': self._format(current),
+            'levels': levels,
+            'lines': lines,
+            'errors': errors
+        }
+
+    def _bucket(self, minute):
+        index = minute % self.minutes
+        bucket = self.buckets[index]
+        if bucket is None or bucket.minute < minute:
+            bucket = self.buckets[index] = MetricsBucket(minute)
+        elif bucket.minute > minute:
+            return None
+        return bucket
+
+    @staticmethod
+    def _format(minute):
+        return datetime.fromtimestamp(minute * 60).strftime('%Y-%m-%d %H:%M')
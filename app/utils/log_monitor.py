@@ -7,12 +7,14 @@ class LogMonitor:
     """日志监控类，用于读取和监控日志文件"""
     
     @staticmethod
-    def get_log_content(max_lines=None):
+    def get_log_content(max_lines=None, log_file=None, log_filter=None):
         """
         获取日志文件内容
         
         Args:
             max_lines: 最大返回行数，默认使用配置中的值
+            log_file: 日志文件路径，默认使用配置中的 LOG_MONITOR_FILE
+            log_filter: LogFilter 过滤器，只返回最后 max_lines 个匹配的行
             
         Returns:
             dict: 包含日志内容、文件信息的字典
@@ -20,7 +22,8 @@ class LogMonitor:
         if max_lines is None:
             max_lines = current_app.config.get('LOG_MONITOR_MAX_LINES', 1000)
             
-        log_file = current_app.config.get('LOG_MONITOR_FILE')
+        if log_file is None:
+            log_file = current_app.config.get('LOG_MONITOR_FILE')
         
         if not log_file or not os.path.exists(log_file):
             return {
@@ -39,12 +42,14 @@ class LogMonitor:
         
         # 读取日志内容（从文件末尾开始读取指定行数）
         try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                # 从文件末尾读取指定行数
-                lines = f.readlines()
-                if max_lines and len(lines) > max_lines:
-                    lines = lines[-max_lines:]
-                content = ''.join(lines)
+            block_size = current_app.config.get('LOG_MONITOR_TAIL_BLOCK_SIZE', 64 * 1024)
+            if log_filter:
+                max_scan = current_app.config.get('LOG_MONITOR_FILTER_SCAN_BYTES', 64 * 1024 * 1024)
+                with open(log_file, 'rb') as f:
+                    f.seek(0, os.SEEK_END)
+                    content, _ = LogMonitor._tail_filtered(f, f.tell(), max_lines, log_filter, block_size, max_scan)
+            else:
+                content = LogMonitor.read_tail(log_file, max_lines, block_size)
         except Exception as e:
             content = f"读取日志文件出错: {str(e)}"
             
@@ -58,7 +63,125 @@ class LogMonitor:
         }
     
     @staticmethod
-    def tail_log(max_lines=None, follow=False, interval=None):
+    def read_tail(log_file, max_lines, block_size=64 * 1024):
+        """
+        从文件末尾按固定大小的块向前读取，直到凑够 max_lines 行
+
+        读取量只与尾部行数有关，与文件总大小无关。max_lines 为空或 0 时读取整个文件。
+
+        Args:
+            log_file: 日志文件路径
+            max_lines: 最大返回行数
+            block_size: 每次向前读取的字节数
+
+        Returns:
+            str: 最后 max_lines 行内容
+        """
+        with open(log_file, 'rb') as f:
+            if not max_lines:
+                data = f.read()
+                return data.decode('utf-8', errors='replace').replace('\r\n', '\n')
+
+            f.seek(0, os.SEEK_END)
+            data = LogMonitor._tail_bytes(f, f.tell(), max_lines, block_size)
+
+        return data.decode('utf-8', errors='replace').replace('\r\n', '\n')
+
+    @staticmethod
+    def _tail_bytes(f, end, max_lines, block_size):
+        """
+        读取二进制文件 f 中 end 位置之前的最后 max_lines 行
+
+        Returns:
+            bytes: 最后 max_lines 行的原始字节
+        """
+        pos = end
+        blocks = []
+        newlines = 0
+        # 需要 max_lines + 1 个换行符才能确定第一行的起始位置
+        while pos > 0 and newlines <= max_lines:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            block = f.read(read_size)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+
+        return LogMonitor._last_lines(b''.join(reversed(blocks)), max_lines)
+
+    @staticmethod
+    def _last_lines(data, max_lines):
+        """
+        返回 data 中的最后 max_lines 行
+
+        Returns:
+            bytes: 最后 max_lines 行的原始字节
+        """
+        # 从末尾向前定位第 max_lines 个换行符（末尾的换行符不算行分隔）
+        start = len(data) - 1 if data.endswith(b'\n') else len(data)
+        for _ in range(max_lines):
+            start = data.rfind(b'\n', 0, start)
+            if start < 0:
+                break
+        start = start + 1 if start >= 0 else 0
+
+        return data[start:]
+
+    @staticmethod
+    def _iter_lines_reverse(f, end, block_size):
+        """
+        从二进制文件 f 的 end 位置开始向前逐行迭代
+
+        Yields:
+            bytes: 每一行的原始字节（包含换行符），从最后一行开始
+        """
+        pos = end
+        buffer = b''
+        while pos > 0:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            buffer = f.read(read_size) + buffer
+
+            # buffer 中第一个换行符之前的部分可能不是完整行，留到下一轮
+            stop = len(buffer)
+            while True:
+                newline = buffer.rfind(b'\n', 0, stop - 1) if stop > 1 else -1
+                if newline < 0:
+                    break
+                yield buffer[newline + 1:stop]
+                stop = newline + 1
+            buffer = buffer[:stop]
+
+        if buffer:
+            yield buffer
+
+    @staticmethod
+    def _tail_filtered(f, end, max_lines, log_filter, block_size, max_scan):
+        """
+        从 end 位置向前读取最后 max_lines 个满足过滤条件的行
+
+        最多扫描 max_scan 字节，避免很少匹配的过滤条件扫描整个大文件。
+
+        Returns:
+            tuple: (匹配的行, 扫描的字节数)
+        """
+        lines = []
+        scanned = 0
+        for raw in LogMonitor._iter_lines_reverse(f, end, block_size):
+            scanned += len(raw)
+            line = raw.decode('utf-8', errors='replace').replace('\r\n', '\n')
+            if log_filter.match(line):
+                lines.append(line)
+                if max_lines and len(lines) >= max_lines:
+                    break
+            if scanned >= max_scan:
+                break
+        lines.reverse()
+        return ''.join(lines), scanned
+
+    @staticmethod
+    def tail_log(max_lines=None, follow=False, interval=None, log_file=None):
         """
         实时监控日志文件（类似tail -f）
         
@@ -66,9 +189,11 @@ class LogMonitor:
             max_lines: 最大返回行数
             follow: 是否持续监控
             interval: 监控间隔(秒)
+            log_file: 日志文件路径，默认使用配置中的 LOG_MONITOR_FILE
             
         Yields:
-            dict: 包含日志内容、文件信息的字典
+            dict: 包含日志内容、文件信息的字典；持续监控时第一条为 snapshot，
+                之后为只包含新增行的 append 或文件轮转/截断后的 reset
         """
         if max_lines is None:
             max_lines = current_app.config.get('LOG_MONITOR_MAX_LINES', 1000)
@@ -76,44 +201,279 @@ class LogMonitor:
         if interval is None:
             interval = current_app.config.get('LOG_MONITOR_UPDATE_INTERVAL', 5)
         
-        log_file = current_app.config.get('LOG_MONITOR_FILE')
+        if log_file is None:
+            log_file = current_app.config.get('LOG_MONITOR_FILE')
         
         if not follow:
-            yield LogMonitor.get_log_content(max_lines)
+            yield LogMonitor.get_log_content(max_lines, log_file)
             return
         
-        # 文件不存在时的处理
-        if not log_file or not os.path.exists(log_file):
-            yield {
-                'content': f"日志文件不存在: {log_file}",
-                'file_path': log_file,
-                'file_size': 0,
-                'last_modified': None,
-                'exists': False,
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            # 等待文件出现
-            while not os.path.exists(log_file):
-                time.sleep(interval)
-                yield {
-                    'content': f"等待日志文件出现: {log_file}",
-                    'file_path': log_file,
-                    'file_size': 0,
-                    'last_modified': None,
-                    'exists': False,
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
+        # 先返回一次快照，之后只返回增量（append）或重置（reset）事件
+        cursor = LogCursor(log_file, max_lines)
+        yield cursor.snapshot()
         
-        # 开始持续监控
-        last_size = 0
         while True:
-            result = LogMonitor.get_log_content(max_lines)
-            current_size = result['file_size']
-            
-            # 文件大小发生变化才返回
-            if current_size != last_size:
-                yield result
-                last_size = current_size
-            
-            time.sleep(interval) 
\ No newline at end of file
+            time.sleep(interval)
+            event = cursor.poll()
+            if event:
+                yield event
+
+
+class LogCursor:
+    """
+    日志文件游标，记录已读取到的字节偏移和 inode
+
+    偏移始终停在完整行的末尾，未写完的最后一行会在下次写入换行后一起返回。
+    文件被截断或轮转（inode 变化、大小变小）时返回 reset 事件并重新发送尾部快照。
+    """
+
+    def __init__(self, log_file, max_lines=None, block_size=None, max_delta_bytes=None):
+        """
+        Args:
+            log_file: 日志文件路径
+            max_lines: 快照的最大行数，默认使用配置中的值
+            block_size: 反向读取块大小，默认使用配置中的值
+            max_delta_bytes: 单次增量的最大字节数，超过时改为发送 reset 快照
+        """
+        config = current_app.config
+        self.log_file = log_file
+        self.max_lines = max_lines if max_lines is not None else config.get('LOG_MONITOR_MAX_LINES', 1000)
+        self.block_size = block_size or config.get('LOG_MONITOR_TAIL_BLOCK_SIZE', 64 * 1024)
+        self.max_delta_bytes = max_delta_bytes or config.get('LOG_MONITOR_MAX_DELTA_BYTES', 1024 * 1024)
+        self.max_scan = config.get('LOG_MONITOR_FILTER_SCAN_BYTES', 64 * 1024 * 1024)
+        self.offset = 0
+        self.inode = None
+        self.exists = False
+        self.bytes_read = 0
+
+    def snapshot(self, event_type='snapshot', reason=None):
+        """
+        读取尾部快照并把游标移动到最后一个完整行之后
+
+        Returns:
+            dict: 快照事件
+        """
+        try:
+            f = open(self.log_file, 'rb')
+        except (FileNotFoundError, TypeError):
+            self.exists = False
+            self.inode = None
+            self.offset = 0
+            return self._event(event_type, f"日志文件不存在: {self.log_file}", None, reason or 'missing')
+
+        with f:
+            file_stats = os.fstat(f.fileno())
+            if self.max_lines:
+                # 最后一行未写完时多取一行，保证快照中有 max_lines 个完整行
+                f.seek(max(file_stats.st_size - 1, 0))
+                partial = file_stats.st_size > 0 and f.read(1) != b'\n'
+                data = LogMonitor._tail_bytes(f, file_stats.st_size, self.max_lines + partial, self.block_size)
+            else:
+                data = f.read(file_stats.st_size)
+
+        # 只保留完整行，未写完的行留给下一次增量
+        self.bytes_read += len(data)
+        complete = data.rfind(b'\n') + 1
+        self.exists = True
+        self.inode = file_stats.st_ino
+        self.offset = file_stats.st_size - len(data) + complete
+        return self._event(event_type, self._decode(data[:complete]), file_stats, reason)
+
+    def poll(self):
+        """
+        检查文件变化并读取新追加的字节
+
+        Returns:
+            dict | None: append/reset 事件，没有新的完整行时返回 None
+        """
+        try:
+            file_stats = os.stat(self.log_file)
+        except (FileNotFoundError, TypeError):
+            if self.exists:
+                return self.snapshot('reset', 'missing')
+            return None
+
+        if not self.exists or file_stats.st_ino != self.inode:
+            return self.snapshot('reset', 'rotated')
+        if file_stats.st_size < self.offset:
+            return self.snapshot('reset', 'truncated')
+        if file_stats.st_size == self.offset:
+            return None
+        if file_stats.st_size - self.offset > self.max_delta_bytes:
+            return self.snapshot('reset', 'overflow')
+
+        with open(self.log_file, 'rb') as f:
+            file_stats = os.fstat(f.fileno())
+            # open 之前文件可能刚好被轮转
+            if file_stats.st_ino != self.inode:
+                return self.snapshot('reset', 'rotated')
+            f.seek(self.offset)
+            data = f.read(min(file_stats.st_size - self.offset, self.max_delta_bytes))
+
+        self.bytes_read += len(data)
+        complete = data.rfind(b'\n') + 1
+        if not complete:
+            return None
+
+        self.offset += complete
+        return self._event('append', self._decode(data[:complete]), file_stats)
+
+    def since(self, offset, inode=None, end=None):
+        """
+        从客户端上次读取到的字节偏移继续读取（SSE 断线重连、长轮询）
+
+        只读取 offset 之后的新增字节，并把游标移动到最后一个完整行之后。
+        文件已被轮转（inode 不一致）、截断或需要补发的内容超过 max_delta_bytes 时改为返回 reset 快照。
+
+        Args:
+            offset: 客户端已读取到的字节偏移（某一行的末尾），负数表示还没有读取过，返回尾部快照
+            inode: 客户端读取的文件的 inode，为空时不检查
+            end: 最多读取到这个偏移，默认读取到文件末尾
+
+        Returns:
+            dict: append 事件（没有新的完整行时 content 为空）或 snapshot/reset 快照
+        """
+        if offset < 0:
+            return self.snapshot()
+        try:
+            f = open(self.log_file, 'rb')
+        except (FileNotFoundError, TypeError):
+            return self.snapshot('reset', 'missing')
+
+        with f:
+            file_stats = os.fstat(f.fileno())
+            end = file_stats.st_size if end is None else min(end, file_stats.st_size)
+            if inode is not None and inode != file_stats.st_ino:
+                return self.snapshot('reset', 'rotated')
+            if offset > end:
+                return self.snapshot('reset', 'truncated')
+            if end - offset > self.max_delta_bytes:
+                return self.snapshot('reset', 'overflow')
+            f.seek(offset)
+            data = f.read(end - offset)
+
+        self.bytes_read += len(data)
+        complete = data.rfind(b'\n') + 1
+        self.exists = True
+        self.inode = file_stats.st_ino
+        self.offset = offset + complete
+        return self._event('append', self._decode(data[:complete]), file_stats)
+
+    def read_range(self, start, end=None, path=None, inode=None):
+        """
+        读取 [start, end) 开头的一段完整行（最多 max_delta_bytes 字节），不移动游标
+
+        用于补充统计 reset 快照跳过的内容，调用方按返回的偏移继续读取下一段。
+
+        Args:
+            start: 起始字节偏移（某一行的行首）
+            end: 结束字节偏移，默认读取到文件末尾
+            path: 读取的文件，默认是日志文件（轮转后的旧文件传入其路径）
+            inode: 文件的 inode，不一致时不读取
+
+        Returns:
+            tuple: (内容, 下一段的起始偏移)；已读完时返回 ('', None)，文件不存在或 inode 不一致时返回 (None, None)
+        """
+        try:
+            f = open(path or self.log_file, 'rb')
+        except (FileNotFoundError, TypeError):
+            return None, None
+
+        with f:
+            file_stats = os.fstat(f.fileno())
+            if inode is not None and inode != file_stats.st_ino:
+                return None, None
+            end = file_stats.st_size if end is None else min(end, file_stats.st_size)
+            if start >= end:
+                return '', None
+            f.seek(start)
+            data = f.read(min(end - start, self.max_delta_bytes))
+
+        self.bytes_read += len(data)
+        complete = data.rfind(b'\n') + 1
+        if not complete:
+            # 超过 max_delta_bytes 的一行跳过这一段，没有换行的结尾留给下一次增量
+            return '', start + len(data) if len(data) == self.max_delta_bytes else None
+        return self._decode(data[:complete]), start + complete
+
+    def rotated_path(self, inode):
+        """
+        在日志文件所在目录中查找 inode 为 inode 的轮转文件（按重命名轮转后的旧文件）
+
+        Returns:
+            str | None: 文件路径，已被压缩或删除时返回 None
+        """
+        directory = os.path.dirname(self.log_file) or '.'
+        base = os.path.basename(self.log_file)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return None
+        for name in names:
+            if name == base or not name.startswith(base):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                if os.stat(path).st_ino == inode:
+                    return path
+            except OSError:
+                continue
+        return None
+
+    def tail(self, max_lines=None, log_filter=None):
+        """
+        读取当前偏移之前的最后 max_lines 行，不移动游标
+
+        用于给新加入的订阅者发送快照，快照的结尾与后续 append 事件的起点一致。
+        指定 log_filter 时返回最后 max_lines 个匹配的行。
+
+        Returns:
+            dict | None: 快照事件；文件已被轮转（inode 与游标不一致）时返回 None
+        """
+        if not self.exists:
+            return self._event('snapshot', f"日志文件不存在: {self.log_file}", None, 'missing')
+        if max_lines is None:
+            max_lines = self.max_lines
+
+        try:
+            f = open(self.log_file, 'rb')
+        except FileNotFoundError:
+            return None
+
+        with f:
+            file_stats = os.fstat(f.fileno())
+            if file_stats.st_ino != self.inode or file_stats.st_size < self.offset:
+                return None
+            if log_filter:
+                content, scanned = LogMonitor._tail_filtered(
+                    f, self.offset, max_lines, log_filter, self.block_size, self.max_scan)
+                self.bytes_read += scanned
+                return self._event('snapshot', content, file_stats)
+            if max_lines:
+                data = LogMonitor._tail_bytes(f, self.offset, max_lines, self.block_size)
+            else:
+                data = f.read(self.offset)
+
+        self.bytes_read += len(data)
+        return self._event('snapshot', self._decode(data), file_stats)
+
+    @staticmethod
+    def _decode(data):
+        return data.decode('utf-8', errors='replace').replace('\r\n', '\n')
+
+    def _event(self, event_type, content, file_stats, reason=None):
+        """构造与 get_log_content 字段兼容的事件字典"""
+        event = {
+            'type': event_type,
+            'content': content,
+            'file_path': self.log_file,
+            'file_size': file_stats.st_size if file_stats else 0,
+            'offset': self.offset,
+            'inode': file_stats.st_ino if file_stats else None,
+            'last_modified': datetime.fromtimestamp(file_stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S') if file_stats else None,
+            'exists': file_stats is not None,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        if reason:
+            event['reason'] = reason
+        return event
@@ -0,0 +1,325 @@
+import bz2
+import gzip
+import lzma
+import os
+import re
+from collections import deque
+from flask import current_app
+from app.utils.green import native_lock
+from app.utils.log_monitor import LogMonitor
+from app.utils.log_index import LogLineIndex
+from app.utils.log_search import LogSearch
+
+# 压缩后缀 -> 打开函数，均以流的方式按块解压
+CODECS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+# 轮转文件相对于日志文件名的后缀: ".1"、".2.gz"（logrotate 默认）或 "-20240101.gz"（dateext）
+SEGMENT_SUFFIX = re.compile(r'^(?:\.(?P<number>\d+)|-(?P<date>\d{8,14}))(?P<codec>\.gz|\.bz2|\.xz)?$')
+
+
+def _decode(data):
+    return data.decode('utf-8', errors='replace').replace('\r\n', '\n')
+
+
+class LogSegment:
+    """轮转集合中的一个文件，可能是未压缩的文本文件，也可能是 gz/bz2/xz 压缩文件"""
+
+    # 压缩文件的行数缓存: (路径, inode, 大小, 修改时间) -> 行数，轮转后的文件不再变化
+    _line_counts = {}
+    _line_counts_lock = native_lock()
+
+    def __init__(self, path, codec=None, sort_key=None, live=False):
+        """
+        Args:
+            path: 文件路径
+            codec: 压缩后缀（.gz、.bz2、.xz），未压缩时为 None
+            sort_key: 在轮转集合中的排序键，越小越旧
+            live: 是否是正在写入的日志文件（可能被 copytruncate 截断）
+        """
+        self.path = path
+        self.codec = codec
+        self.sort_key = sort_key
+        self.live = live
+        self.name = os.path.basename(path)
+
+    @property
+    def compressed(self):
+        return self.codec is not None
+
+    def open(self):
+        """以二进制方式打开，压缩文件在读取时按需解压"""
+        if self.codec:
+            return CODECS[self.codec](self.path, 'rb')
+        return open(self.path, 'rb')
+
+    def iter_chunks(self, chunk_size):
+        """按块读取（解压后的）内容，内存占用不超过一个块"""
+        with self.open() as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def iter_blocks(self, chunk_size):
+        """
+        按块读取，每块只包含完整行
+
+        最后一行没有换行符时补上换行符，保证多个文件首尾相接时行边界不变。
+        """
+        rest = b''
+        for chunk in self.iter_chunks(chunk_size):
+            data = rest + chunk if rest else chunk
+            cut = data.rfind(b'\n') + 1
+            if not cut:
+                rest = data
+                continue
+            yield data[:cut]
+            rest = data[cut:]
+        if rest:
+            yield rest + b'\n'
+
+    def line_count(self, chunk_size):
+        """
+        行数
+
+        未压缩的文件使用 LogLineIndex（只统计完整行）；压缩文件流式统计一次后缓存。
+        """
+        if not self.compressed:
+            return LogLineIndex.get(self.path).update()
+
+        file_stats = os.stat(self.path)
+        key = (self.path, file_stats.st_ino, file_stats.st_size, file_stats.st_mtime_ns)
+        with self._line_counts_lock:
+            count = self._line_counts.get(key)
+        if count is None:
+            count = sum(block.count(b'\n') for block in self.iter_blocks(chunk_size))
+            with self._line_counts_lock:
+                self._line_counts[key] = count
+        return count
+
+    def to_dict(self):
+        file_stats = os.stat(self.path)
+        return {
+            'name': self.name,
+            'file_path': self.path,
+            'codec': self.codec.lstrip('.') if self.codec else None,
+            'file_size': file_stats.st_size,
+        }
+
+
+class LogRotationSet:
+    """
+    把日志文件和它的轮转文件（app.log.1、app.log.2.gz ……）当作一个按时间顺序连续的日志流
+
+    行号从最旧的轮转文件的第一行开始计数。压缩文件只能从头顺序解压，
+    所以跨文件读取时未压缩的文件按偏移定位，压缩文件按块流式解压，任何时候内存中最多保留一个块。
+    """
+
+    def __init__(self, log_file, chunk_size=None, block_size=None):
+        """
+        Args:
+            log_file: 当前日志文件路径
+            chunk_size: 解压时每次读取的字节数，默认使用配置中的值
+            block_size: 未压缩文件反向读取块大小，默认使用配置中的值
+        """
+        config = current_app.config
+        self.log_file = log_file
+        self.chunk_size = chunk_size or config.get('LOG_MONITOR_DECOMPRESS_CHUNK', 1024 * 1024)
+        self.block_size = block_size or config.get('LOG_MONITOR_TAIL_BLOCK_SIZE', 64 * 1024)
+
+    def segments(self):
+        """
+        查找轮转集合中的所有文件
+
+        Returns:
+            list: LogSegment 列表，从旧到新，当前日志文件（如果存在）在最后
+        """
+        directory = os.path.dirname(self.log_file) or '.'
+        base = os.path.basename(self.log_file)
+        segments = []
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            names = []
+
+        for name in names:
+            if not name.startswith(base):
+                continue
+            path = os.path.join(directory, name)
+            if name == base:
+                if os.path.isfile(path):
+                    segments.append(LogSegment(path, None, (2, 0, ''), live=True))
+                continue
+            match = SEGMENT_SUFFIX.match(name[len(base):])
+            if not match or not os.path.isfile(path):
+                continue
+            if match.group('number') is not None:
+                # 数字越大越旧
+                sort_key = (1, -int(match.group('number')), '')
+            else:
+                # 日期越早越旧，且早于数字编号的轮转文件
+                sort_key = (0, 0, match.group('date'))
+            segments.append(LogSegment(path, match.group('codec'), sort_key))
+
+        return sorted(segments, key=lambda segment: segment.sort_key)
+
+    def tail(self, max_lines):
+        """
+        读取整个轮转集合的最后 max_lines 行
+
+        从当前文件开始向前读取，不够时继续读取更早的轮转文件。
+
+        Returns:
+            dict: content 和实际读取的文件名列表 segments（从旧到新）
+        """
+        parts = []
+        used = []
+        need = max_lines
+        for segment in reversed(self.segments()):
+            if need <= 0:
+                break
+            if segment.compressed:
+                data = self._tail_stream(segment, need)
+            else:
+                with segment.open() as f:
+                    f.seek(0, os.SEEK_END)
+                    data = LogMonitor._tail_bytes(f, f.tell(), need, self.block_size)
+            if not data:
+                continue
+            if not data.endswith(b'\n'):
+                data += b'\n'
+            parts.append(data)
+            used.append(segment.name)
+            need -= data.count(b'\n')
+
+        return {
+            'content': _decode(b''.join(reversed(parts))),
+            'segments': list(reversed(used))
+        }
+
+    def read_range(self, start_line, count):
+        """
+        按整个轮转集合的行号读取从 start_line 开始的 count 行
+
+        Args:
+            start_line: 起始行号（从 0 开始），负数表示从末尾倒数
+            count: 行数
+
+        Returns:
+            dict: start_line、end_line（不含）、total_lines、content 和读取的文件名列表 segments
+        """
+        segments = self.segments()
+        counts = [segment.line_count(self.chunk_size) for segment in segments]
+        total_lines = sum(counts)
+        if start_line < 0:
+            start_line = max(total_lines + start_line, 0)
+        start_line = min(start_line, total_lines)
+        count = max(min(count, total_lines - start_line), 0)
+
+        parts = []
+        used = []
+        first = 0
+        need = count
+        for segment, lines in zip(segments, counts):
+            local_start = max(start_line - first, 0)
+            first += lines
+            if need <= 0 or local_start >= lines:
+                continue
+            take = min(need, lines - local_start)
+            if segment.compressed:
+                parts.append(_decode(self._read_stream(segment, local_start, take)))
+            else:
+                parts.append(LogLineIndex.get(segment.path).read_range(local_start, take)['content'])
+            used.append(segment.name)
+            need -= take
+
+        return {
+            'start_line': start_line,
+            'end_line': start_line + count,
+            'total_lines': total_lines,
+            'content': ''.join(parts),
+            'segments': used
+        }
+
+    def search(self, query, limit=None, before=0, after=0):
+        """
+        在整个轮转集合中按从旧到新的顺序查找匹配的行
+
+        正在写入的文件分块读取后查找，轮转后的未压缩文件通过 mmap 查找，压缩文件流式解压后按块查找。
+        上下文行不跨越文件。
+
+        Args:
+            query: SearchQuery 搜索条件
+            limit: 最多返回的行数，为空时不限制
+            before: 每个匹配行之前的上下文行数
+            after: 每个匹配行之后的上下文行数
+
+        Yields:
+            dict: segment（文件名）、line（整个轮转集合中的行号）、offset（未压缩文件中的字节偏移）、
+                content、before、after
+        """
+        line_base = 0
+        found = 0
+        for segment in self.segments():
+            if segment.compressed:
+                hits = LogSearch.scan_blocks(segment.iter_blocks(self.chunk_size), query, before, after, line_base)
+            elif segment.live:
+                hits = LogSearch.scan_live_file(segment.path, query, before, after, line_base)
+            else:
+                hits = LogSearch.scan_file(segment.path, query, before, after, line_base)
+            while True:
+                try:
+                    hit = next(hits)
+                except StopIteration as stop:
+                    line_base += stop.value
+                    break
+                hit['segment'] = segment.name
+                if segment.compressed:
+                    hit['offset'] = None
+                yield hit
+                found += 1
+                if limit and found >= limit:
+                    hits.close()
+                    return
+
+    def _tail_stream(self, segment, max_lines):
+        """流式解压，只保留足够包含最后 max_lines 行的块"""
+        kept = deque()
+        newlines = 0
+        for block in segment.iter_blocks(self.chunk_size):
+            count = block.count(b'\n')
+            kept.append((block, count))
+            newlines += count
+            while len(kept) > 1 and newlines - kept[0][1] >= max_lines:
+                newlines -= kept.popleft()[1]
+        return LogMonitor._last_lines(b''.join(block for block, _ in kept), max_lines)
+
+    def _read_stream(self, segment, start_line, count):
+        """流式解压，整块跳过 start_line 之前的行，返回接下来的 count 行"""
+        parts = []
+        skip = start_line
+        for block in segment.iter_blocks(self.chunk_size):
+            newlines = block.count(b'\n')
+            if skip >= newlines:
+                skip -= newlines
+                continue
+            start = 0
+            for _ in range(skip):
+                start = block.index(b'\n', start) + 1
+            skip = 0
+            end = start
+            for _ in range(min(count, newlines)):
+                end = block.find(b'\n', end) + 1
+                if not end:
+                    end = len(block)
+                    break
+                count -= 1
+            parts.append(block[start:end])
+            if count <= 0:
+                break
+        return b''.join(parts)
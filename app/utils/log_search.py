@@ -0,0 +1,290 @@
+import mmap
+import os
+import re
+from collections import deque
+from app.utils.log_monitor import LogMonitor
+
+# 统计 mmap 中换行符时每次复制的窗口大小（mmap 没有 count 方法）
+COUNT_WINDOW = 1024 * 1024
+# 按块读取正在写入的日志文件时每块的字节数
+READ_CHUNK = 4 * 1024 * 1024
+
+
+def _decode_line(data):
+    return data.decode('utf-8', errors='replace').rstrip('\r')
+
+
+class SearchQuery:
+    """
+    日志搜索条件
+
+    固定字符串直接用 find 查找；正则以 bytes 编译并开启 MULTILINE，使 ^/$ 按行匹配。
+    两种方式都在原始字节（mmap 或解压后的块）上查找，不逐行切分，命中后再确定所在行。
+    """
+
+    def __init__(self, q, regex=False, ignore_case=False):
+        """
+        Args:
+            q: 搜索内容
+            regex: q 是否为正则表达式
+            ignore_case: 是否忽略大小写
+        """
+        if not q:
+            raise ValueError('请提供搜索内容 q')
+        self.q = q
+        self.regex = regex
+        self.ignore_case = ignore_case
+
+        if regex or ignore_case:
+            pattern = q.encode('utf-8') if regex else re.escape(q.encode('utf-8'))
+            flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+            try:
+                self._pattern = re.compile(pattern, flags)
+            except re.error as e:
+                raise ValueError(f'无效的正则表达式: {e}')
+            self._needle = None
+        else:
+            self._pattern = None
+            self._needle = q.encode('utf-8')
+
+    def find_line(self, buf, pos, end):
+        """
+        在 buf[pos:end] 中查找下一个匹配的行，pos 必须是行首
+
+        Returns:
+            tuple | None: (行首偏移, 行尾偏移（换行符位置）)，没有匹配时返回 None
+        """
+        while pos < end:
+            if self._needle is not None:
+                hit = buf.find(self._needle, pos, end)
+                if hit < 0:
+                    return None
+                hit_end = hit + len(self._needle)
+            else:
+                match = self._pattern.search(buf, pos, end)
+                if match is None:
+                    return None
+                hit, hit_end = match.span()
+
+            line_start = buf.rfind(b'\n', pos, hit) + 1 or pos
+            line_end = buf.find(b'\n', hit, end)
+            if line_end < 0:
+                line_end = end
+            if hit_end <= line_end or self._matches_line(buf[line_start:line_end]):
+                return line_start, line_end
+            # 匹配跨越了换行符，这一行本身并不满足条件
+            pos = line_end + 1
+        return None
+
+    def _matches_line(self, line):
+        if self._needle is not None:
+            return self._needle in line
+        return self._pattern.search(line) is not None
+
+    def params(self):
+        return {
+            'q': self.q,
+            'regex': self.regex,
+            'ignore_case': self.ignore_case
+        }
+
+
+class LogSearch:
+    """
+    日志全文搜索
+
+    不再变化的未压缩文件（轮转后的文件）通过 mmap 映射后直接在页缓存上查找，不把文件读入 Python 堆；
+    正在写入的日志文件按 READ_CHUNK 分块读取：copytruncate 轮转会截断它，访问 mmap 中超出新文件末尾的页
+    会触发 SIGBUS 终止进程。结果以生成器逐条产生，达到 limit 后立即停止扫描。
+    """
+
+    @staticmethod
+    def search_file(log_file, query, limit=None, before=0, after=0):
+        """
+        搜索单个未压缩的日志文件（搜索开始时的文件大小为准）
+
+        Args:
+            log_file: 日志文件路径
+            query: SearchQuery 搜索条件
+            limit: 最多返回的匹配行数，为空时不限制
+            before: 每个匹配行之前的上下文行数
+            after: 每个匹配行之后的上下文行数
+
+        Yields:
+            dict: line（行号，从 0 开始）、offset（行首字节偏移）、content、before、after
+        """
+        found = 0
+        hits = LogSearch.scan_live_file(log_file, query, before, after)
+        for hit in hits:
+            yield hit
+            found += 1
+            if limit and found >= limit:
+                hits.close()
+                return
+
+    @staticmethod
+    def scan_file(log_file, query, before=0, after=0, first_line=0, count_lines=True):
+        """
+        通过 mmap 扫描整个文件的生成器，只用于不再变化的文件（轮转后的文件），正在写入的文件用 scan_live_file
+
+        count_lines 为真时结束时返回（StopIteration.value）文件中的完整行数，
+        否则最后一个匹配行之后的内容不再统计行数。
+        """
+        with open(log_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return 0
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                lines = yield from LogSearch.scan_buffer(mm, query, 0, size, before, after, first_line, count_lines)
+                return lines
+
+    @staticmethod
+    def scan_live_file(log_file, query, before=0, after=0, first_line=0):
+        """
+        按块读取正在写入的日志文件的扫描生成器（搜索开始时的文件大小为准），返回值与 scan_file 相同
+
+        文件在扫描期间被截断时读到的内容变少，扫描提前结束。
+        """
+        with open(log_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            lines = yield from LogSearch.scan_blocks(LogSearch._read_blocks(f, size), query, before, after, first_line)
+            return lines
+
+    @staticmethod
+    def _read_blocks(f, size):
+        """按 READ_CHUNK 读取 f 的前 size 字节，每块只包含完整行，最后一块可能没有结尾的换行符"""
+        rest = b''
+        remaining = size
+        while remaining > 0:
+            chunk = f.read(min(READ_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            data = rest + chunk if rest else chunk
+            cut = data.rfind(b'\n') + 1
+            if not cut:
+                rest = data
+                continue
+            yield data[:cut]
+            rest = data[cut:]
+        if rest:
+            yield rest
+
+    @staticmethod
+    def scan_blocks(blocks, query, before=0, after=0, first_line=0):
+        """
+        扫描按块产生的内容（如流式解压的压缩文件），每块只包含完整行
+
+        相邻块的末尾/开头几行会拼接到当前块前后，保证块边界处的匹配行也有完整的上下文。
+        结果中的 offset 是在所有块拼接起来的内容中的偏移。结束时返回（StopIteration.value）扫描的行数。
+        """
+        line_no = first_line
+        offset = 0
+        tail = b''
+        blocks = iter(blocks)
+        ahead = deque()
+        ahead_lines = 0
+        while True:
+            # 预读后续的块，直到足够提供 after 行上下文
+            while not ahead or ahead_lines - ahead[0].count(b'\n') < after:
+                block = next(blocks, None)
+                if block is None:
+                    break
+                ahead.append(block)
+                ahead_lines += block.count(b'\n')
+            if not ahead:
+                break
+            block = ahead.popleft()
+            ahead_lines -= block.count(b'\n')
+
+            head = LogSearch._first_lines(b''.join(ahead), after) if after and ahead else b''
+            buf = tail + block + head
+            start = len(tail)
+            hits = LogSearch.scan_buffer(buf, query, start, start + len(block), before, after, line_no)
+            while True:
+                try:
+                    hit = next(hits)
+                except StopIteration as stop:
+                    line_no += stop.value
+                    break
+                # 相对 buf 的偏移换算成在整个内容中的偏移
+                hit['offset'] += offset - start
+                yield hit
+            offset += len(block)
+            tail = LogMonitor._last_lines(tail + block, before) if before else b''
+        return line_no - first_line
+
+    @staticmethod
+    def scan_buffer(buf, query, start, end, before=0, after=0, first_line=0, count_lines=True):
+        """
+        在 buf[start:end] 中查找匹配的行，start 必须是行首，buf 的其余部分只用于上下文
+
+        Yields:
+            dict: line、offset（相对 buf）、content、before、after
+
+        Returns:
+            int: buf[start:end] 中的换行符数量（count_lines 为假时只统计到最后一个匹配行）
+        """
+        line_no = first_line
+        counted_to = start
+        pos = start
+        while pos < end:
+            found = query.find_line(buf, pos, end)
+            if found is None:
+                break
+            line_start, line_end = found
+            line_no += LogSearch._count_newlines(buf, counted_to, line_start)
+            counted_to = line_start
+
+            context_start = line_start
+            for _ in range(before):
+                if context_start <= 0:
+                    break
+                context_start = buf.rfind(b'\n', 0, context_start - 1) + 1
+            context_end = line_end + 1
+            for _ in range(after):
+                if context_end >= len(buf):
+                    break
+                newline = buf.find(b'\n', context_end)
+                context_end = newline + 1 if newline >= 0 else len(buf)
+
+            yield {
+                'line': line_no,
+                'offset': line_start,
+                'content': _decode_line(buf[line_start:line_end]),
+                'before': LogSearch._split(buf[context_start:line_start]),
+                'after': LogSearch._split(buf[line_end + 1:context_end])
+            }
+            pos = line_end + 1
+
+        if count_lines:
+            line_no += LogSearch._count_newlines(buf, counted_to, end)
+        return line_no - first_line
+
+    @staticmethod
+    def _count_newlines(buf, start, end):
+        if isinstance(buf, bytes):
+            return buf.count(b'\n', start, end)
+        # mmap 按窗口复制后统计，每次复制的内存不超过 COUNT_WINDOW
+        return sum(buf[pos:min(pos + COUNT_WINDOW, end)].count(b'\n')
+                   for pos in range(start, end, COUNT_WINDOW))
+
+    @staticmethod
+    def _first_lines(data, count):
+        end = 0
+        for _ in range(count):
+            newline = data.find(b'\n', end)
+            if newline < 0:
+                return data
+            end = newline + 1
+        return data[:end]
+
+    @staticmethod
+    def _split(data):
+        if not data:
+            return []
+        if data.endswith(b'\n'):
+            data = data[:-1]
+        return [_decode_line(line) for line in data.split(b'\n')]
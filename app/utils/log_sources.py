@@ -0,0 +1,93 @@
+import glob
+import os
+from flask import current_app
+
+
+class LogSource:
+    """一个具名的日志源，对应一个日志文件"""
+
+    TEXT = 'text'
+    JSON = 'json'
+
+    def __init__(self, name, path, format=TEXT):
+        """
+        Args:
+            name: 日志源名称
+            path: 日志文件路径
+            format: 日志格式，text 或 json（每行一个 JSON 对象）
+        """
+        self.name = name
+        self.path = path
+        self.format = format
+
+    @property
+    def structured(self):
+        """是否为 JSON lines 日志，可以按字段查询"""
+        return self.format == self.JSON
+
+    @property
+    def room(self):
+        """该日志源的 Socket.IO 房间名"""
+        return f'log:{self.name}'
+
+    def to_dict(self):
+        exists = bool(self.path) and os.path.exists(self.path)
+        return {
+            'name': self.name,
+            'file_path': self.path,
+            'room': self.room,
+            'format': self.format,
+            'exists': exists,
+            'file_size': os.path.getsize(self.path) if exists else 0
+        }
+
+
+class LogRegistry:
+    """
+    日志源注册表
+
+    日志源来自配置 LOG_MONITOR_SOURCES（名称 -> 路径或 glob 模式），
+    default 日志源始终指向 LOG_MONITOR_FILE（除非在 LOG_MONITOR_SOURCES 中显式配置）。
+    glob 模式会展开为多个日志源，名称为 "<名称>:<文件名>"。
+    名称在 LOG_MONITOR_JSON_SOURCES 中的日志源（包括 glob 展开的）格式为 json，可以按字段查询。
+    """
+
+    DEFAULT = 'default'
+
+    @staticmethod
+    def get_sources():
+        """
+        获取所有日志源
+
+        Returns:
+            dict: 名称 -> LogSource，按名称排序
+        """
+        config = current_app.config
+        patterns = {LogRegistry.DEFAULT: config.get('LOG_MONITOR_FILE')}
+        patterns.update(config.get('LOG_MONITOR_SOURCES') or {})
+        json_sources = set(config.get('LOG_MONITOR_JSON_SOURCES') or ())
+
+        sources = {}
+        for name, pattern in patterns.items():
+            log_format = LogSource.JSON if name in json_sources else LogSource.TEXT
+            if pattern and glob.has_magic(pattern):
+                for path in sorted(glob.glob(pattern)):
+                    if os.path.isfile(path):
+                        source_name = f'{name}:{os.path.basename(path)}'
+                        sources[source_name] = LogSource(source_name, path, log_format)
+            else:
+                sources[name] = LogSource(name, pattern, log_format)
+        return dict(sorted(sources.items()))
+
+    @staticmethod
+    def get_source(name=None):
+        """
+        按名称获取日志源
+
+        Args:
+            name: 日志源名称，为空时返回 default
+
+        Returns:
+            LogSource | None: 不存在时返回 None
+        """
+        return LogRegistry.get_sources().get(name or LogRegistry.DEFAULT)
@@ -0,0 +1,330 @@
+import os
+import re
+from datetime import datetime, time
+from functools import lru_cache
+from app.utils.log_monitor import LogMonitor
+
+# strptime 指令 -> 匹配行首时间戳用的正则
+DIRECTIVES = {
+    'Y': r'\d{4}',
+    'y': r'\d{2}',
+    'm': r'\d{1,2}',
+    'd': r'\d{1,2}',
+    'H': r'\d{1,2}',
+    'I': r'\d{1,2}',
+    'M': r'\d{1,2}',
+    'S': r'\d{1,2}',
+    'f': r'\d{1,6}',
+    'j': r'\d{1,3}',
+    'b': r'[A-Za-z]{3}',
+    'a': r'[A-Za-z]{3}',
+    'p': r'(?:AM|PM|am|pm)',
+    'z': r'(?:[+-]\d{2}:?\d{2}|Z)',
+    '%': '%',
+}
+
+# 只解析每行开头的这么多字节
+PREFIX_SIZE = 64
+
+
+class TimestampParser:
+    """
+    解析日志行开头的时间戳
+
+    每个 strptime 格式先转换成锚定在行首的正则，只有匹配的前缀才交给 strptime，
+    所以没有时间戳的行（如异常堆栈）可以很快被跳过。时间统一按无时区的本地时间比较。
+    """
+
+    def __init__(self, formats):
+        """
+        Args:
+            formats: strptime 格式列表，按顺序尝试
+        """
+        if not formats:
+            raise ValueError('至少需要一个时间格式')
+        self.formats = tuple(formats)
+        self._patterns = [(fmt, self._compile(fmt)) for fmt in self.formats]
+        # 上次命中的格式，同一个文件的格式通常一致，优先尝试
+        self._preferred = 0
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def get(formats):
+        """获取（并缓存）指定格式列表的解析器"""
+        return TimestampParser(tuple(formats))
+
+    def parse(self, data):
+        """
+        解析一行开头的时间戳
+
+        Args:
+            data: 行内容（bytes 或 str），允许时间戳前有 "["
+
+        Returns:
+            datetime | None: 没有可识别的时间戳时返回 None
+        """
+        if isinstance(data, bytes):
+            data = data[:PREFIX_SIZE].decode('latin-1')
+        preferred = self._preferred
+        order = [preferred] + [i for i in range(len(self._patterns)) if i != preferred]
+        for index in order:
+            fmt, pattern = self._patterns[index]
+            match = pattern.match(data)
+            if not match:
+                continue
+            try:
+                value = datetime.strptime(match.group(1), fmt)
+            except ValueError:
+                continue
+            self._preferred = index
+            return value.replace(tzinfo=None)
+        return None
+
+    def parse_param(self, value, reference=None):
+        """
+        解析 from/to 参数
+
+        支持配置的时间格式、ISO 8601，以及只有时间的 "HH:MM[:SS]"（日期取 reference 的日期，默认为今天）。
+
+        Raises:
+            ValueError: 无法识别的时间
+        """
+        value = (value or '').strip()
+        parsed = None
+        for fmt in self.formats:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            try:
+                parsed = datetime.fromisoformat(value)
+            except ValueError:
+                try:
+                    parsed = datetime.combine((reference or datetime.now()).date(), time.fromisoformat(value))
+                except ValueError:
+                    raise ValueError(f'无效的时间: {value}')
+        return parsed.replace(tzinfo=None)
+
+    @staticmethod
+    def _compile(fmt):
+        parts = []
+        i = 0
+        while i < len(fmt):
+            char = fmt[i]
+            if char == '%' and i + 1 < len(fmt):
+                directive = fmt[i + 1]
+                if directive not in DIRECTIVES:
+                    raise ValueError(f'不支持的时间格式指令: %{directive}')
+                parts.append(DIRECTIVES[directive])
+                i += 2
+            else:
+                parts.append(re.escape(char))
+                i += 1
+        return re.compile(r'\[?(' + ''.join(parts) + ')')
+
+
+class FileView:
+    """
+    打开的文件上只读的 bytes 式视图，支持 len、find 和切片
+
+    按需用 os.pread 读取，缓存最近读取的一个窗口。代替对日志文件的 mmap：
+    copytruncate 轮转截断正在读取的文件时，访问 mmap 中超出新文件末尾的页会触发 SIGBUS 终止进程，
+    pread 只会读到更少的数据（截断后查找不到内容，切片变短）。
+    """
+
+    WINDOW_SIZE = 64 * 1024
+
+    def __init__(self, fd, size):
+        """
+        Args:
+            fd: 文件描述符
+            size: 视图长度（打开时的文件大小）
+        """
+        self.fd = fd
+        self.size = size
+        self._start = 0
+        self._data = b''
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, item):
+        start, stop, _ = item.indices(self.size)
+        if stop <= start:
+            return b''
+        if self._start <= start and stop <= self._start + len(self._data):
+            return self._data[start - self._start:stop - self._start]
+        return os.pread(self.fd, stop - start, start)
+
+    def find(self, sub, start=0, end=None):
+        end = self.size if end is None else min(end, self.size)
+        pos = max(start, 0)
+        while pos < end:
+            data_start, data = self._window(pos)
+            data_end = data_start + len(data)
+            if data_end <= pos:
+                # 文件已被截断
+                return -1
+            hit = data.find(sub, pos - data_start, min(end, data_end) - data_start)
+            if hit >= 0:
+                return data_start + hit
+            if data_end >= end:
+                return -1
+            # 下一个窗口与这个窗口重叠 len(sub) - 1 字节，跨越窗口边界的内容也能找到
+            pos = max(data_end - len(sub) + 1, pos + 1)
+        return -1
+
+    def _window(self, pos):
+        """包含 pos 且之后至少还有一段内容的窗口，不满足时从 pos 重新读取"""
+        data_end = self._start + len(self._data)
+        if not (self._start <= pos and (pos + 4096 <= data_end or data_end >= self.size)):
+            self._start = pos
+            self._data = os.pread(self.fd, min(self.WINDOW_SIZE, self.size - pos), pos)
+        return self._start, self._data
+
+
+class LogWindow:
+    """
+    按时间范围定位日志
+
+    假设日志文件中的时间戳单调递增，在字节偏移上二分查找：每次探测只读取探测点之后的一行，
+    定位一个时间点只需要 O(log n) 次探测，与文件大小基本无关。没有时间戳的行（如异常堆栈）
+    归属于前面最近的有时间戳的行。
+    """
+
+    # 剩余区间小于这个字节数时改为顺序扫描
+    SCAN_SIZE = 16 * 1024
+
+    def __init__(self, log_file, parser):
+        """
+        Args:
+            log_file: 日志文件路径
+            parser: TimestampParser 时间戳解析器
+        """
+        self.log_file = log_file
+        self.parser = parser
+        self.probes = 0
+
+    def last_timestamp(self, block_size=64 * 1024, max_lines=1000):
+        """文件最后一个有时间戳的行的时间，用于补全只有时间的参数"""
+        with open(self.log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            for index, line in enumerate(LogMonitor._iter_lines_reverse(f, f.tell(), block_size)):
+                value = self.parser.parse(line)
+                if value is not None or index >= max_lines:
+                    return value
+        return None
+
+    def read(self, start_time, end_time=None, max_lines=1000, offset=None):
+        """
+        读取时间范围 [start_time, end_time) 内的日志行
+
+        Args:
+            start_time: 开始时间（包含）
+            end_time: 结束时间（不包含），为空时读到文件末尾
+            max_lines: 最多返回的行数
+            offset: 从这个字节偏移（上一页的 next_offset）继续读取
+
+        Returns:
+            dict: start_offset、end_offset、content、lines、truncated、next_offset 和探测次数 probes
+        """
+        self.probes = 0
+        with open(self.log_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return self._result(0, 0, b'', 0, None)
+            view = FileView(f.fileno(), size)
+            start = self._seek(view, start_time, 0, size)
+            end = self._seek(view, end_time, start, size) if end_time else size
+            if offset:
+                start = min(max(start, self._line_start(view, offset)), end)
+
+            # 最多取 max_lines 行，超出时返回下一页的起始偏移
+            stop = start
+            lines = 0
+            while stop < end and lines < max_lines:
+                newline = view.find(b'\n', stop, end)
+                stop = newline + 1 if newline >= 0 else end
+                lines += 1
+            next_offset = stop if stop < end else None
+            return self._result(start, end, view[start:stop], lines, next_offset)
+
+    def seek(self, target):
+        """
+        第一个时间戳不早于 target 的行的起始字节偏移，没有时返回文件大小
+        """
+        with open(self.log_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return 0
+            return self._seek(FileView(f.fileno(), size), target, 0, size)
+
+    def _seek(self, view, target, lo, hi):
+        """
+        在 [lo, hi) 中二分查找
+
+        不变式: 起始于 lo 之前的有时间戳的行都早于 target；answer 是已知的第一个不早于 target 的
+        有时间戳的行（或 hi），[hi, answer) 中没有有时间戳的行。
+        探测点之后紧跟的没有时间戳的行属于更早的行，所以答案只能是有时间戳的行的行首。
+        """
+        answer = hi
+        while hi - lo > self.SCAN_SIZE:
+            mid = (lo + hi) // 2
+            found = self._first_timestamp(view, self._line_start(view, mid), hi)
+            if found is None:
+                hi = mid
+            elif found[1] < target:
+                lo = found[2]
+            else:
+                answer = found[0]
+                hi = mid
+
+        # 剩余区间很小，顺序找到第一个不早于 target 的行
+        pos = self._line_start(view, lo)
+        while pos < answer:
+            found = self._first_timestamp(view, pos, answer)
+            if found is None:
+                break
+            if found[1] >= target:
+                return found[0]
+            pos = found[2]
+        return answer
+
+    def _first_timestamp(self, view, pos, hi):
+        """
+        从行首 pos 开始查找第一个有时间戳且起始于 hi 之前的行
+
+        Returns:
+            tuple | None: (行首偏移, 时间, 下一行的行首偏移)
+        """
+        self.probes += 1
+        size = len(view)
+        while pos < hi:
+            newline = view.find(b'\n', pos, size)
+            next_pos = newline + 1 if newline >= 0 else size
+            value = self.parser.parse(view[pos:min(pos + PREFIX_SIZE, next_pos)])
+            if value is not None:
+                return pos, value, next_pos
+            pos = next_pos
+        return None
+
+    @staticmethod
+    def _line_start(view, pos):
+        """pos 处或之后的第一个行首"""
+        if pos <= 0:
+            return 0
+        newline = view.find(b'\n', pos - 1)
+        return newline + 1 if newline >= 0 else len(view)
+
+    def _result(self, start, end, data, lines, next_offset):
+        return {
+            'start_offset': start,
+            'end_offset': end,
+            'content': data.decode('utf-8', errors='replace').replace('\r\n', '\n'),
+            'lines': lines,
+            'truncated': next_offset is not None,
+            'next_offset': next_offset,
+            'probes': self.probes
+        }
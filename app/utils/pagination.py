@@ -0,0 +1,30 @@
+import base64
+import json
+
+
+def encode_cursor(data):
+    """
+    把游标内容编码成不透明的字符串（URL 安全的 base64，不含填充）
+
+    Args:
+        data: 可 JSON 序列化的游标内容
+    """
+    raw = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token):
+    """
+    解码 encode_cursor 生成的游标
+
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        data = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(data, dict):
+        raise ValueError('Invalid cursor')
+    return data
@@ -1,5 +1,29 @@
 import os
 
+def parse_log_sources(value):
+    """
+    解析日志源配置，格式为 "名称=路径或glob,名称=路径或glob"
+    :param value: 环境变量 LOG_MONITOR_SOURCES 的值
+    :return: 名称 -> 路径或glob 的字典
+    """
+    sources = {}
+    for item in (value or '').split(','):
+        name, sep, pattern = item.partition('=')
+        if sep and name.strip() and pattern.strip():
+            sources[name.strip()] = pattern.strip()
+    return sources
+
+# 日志行首时间戳的默认格式（strptime），按顺序尝试
+DEFAULT_LOG_TIME_FORMATS = [
+    '%Y-%m-%d %H:%M:%S,%f',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+]
+
 class Config:
     # 基础配置
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev_key_please_change_in_production'
@@ -23,8 +47,48 @@ class Config:
     
     # 日志监控配置
     LOG_MONITOR_FILE = os.environ.get('LOG_MONITOR_FILE') or '/tmp/test.log'  # 默认监控的日志文件
+    LOG_MONITOR_SOURCES = parse_log_sources(os.environ.get('LOG_MONITOR_SOURCES'))  # 其他具名日志源，支持glob，如 "app=/var/log/app.log,nginx=/var/log/nginx/*.log"
     LOG_MONITOR_MAX_LINES = int(os.environ.get('LOG_MONITOR_MAX_LINES') or 1000)    # 最大显示行数
     LOG_MONITOR_UPDATE_INTERVAL = int(os.environ.get('LOG_MONITOR_UPDATE_INTERVAL') or 5)  # 更新间隔(秒)
+    LOG_MONITOR_MIN_INTERVAL = float(os.environ.get('LOG_MONITOR_MIN_INTERVAL') or 1)  # 订阅者可以请求的最短轮询间隔(秒)
+    LOG_MONITOR_MAX_INTERVAL = float(os.environ.get('LOG_MONITOR_MAX_INTERVAL') or 60)  # 订阅者可以请求的最长轮询间隔(秒)
+    LOG_MONITOR_TAIL_BLOCK_SIZE = int(os.environ.get('LOG_MONITOR_TAIL_BLOCK_SIZE') or 64 * 1024)  # 反向读取块大小(字节)
+    LOG_MONITOR_MAX_DELTA_BYTES = int(os.environ.get('LOG_MONITOR_MAX_DELTA_BYTES') or 1024 * 1024)  # 单次增量最大字节数，超过则重新发送快照
+    LOG_MONITOR_FILTER_SCAN_BYTES = int(os.environ.get('LOG_MONITOR_FILTER_SCAN_BYTES') or 64 * 1024 * 1024)  # 带过滤条件的快照最多向前扫描的字节数
+    LOG_MONITOR_INDEX_DIR = os.environ.get('LOG_MONITOR_INDEX_DIR') or os.path.join(BASE_DIR, 'instance', 'log_index')  # 行偏移索引文件目录
+    LOG_MONITOR_INDEX_EVERY = int(os.environ.get('LOG_MONITOR_INDEX_EVERY') or 1000)  # 行偏移索引的检查点间隔(行)
+    LOG_MONITOR_DECOMPRESS_CHUNK = int(os.environ.get('LOG_MONITOR_DECOMPRESS_CHUNK') or 1024 * 1024)  # 读取压缩的轮转文件时每次解压的字节数
+    LOG_MONITOR_RANGE_MAX_COUNT = int(os.environ.get('LOG_MONITOR_RANGE_MAX_COUNT') or 5000)  # 按行号分页时单页最大行数
+    LOG_MONITOR_SEARCH_MAX_RESULTS = int(os.environ.get('LOG_MONITOR_SEARCH_MAX_RESULTS') or 1000)  # 日志搜索单次最多返回的匹配行数
+    LOG_MONITOR_SEARCH_MAX_CONTEXT = int(os.environ.get('LOG_MONITOR_SEARCH_MAX_CONTEXT') or 20)  # 日志搜索每个匹配行最多的上下文行数
+    LOG_MONITOR_TIME_FORMATS = [fmt for fmt in (os.environ.get('LOG_MONITOR_TIME_FORMATS') or '').split('|') if fmt] or DEFAULT_LOG_TIME_FORMATS  # 行首时间戳格式，多个格式用 | 分隔
+    LOG_MONITOR_JSON_SOURCES = [name.strip() for name in (os.environ.get('LOG_MONITOR_JSON_SOURCES') or '').split(',') if name.strip()]  # 输出 JSON lines 的日志源名称，glob 日志源写名称即可
+    LOG_MONITOR_JSON_WINDOW_LINES = int(os.environ.get('LOG_MONITOR_JSON_WINDOW_LINES') or 10000)  # JSON 日志字段查询缓存的最近行数
+    LOG_MONITOR_JSON_INDEX_FIELDS = [field.strip() for field in (os.environ.get('LOG_MONITOR_JSON_INDEX_FIELDS') or 'level,service').split(',') if field.strip()]  # 最近窗口中建立索引的字段
+    LOG_MONITOR_DOWNLOAD_CHUNK = int(os.environ.get('LOG_MONITOR_DOWNLOAD_CHUNK') or 1024 * 1024)  # 下载日志时每次读取的字节数
+    LOG_MONITOR_DOWNLOAD_GZIP_LEVEL = int(os.environ.get('LOG_MONITOR_DOWNLOAD_GZIP_LEVEL') or 6)  # gzip=1 下载时的压缩级别(1-9)
+    LOG_MONITOR_X_ACCEL_PREFIX = os.environ.get('LOG_MONITOR_X_ACCEL_PREFIX') or ''  # nginx internal location 前缀，设置后下载通过 X-Accel-Redirect 交给 nginx 发送
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() in ('true', '1', 'yes')  # 下载通过 X-Sendfile 交给 Apache/lighttpd 发送
+    LOG_MONITOR_KEEPALIVE_INTERVAL = int(os.environ.get('LOG_MONITOR_KEEPALIVE_INTERVAL') or 15)  # SSE 心跳间隔(秒)
+    LOG_MONITOR_LONG_POLL_TIMEOUT = int(os.environ.get('LOG_MONITOR_LONG_POLL_TIMEOUT') or 25)  # 长轮询 since 请求的最长等待时间(秒)
+    LOG_MONITOR_SUBSCRIBER_MAX_PENDING = int(os.environ.get('LOG_MONITOR_SUBSCRIBER_MAX_PENDING') or 256 * 1024)  # 每个订阅者待发送内容的最大字符数，超出时丢弃最早的行
+    LOG_MONITOR_ACK_TIMEOUT = int(os.environ.get('LOG_MONITOR_ACK_TIMEOUT') or 30)  # 等待 Socket.IO 客户端确认的最长时间(秒)
+    LOG_MONITOR_METRICS_MINUTES = int(os.environ.get('LOG_MONITOR_METRICS_MINUTES') or 60)  # 滚动统计保留的分钟数
+    LOG_MONITOR_METRICS_MESSAGES = int(os.environ.get('LOG_MONITOR_METRICS_MESSAGES') or 100)  # 每分钟最多跟踪的不同消息数
+    LOG_MONITOR_METRICS_PUSH_INTERVAL = int(os.environ.get('LOG_MONITOR_METRICS_PUSH_INTERVAL') or 5)  # 推送 log_stats 事件的最小间隔(秒)
+    LOG_MONITOR_METRICS_CATCHUP_BYTES = int(os.environ.get('LOG_MONITOR_METRICS_CATCHUP_BYTES') or 64 * 1024 * 1024)  # reset 快照跳过的内容最多补充统计的字节数
+    LOG_MONITOR_STATS_LEASE = int(os.environ.get('LOG_MONITOR_STATS_LEASE') or 600)  # 没有订阅者时 /stats 请求保持监控日志源的时间(秒)
+    LOG_MONITOR_INOTIFY = os.environ.get('LOG_MONITOR_INOTIFY', 'true').lower() in ('true', '1', 'yes')  # Linux 上使用 inotify 代替轮询
+    LOG_MONITOR_FALLBACK_INTERVAL = int(os.environ.get('LOG_MONITOR_FALLBACK_INTERVAL') or 60)  # 使用 inotify 时的兜底轮询间隔(秒)
+    LOG_MONITOR_DEBOUNCE = float(os.environ.get('LOG_MONITOR_DEBOUNCE') or 0.05)  # 合并连续写入事件的时间窗口(秒)
+
+    # 客户列表配置
+    CUSTOMER_COUNT_CACHE_TTL = int(os.environ.get('CUSTOMER_COUNT_CACHE_TTL') or 60)  # 按过滤条件缓存列表总数的时间(秒)，客户数据提交后立即失效
+    CUSTOMER_COUNT_ESTIMATE_SAMPLE = int(os.environ.get('CUSTOMER_COUNT_ESTIMATE_SAMPLE') or 10000)  # count=estimate 时抽样的主键数
+    CUSTOMER_SEARCH_MAX_RESULTS = int(os.environ.get('CUSTOMER_SEARCH_MAX_RESULTS') or 100)  # 客户搜索单次最多返回的行数
+    CUSTOMER_IMPORT_BATCH_SIZE = int(os.environ.get('CUSTOMER_IMPORT_BATCH_SIZE') or 10000)  # 批量导入时每个事务插入的行数
+    CUSTOMER_IMPORT_MAX_ERRORS = int(os.environ.get('CUSTOMER_IMPORT_MAX_ERRORS') or 1000)  # 批量导入最多返回的错误行数，其余只计数
+    CUSTOMER_EXPORT_CHUNK_ROWS = int(os.environ.get('CUSTOMER_EXPORT_CHUNK_ROWS') or 1000)  # 流式导出时每次从数据库读取、向客户端发送的行数
     
     # 确保必要的目录存在
     @staticmethod
@@ -19,6 +19,19 @@ CREATE TABLE CUSTOMERS (
     EMPLOYEE_COUNT  NUMBER(10)
 );
 
+-- Create indexes (same columns as migrations 3a42a40a0d30 and b052e6903ddc)
+CREATE UNIQUE INDEX IX_CUST_COMPANY_NAME ON CUSTOMERS (COMPANY_NAME);
+CREATE INDEX IX_CUST_STATUS ON CUSTOMERS (STATUS);
+CREATE INDEX IX_CUST_CREDIT_RATING ON CUSTOMERS (CREDIT_RATING);
+CREATE INDEX IX_CUST_CITY ON CUSTOMERS (CITY);
+CREATE INDEX IX_CUST_INDUSTRY ON CUSTOMERS (INDUSTRY);
+CREATE INDEX IX_CUST_LAST_MODIFIED ON CUSTOMERS (LAST_MODIFIED);
+CREATE INDEX IX_CUST_STATUS_RATING_CITY_IND ON CUSTOMERS (STATUS, CREDIT_RATING, CITY, INDUSTRY);
+CREATE INDEX IX_CUST_STATUS_CITY ON CUSTOMERS (STATUS, CITY);
+CREATE INDEX IX_CUST_STATUS_INDUSTRY ON CUSTOMERS (STATUS, INDUSTRY);
+CREATE INDEX IX_CUST_STATUS_NAME ON CUSTOMERS (STATUS, COMPANY_NAME);
+CREATE INDEX IX_CUST_STATUS_MODIFIED ON CUSTOMERS (STATUS, LAST_MODIFIED);
+
 -- Create sequence
 DROP SEQUENCE seq_customer_id;
 CREATE SEQUENCE seq_customer_id START WITH 1000 INCREMENT BY 1;
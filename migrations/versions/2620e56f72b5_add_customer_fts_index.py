@@ -0,0 +1,69 @@
+"""Add customer full-text search index
+
+Revision ID: 2620e56f72b5
+Revises: 3a42a40a0d30
+Create Date: 2026-10-17 12:20:41.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2620e56f72b5'
+down_revision = '3a42a40a0d30'
+branch_labels = None
+depends_on = None
+
+
+def fts5_available(bind):
+    if bind.dialect.name != 'sqlite':
+        return False
+    options = {row[0] for row in bind.execute(sa.text('PRAGMA compile_options'))}
+    return 'ENABLE_FTS5' in options
+
+
+def upgrade():
+    # 只有 SQLite 使用 FTS5，其他数据库的搜索仍然使用 LIKE
+    bind = op.get_bind()
+    if not fts5_available(bind):
+        return
+
+    # 外部内容表：不重复存储文本，只保存 customers 中 company_name、contact_name 的倒排索引
+    op.execute("""
+        CREATE VIRTUAL TABLE customers_fts USING fts5(
+            company_name, contact_name,
+            content='customers', content_rowid='customer_id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER customers_fts_insert AFTER INSERT ON customers BEGIN
+            INSERT INTO customers_fts(rowid, company_name, contact_name)
+            VALUES (new.customer_id, new.company_name, new.contact_name);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER customers_fts_delete AFTER DELETE ON customers BEGIN
+            INSERT INTO customers_fts(customers_fts, rowid, company_name, contact_name)
+            VALUES ('delete', old.customer_id, old.company_name, old.contact_name);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER customers_fts_update AFTER UPDATE OF customer_id, company_name, contact_name ON customers BEGIN
+            INSERT INTO customers_fts(customers_fts, rowid, company_name, contact_name)
+            VALUES ('delete', old.customer_id, old.company_name, old.contact_name);
+            INSERT INTO customers_fts(rowid, company_name, contact_name)
+            VALUES (new.customer_id, new.company_name, new.contact_name);
+        END
+    """)
+    op.execute("INSERT INTO customers_fts(customers_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute('DROP TRIGGER IF EXISTS customers_fts_update')
+    op.execute('DROP TRIGGER IF EXISTS customers_fts_delete')
+    op.execute('DROP TRIGGER IF EXISTS customers_fts_insert')
+    op.execute('DROP TABLE IF EXISTS customers_fts')
@@ -0,0 +1,60 @@
+"""Use trigram tokenizer for customer full-text search
+
+Revision ID: c5d2e8a41f96
+Revises: 8d1c5e0b7a43
+Create Date: 2026-10-17 16:05:12.417530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d2e8a41f96'
+down_revision = '8d1c5e0b7a43'
+branch_labels = None
+depends_on = None
+
+# trigram 分词器从 SQLite 3.34 开始提供
+TRIGRAM_VERSION = (3, 34, 0)
+
+
+def fts_exists(bind):
+    return bind.dialect.name == 'sqlite' and bind.execute(
+        sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'customers_fts'")
+    ).first() is not None
+
+
+def recreate_fts(tokenize):
+    """按新的分词器重建外部内容表，触发器按表名写入，不需要重建"""
+    op.execute('DROP TABLE customers_fts')
+    op.execute(f"""
+        CREATE VIRTUAL TABLE customers_fts USING fts5(
+            company_name, contact_name,
+            content='customers', content_rowid='customer_id',
+            tokenize='{tokenize}'
+        )
+    """)
+    op.execute("INSERT INTO customers_fts(customers_fts) VALUES ('rebuild')")
+
+
+def upgrade():
+    # unicode61 把连续的中文当作一个词，只能从名称开头匹配；trigram 按子串匹配，与原来的 LIKE 搜索结果一致
+    bind = op.get_bind()
+    if not fts_exists(bind):
+        return
+
+    version = tuple(int(part) for part in bind.execute(sa.text('SELECT sqlite_version()')).scalar().split('.'))
+    if version < TRIGRAM_VERSION:
+        # 没有 trigram 时删除全文索引，搜索退回到 LIKE 包含匹配
+        op.execute('DROP TRIGGER IF EXISTS customers_fts_update')
+        op.execute('DROP TRIGGER IF EXISTS customers_fts_delete')
+        op.execute('DROP TRIGGER IF EXISTS customers_fts_insert')
+        op.execute('DROP TABLE customers_fts')
+        return
+    recreate_fts('trigram')
+
+
+def downgrade():
+    if fts_exists(op.get_bind()):
+        recreate_fts('unicode61 remove_diacritics 2')
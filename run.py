@@ -1,6 +1,18 @@
+try:
+    import eventlet
+    # 必须在导入其他模块之前执行：threading、time.sleep、select、socket 等替换成绿色线程版本，
+    # 日志监控线程和 SSE 请求在等待时让出事件循环，而不是阻塞整个进程
+    eventlet.monkey_patch()
+except ImportError:
+    pass
+
 from app import create_app, socketio
 
 app = create_app('development')
 
 if __name__ == '__main__':
-    socketio.run(app, host='0.0.0.0', port=5001, debug=True) 
\ No newline at end of file
+    options = {}
+    if socketio.async_mode == 'eventlet':
+        # eventlet.wsgi 默认攒够 4KB 才写出，SSE 事件和心跳需要立即发送
+        options['minimum_chunk_size'] = 0
+    socketio.run(app, host='0.0.0.0', port=5001, debug=True, **options)
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+from flask_migrate import upgrade
+
+from app import create_app, db
+from config.config import TestingConfig
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    """迁移到最新版本的临时 SQLite 库上的应用，每个测试模块一个库"""
+    db_file = tmp_path_factory.mktemp('db') / 'customers.db'
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # 迁移需要文件数据库，:memory: 的每个连接都是空库
+        monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{db_file}')
+        app = create_app('testing')
+    with app.app_context():
+        upgrade(MIGRATIONS)
+        yield app
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Customer
+
+
+@pytest.fixture(scope='module', autouse=True)
+def customers(app):
+    now = datetime.utcnow()
+    db.session.add_all(Customer(
+        company_name=f'Bulk {i}',
+        city='Shanghai' if i % 2 else 'Beijing',
+        credit_limit=1000,
+        status='ACTIVE',
+        created_date=now,
+        last_modified=now
+    ) for i in range(10))
+    db.session.commit()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def city_count(city):
+    db.session.expire_all()
+    return Customer.query.filter_by(city=city).count()
+
+
+def test_dry_run_counts_without_updating(client):
+    body = {'filter': {'city': 'Beijing'}, 'set': {'city': 'Hangzhou'}}
+
+    response = client.patch('/api/customer/bulk', json=dict(body, dry_run=True))
+    assert response.status_code == 200
+    assert response.json['data'] == {'matched': 5, 'dry_run': True}
+    assert city_count('Hangzhou') == 0
+
+    response = client.patch('/api/customer/bulk', json=body)
+    assert response.status_code == 200
+    assert response.json['data'] == {'matched': 5, 'dry_run': False}
+    assert city_count('Hangzhou') == 5
+    assert city_count('Beijing') == 0
+
+
+def test_update_numeric_fields(client):
+    ids = [customer.customer_id for customer in Customer.query.filter_by(city='Shanghai')]
+    response = client.patch('/api/customer/bulk', json={
+        'ids': ids, 'set': {'credit_limit': 2500.5, 'annual_revenue': None, 'employee_count': 40}
+    })
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert {(float(c.credit_limit), c.employee_count) for c in Customer.query.filter_by(city='Shanghai')} == {(2500.5, 40)}
+
+
+@pytest.mark.parametrize('values, field', [
+    ({'company_name': 'Same Name'}, 'company_name'),
+    ({'customer_id': 1}, 'customer_id'),
+    ({'credit_limit': -1}, 'credit_limit'),
+    ({'credit_limit': '1000'}, 'credit_limit'),
+    ({'annual_revenue': True}, 'annual_revenue'),
+    ({'annual_revenue': float('inf')}, 'annual_revenue'),
+    ({'employee_count': 1.5}, 'employee_count'),
+    ({'employee_count': -3}, 'employee_count'),
+])
+def test_invalid_fields_are_rejected(client, values, field):
+    before = {c.customer_id: (c.company_name, c.credit_limit, c.annual_revenue, c.employee_count)
+              for c in Customer.query}
+
+    response = client.patch('/api/customer/bulk', json={'filter': {'status': 'ACTIVE'}, 'set': values})
+    assert response.status_code == 400
+    assert field in response.json['message']
+    db.session.expire_all()
+    assert {c.customer_id: (c.company_name, c.credit_limit, c.annual_revenue, c.employee_count)
+            for c in Customer.query} == before
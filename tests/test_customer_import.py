@@ -0,0 +1,120 @@
+import io
+import json
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models import Customer
+from app.services.customer_import import CustomerImporter, ImportFormatError, read_csv, read_ndjson
+
+
+@pytest.fixture(scope='module', autouse=True)
+def customers(app):
+    db.session.add(Customer(company_name='已有公司', status='ACTIVE'))
+    db.session.commit()
+
+
+def csv_stream(text):
+    return io.BytesIO(text.encode('utf-8'))
+
+
+def ndjson_stream(*lines):
+    return io.BytesIO('\n'.join(line if isinstance(line, str) else json.dumps(line, ensure_ascii=False)
+                                for line in lines).encode('utf-8'))
+
+
+def test_read_csv():
+    # utf-8-sig 去掉 BOM，未知的列忽略
+    stream = io.BytesIO('\ufeffcompany_name,city,unknown\n甲公司,Shanghai,x\n"乙, 公司",,y\n'.encode('utf-8'))
+    assert list(read_csv(stream)) == [
+        (2, {'company_name': '甲公司', 'city': 'Shanghai', 'unknown': 'x'}, None),
+        (3, {'company_name': '乙, 公司', 'city': '', 'unknown': 'y'}, None),
+    ]
+
+
+def test_read_csv_requires_company_name():
+    with pytest.raises(ImportFormatError) as e:
+        list(read_csv(csv_stream('name,city\n甲公司,Shanghai\n')))
+    assert e.value.line == 1
+
+
+def test_read_ndjson():
+    stream = ndjson_stream({'company_name': '甲公司'}, '', '{"company_name": ', '[1, 2]', {'company_name': '乙公司'})
+    records = list(read_ndjson(stream))
+    assert records[0] == (1, {'company_name': '甲公司'}, None)
+    assert [(line, data) for line, data, error in records[1:]] == [(3, None), (4, None), (5, {'company_name': '乙公司'})]
+    assert records[1][2].startswith('Invalid JSON')
+    assert records[2][2] == 'Row must be a JSON object'
+
+
+def test_import_csv():
+    stream = csv_stream('company_name,credit_limit,employee_count,status,email\n'
+                        'CSV 公司,1000.50,12,,csv@example.com\n')
+    summary = CustomerImporter().run(read_csv(stream))
+    assert summary == {'total': 1, 'imported': 1, 'failed': 0, 'errors': [], 'errors_truncated': False}
+
+    customer = Customer.get_by_company_name('CSV 公司')
+    assert customer.credit_limit == Decimal('1000.50')
+    assert customer.employee_count == 12
+    assert customer.status == 'ACTIVE'
+    assert customer.email == 'csv@example.com'
+    assert customer.created_date is not None
+
+
+@pytest.mark.parametrize('data, error', [
+    ({'company_name': ''}, 'Company name cannot be empty'),
+    ({'company_name': '校验 1', 'credit_rating': 'E'}, 'Credit rating must be A, B, C or D'),
+    ({'company_name': '校验 2', 'status': 'CLOSED'}, 'Status must be ACTIVE or INACTIVE'),
+    ({'company_name': '校验 3', 'credit_limit': 'abc'}, 'credit_limit must be a number'),
+    ({'company_name': '校验 4', 'annual_revenue': True}, 'annual_revenue must be a number'),
+    ({'company_name': '校验 5', 'annual_revenue': 'NaN'}, 'annual_revenue must be a number'),
+    ({'company_name': '校验 6', 'employee_count': 1.5}, 'employee_count must be an integer'),
+    ({'company_name': '校验 7', 'city': ['Shanghai']}, 'city must be a scalar value'),
+])
+def test_invalid_rows_are_reported(data, error):
+    valid = f'{data["company_name"]} 有效'
+    summary = CustomerImporter().run(read_ndjson(ndjson_stream(data, {'company_name': valid})))
+    assert summary['imported'] == 1
+    assert summary['failed'] == 1
+    assert summary['errors'] == [{'line': 1, 'company_name': data['company_name'], 'error': error}]
+    assert Customer.get_by_company_name(valid) is not None
+
+
+def test_duplicates_are_rejected():
+    stream = ndjson_stream({'company_name': '重复公司', 'city': 'Beijing'},
+                           {'company_name': '已有公司'},
+                           {'company_name': '重复公司', 'city': 'Shenzhen'},
+                           {'company_name': '不重复公司'})
+    # batch_size=2 时两条重复的行在不同批次
+    summary = CustomerImporter(batch_size=2).run(read_ndjson(stream))
+    assert summary['imported'] == 2
+    assert summary['errors'] == [
+        {'line': 2, 'company_name': '已有公司', 'error': 'Company name 已有公司 already exists'},
+        {'line': 3, 'company_name': '重复公司', 'error': 'Company name 重复公司 already exists'},
+    ]
+    assert Customer.get_by_company_name('重复公司').city == 'Beijing'
+    assert Customer.query.filter_by(company_name='已有公司').count() == 1
+
+
+def test_duplicates_within_a_batch():
+    stream = csv_stream('company_name,city\n同批公司,Beijing\n同批公司,Shenzhen\n')
+    summary = CustomerImporter().run(read_csv(stream))
+    assert summary['imported'] == 1
+    assert summary['errors'] == [{'line': 3, 'company_name': '同批公司', 'error': 'Company name 同批公司 already exists'}]
+    assert Customer.get_by_company_name('同批公司').city == 'Beijing'
+
+
+def test_errors_are_truncated():
+    summary = CustomerImporter(max_errors=2).run(read_ndjson(ndjson_stream(*[{'company_name': ''}] * 5)))
+    assert summary['failed'] == 5
+    assert len(summary['errors']) == 2
+    assert summary['errors_truncated'] is True
+
+
+def test_import_endpoint(app):
+    response = app.test_client().post('/api/customer/import', data='company_name\n接口公司\n接口公司\n',
+                                      content_type='text/csv')
+    assert response.status_code == 200
+    assert response.json['data']['imported'] == 1
+    assert response.json['data']['failed'] == 1
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.commands import PLAN_CHECKS, full_scan, query_plans
+from app.models import Customer
+
+CITIES = ('Shanghai', 'Beijing', 'Shenzhen')
+INDUSTRIES = ('IT', 'Finance', 'Retail')
+
+
+@pytest.fixture(scope='module', autouse=True)
+def customers(app):
+    now = datetime.utcnow()
+    db.session.add_all(Customer(
+        company_name=f'Acme {i}',
+        city=CITIES[i % len(CITIES)],
+        industry=INDUSTRIES[i % len(INDUSTRIES)],
+        credit_rating='ABCD'[i % 4],
+        status='ACTIVE' if i % 5 else 'INACTIVE',
+        created_date=now,
+        last_modified=now
+    ) for i in range(300))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('name, target, scan_ok', PLAN_CHECKS, ids=[check[0] for check in PLAN_CHECKS])
+def test_customer_queries_use_index(app, name, target, scan_ok):
+    plans = query_plans(target, app.test_client())
+
+    if not scan_ok:
+        scans = [' '.join(statement.split()) for statement, plan in plans if full_scan(plan)]
+        assert not scans, f'{name} uses a full table scan: {scans}'
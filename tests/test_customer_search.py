@@ -0,0 +1,34 @@
+import pytest
+
+from app import db
+from app.models import Customer
+
+NAMES = [('阿里巴巴集团', '马云'), ('京东集团', '刘强东'), ('小米科技有限责任公司', '雷军'),
+         ('滴滴出行科技有限公司', '程维'), ('Acme Trading Co', 'John Smith')]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def customers(app):
+    db.session.add_all(Customer(company_name=company, contact_name=contact, status='ACTIVE')
+                       for company, contact in NAMES)
+    db.session.commit()
+
+
+def names(customers):
+    return sorted(customer.company_name for customer in customers)
+
+
+@pytest.mark.parametrize('keyword, expected', [
+    ('集团', ['京东集团', '阿里巴巴集团']),
+    ('科技', ['小米科技有限责任公司', '滴滴出行科技有限公司']),
+    ('出行科技', ['滴滴出行科技有限公司']),
+    ('阿里 集团', ['阿里巴巴集团']),
+    ('雷军', ['小米科技有限责任公司']),
+    ('rading', ['Acme Trading Co']),
+    ('acme smith', ['Acme Trading Co']),
+    ('集团 科技', []),
+])
+def test_search_matches_substrings(app, keyword, expected):
+    assert Customer.fts_enabled()
+    assert names(Customer.search_by_name(keyword)) == expected
+    assert names(Customer.filter_query(search=keyword)) == expected
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Customer, CustomerStat
+
+
+def row(name, **values):
+    now = datetime.utcnow()
+    return dict({'company_name': name, 'contact_name': None, 'contact_title': None, 'phone': None, 'email': None,
+                 'address': None, 'city': 'Shanghai', 'country': None, 'credit_limit': None,
+                 'credit_rating': 'A', 'status': 'ACTIVE', 'industry': 'IT', 'annual_revenue': None,
+                 'employee_count': None, 'created_date': now, 'last_modified': now}, **values)
+
+
+def triggers():
+    return set(db.session.scalars(db.text(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'customers'"
+    )))
+
+
+def assert_stats_match():
+    assert CustomerStat.read() == Customer.scan_stats()
+
+
+@pytest.fixture(scope='module', autouse=True)
+def customers(app):
+    assert Customer.stats_enabled()
+    Customer.bulk_insert([row(f'Stats {i}', city=('Shanghai', 'Beijing', None)[i % 3],
+                              credit_rating='ABCD'[i % 4], industry=('IT', 'Retail')[i % 2])
+                          for i in range(20)])
+    db.session.commit()
+
+
+def test_orm_insert_update_delete(app):
+    assert_stats_match()
+
+    customer = Customer(company_name='Stats ORM', city='Shenzhen', credit_rating='B', status='ACTIVE')
+    customer.save()
+    assert_stats_match()
+
+    customer.city = None
+    customer.status = 'INACTIVE'
+    customer.industry = 'Finance'
+    customer.save()
+    assert_stats_match()
+
+    customer.delete()
+    assert_stats_match()
+
+
+def test_bulk_insert_update_delete(app):
+    Customer.bulk_insert([row(f'Stats bulk {i}', city='Hangzhou', status='INACTIVE') for i in range(5)])
+    db.session.commit()
+    assert_stats_match()
+
+    Customer.bulk_update({'city': 'Shanghai', 'credit_rating': None}, filters={'city': 'Hangzhou'})
+    db.session.commit()
+    assert_stats_match()
+
+    Customer.bulk_delete(filters={'status': 'INACTIVE'})
+    db.session.commit()
+    assert_stats_match()
+
+
+def fail_stats(monkeypatch):
+    def add_customers(after_id):
+        raise RuntimeError('failed after insert')
+    monkeypatch.setattr(CustomerStat, 'add_customers', add_customers)
+
+
+@pytest.mark.parametrize('rows, error, patch', [
+    # 第二行与已有客户重名，executemany 中途失败
+    ([row('Stats new 1'), row('Stats 0'), row('Stats new 2')], IntegrityError, None),
+    # 插入和 customers_fts 更新之后、重建触发器之前失败
+    ([row('Stats new 1'), row('Stats new 2')], RuntimeError, fail_stats),
+])
+def test_failed_bulk_insert_restores_triggers(app, monkeypatch, rows, error, patch):
+    before = triggers()
+    assert set(Customer.DEFERRED_TRIGGERS) <= before
+    total = Customer.query.count()
+    if patch:
+        patch(monkeypatch)
+
+    with pytest.raises(error):
+        Customer.bulk_insert(rows)
+    db.session.rollback()
+    monkeypatch.undo()
+
+    assert triggers() == before
+    assert Customer.query.count() == total
+    assert_stats_match()
+
+    # 恢复的触发器继续维护汇总表
+    Customer(company_name='Stats after rollback', city='Shenzhen', status='ACTIVE').save()
+    assert_stats_match()
+    Customer.bulk_insert([row('Stats after rollback 2')])
+    db.session.commit()
+    assert_stats_match()
+    Customer.bulk_delete(filters={'search': 'after rollback'})
+    db.session.commit()
+    assert_stats_match()
@@ -0,0 +1,26 @@
+import pytest
+
+from app.utils.log_filter import LogFilter
+
+
+def test_from_params_without_conditions():
+    assert LogFilter.from_params({}) is None
+    assert LogFilter.from_params({'level': '', 'exclude': []}) is None
+
+
+def test_from_params_socket_data():
+    log_filter = LogFilter.from_params({'level': 'error', 'exclude': 'health'})
+    assert log_filter.params() == {'regex': None, 'level': 'ERROR', 'contains': None, 'exclude': ['health']}
+
+
+@pytest.mark.parametrize('params', [
+    {'level': 5},
+    {'level': ['ERROR']},
+    {'regex': {'pattern': 'x'}},
+    {'contains': 3},
+    {'exclude': 5},
+    {'exclude': ['ok', 1]},
+])
+def test_from_params_rejects_non_string_values(params):
+    with pytest.raises(ValueError):
+        LogFilter.from_params(params)
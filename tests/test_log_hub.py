@@ -0,0 +1,184 @@
+import os
+
+import pytest
+from flask import Flask
+
+from app.utils.inotify import FileNotifier
+from app.utils.log_filter import LogFilter
+from app.utils.log_hub import LogHub, LogWatcher, SubscriberQueue, parse_interval, parse_max_lines
+from app.utils.log_monitor import LogCursor
+from app.utils.log_sources import LogSource
+
+
+@pytest.fixture
+def app_context():
+    app = Flask(__name__)
+    app.config['LOG_MONITOR_INOTIFY'] = False
+    with app.app_context():
+        yield
+
+
+def make_watcher(log_file, max_delta_bytes=1024):
+    source = LogSource('app', str(log_file))
+    cursor = LogCursor(str(log_file), max_lines=5, max_delta_bytes=max_delta_bytes)
+    watcher = LogWatcher(None, source, cursor, 5, FileNotifier(str(log_file), False))
+    cursor.snapshot()
+    return watcher
+
+
+def error_lines(start, count):
+    return ''.join(f'ERROR request {i} failed\n' for i in range(start, start + count)).encode()
+
+
+def errors(watcher):
+    return watcher.metrics.summary()['levels']['ERROR']
+
+
+def test_overflow_counts_skipped_lines(tmp_path, app_context):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'INFO start\n')
+    watcher = make_watcher(log_file)
+
+    with open(log_file, 'ab') as f:
+        f.write(error_lines(0, 200))
+    watcher._check()
+
+    summary = watcher.metrics.summary()
+    assert summary['levels']['ERROR'] == 200
+    assert not summary['incomplete']
+
+
+def test_rotation_counts_lines_in_old_file(tmp_path, app_context):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'INFO start\n')
+    watcher = make_watcher(log_file)
+
+    with open(log_file, 'ab') as f:
+        f.write(error_lines(0, 3))
+    os.rename(log_file, tmp_path / 'app.log.1')
+    log_file.write_bytes(error_lines(3, 2))
+    watcher._check()
+
+    assert errors(watcher) == 5
+    assert not watcher.metrics.summary()['incomplete']
+
+
+def test_truncation_marks_minute_incomplete(tmp_path, app_context):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'INFO start\n' * 10)
+    watcher = make_watcher(log_file)
+
+    log_file.write_bytes(error_lines(0, 2))
+    watcher._check()
+
+    summary = watcher.metrics.summary()
+    assert summary['levels']['ERROR'] == 2
+    assert summary['incomplete']
+    assert summary['series'][-1]['incomplete']
+
+
+def test_wait_for_releases_watcher(tmp_path, app_context):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'INFO start\n')
+    hub = LogHub()
+    source = LogSource('app', str(log_file))
+
+    assert hub.wait_for(source, 0, None, 0) is True
+    assert hub.wait_for(source, 100, os.stat(log_file).st_ino, 0.01) is False
+    assert hub.watchers == {}
+
+
+def test_watcher_stops_after_last_subscriber(tmp_path, app_context):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'INFO start\n')
+    hub = LogHub()
+    source = LogSource('app', str(log_file))
+
+    watcher, _ = hub.subscribe(source, 'a', 'sse', queue=SubscriberQueue())
+    hub.subscribe(source, 'b', 'sse', queue=SubscriberQueue())
+    hub.unsubscribe('a')
+    assert hub.watchers == {'app': watcher}
+    hub.unsubscribe('b')
+    assert hub.watchers == {}
+    assert watcher.stop_event.is_set()
+
+
+def test_watch_lease_expires(tmp_path, app_context):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'INFO start\n')
+    hub = LogHub()
+    source = LogSource('app', str(log_file))
+
+    watcher = hub.watch(source, lease=60)
+    hub.wait_for(source, 100, None, 0)
+    assert hub.watchers == {'app': watcher}
+
+    watcher.lease_until = 0
+    watcher.on_idle(watcher)
+    assert hub.watchers == {}
+
+
+@pytest.mark.parametrize('value, expected', [(None, None), ('', None), ('5', 5), (2.5, 2.5), ('0.0001', 1), (3600, 60)])
+def test_parse_interval(app_context, value, expected):
+    assert parse_interval(value) == expected
+
+
+@pytest.mark.parametrize('value', ['-1', 0, 'abc', [5], True, 'nan'])
+def test_parse_interval_rejects(app_context, value):
+    with pytest.raises(ValueError):
+        parse_interval(value)
+
+
+@pytest.mark.parametrize('value, expected', [(None, None), (100, 100), ('5', 5), (0, 0)])
+def test_parse_max_lines(value, expected):
+    assert parse_max_lines(value) == expected
+
+
+@pytest.mark.parametrize('value', ['-1', 'abc', 2.5, True, [5]])
+def test_parse_max_lines_rejects(value):
+    with pytest.raises(ValueError):
+        parse_max_lines(value)
+
+
+def test_errors_reach_filtered_rooms(tmp_path, app_context):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'INFO start\n')
+    emitted = []
+
+    class SocketIO:
+        def emit(self, event, data, namespace=None, to=None, callback=None):
+            emitted.append((event, to))
+
+    watcher = make_watcher(log_file)
+    watcher.socketio = SocketIO()
+    watcher.subscribers['sid'] = {'kind': 'socket', 'queue': None, 'interval': None,
+                                  'filter': LogFilter.from_params({'level': 'ERROR'})}
+    watcher._emit_error(OSError('boom'))
+
+    assert sorted(emitted) == [('log_error', 'log:app'), ('log_error', 'log:app:' + watcher.subscribers['sid']['filter'].key)]
+
+
+def test_dead_watcher_is_replaced(tmp_path, app_context):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'INFO start\n')
+    hub = LogHub()
+    source = LogSource('app', str(log_file))
+    queue = SubscriberQueue()
+    watcher, _ = hub.subscribe(source, 'a', 'sse', queue=queue)
+    queue.get(0)
+
+    def crash(timeout):
+        raise ValueError('timeout must be non-negative')
+    watcher.notifier.wait = crash
+    watcher.notifier.wake()
+    watcher.thread.join(5)
+    assert not watcher.running
+
+    replaced, _ = hub.subscribe(source, 'b', 'sse', queue=SubscriberQueue())
+    assert replaced is not watcher and replaced.running
+    assert hub.watchers == {'app': replaced}
+    assert set(replaced.subscribers) == {'a', 'b'}
+    assert queue.get(0)['reason'] == 'restarted'
+    hub.unsubscribe('a')
+    hub.unsubscribe('b')
+    assert hub.watchers == {}
@@ -0,0 +1,36 @@
+from app.utils.log_index import LogLineIndex
+
+
+def test_index_counts_lines(tmp_path):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b''.join(f'line {i}\n'.encode() for i in range(25)))
+    index = LogLineIndex(str(log_file), None, every=10)
+
+    assert index.update() == 25
+    assert index.read_range(12, 2)['content'] == 'line 12\nline 13\n'
+
+
+def test_line_longer_than_chunk(tmp_path):
+    long_line = b'x' * (2 * LogLineIndex.CHUNK_SIZE) + b'\n'
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'short\n' + long_line + b'a\nb\n')
+    index = LogLineIndex(str(log_file), None, every=1)
+
+    assert index.update() == 4
+    result = index.read_range(2, 2)
+    assert result['total_lines'] == 4
+    assert result['content'] == 'a\nb\n'
+    assert index.read_range(1, 1)['content'] == long_line.decode()
+
+
+def test_unfinished_long_line(tmp_path):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'short\n' + b'x' * (2 * LogLineIndex.CHUNK_SIZE))
+    index = LogLineIndex(str(log_file), None, every=1)
+
+    assert index.update() == 1
+    assert index.indexed_to == len(b'short\n')
+    with open(log_file, 'ab') as f:
+        f.write(b'x\nnext\n')
+    assert index.update() == 3
+    assert index.read_range(-1, 1)['content'] == 'next\n'
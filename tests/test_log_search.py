@@ -0,0 +1,36 @@
+from app.utils import log_search
+from app.utils.log_search import LogSearch, SearchQuery
+
+
+def write_log(path, count):
+    data = b''.join(f'line {i} {"ERROR" if i % 7 == 0 else "INFO"}\n'.encode() for i in range(count))
+    path.write_bytes(data + b'tail ERROR')
+    return data
+
+
+def test_live_file_matches_mmap_scan(tmp_path, monkeypatch):
+    log_file = tmp_path / 'app.log'
+    write_log(log_file, 500)
+    monkeypatch.setattr(log_search, 'READ_CHUNK', 100)
+    query = SearchQuery('ERROR')
+
+    live = list(LogSearch.scan_live_file(str(log_file), query, 2, 2))
+    mapped = list(LogSearch.scan_file(str(log_file), query, 2, 2))
+
+    assert live == mapped
+    assert live[-1]['content'] == 'tail ERROR'
+
+
+def test_live_file_truncated_during_scan(tmp_path, monkeypatch):
+    log_file = tmp_path / 'app.log'
+    write_log(log_file, 500)
+    monkeypatch.setattr(log_search, 'READ_CHUNK', 100)
+
+    hits = LogSearch.scan_live_file(str(log_file), SearchQuery('ERROR'))
+    first = next(hits)
+    # copytruncate
+    log_file.write_bytes(b'')
+    rest = list(hits)
+
+    assert first['line'] == 0
+    assert len(rest) < 500 // 7
@@ -0,0 +1,36 @@
+import os
+from datetime import datetime
+
+from app.utils.log_window import FileView, LogWindow, TimestampParser
+
+
+def test_file_view_find_across_windows(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileView, 'WINDOW_SIZE', 16)
+    log_file = tmp_path / 'app.log'
+    data = b'a' * 100 + b'needle' + b'b' * 100
+    log_file.write_bytes(data)
+    with open(log_file, 'rb') as f:
+        view = FileView(f.fileno(), len(data))
+        assert view.find(b'needle') == 100
+        assert view.find(b'needle', 101) == -1
+        assert view[98:108] == data[98:108]
+
+
+def test_file_view_truncated(tmp_path):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b'x' * 1000 + b'\n')
+    with open(log_file, 'rb') as f:
+        view = FileView(f.fileno(), 1001)
+        os.truncate(log_file, 0)
+        assert view.find(b'\n') == -1
+        assert view[0:10] == b''
+
+
+def test_window_read(tmp_path):
+    log_file = tmp_path / 'app.log'
+    log_file.write_bytes(b''.join(f'2024-01-01 00:{minute:02d}:00 line {minute}\n'.encode() for minute in range(60)))
+    window = LogWindow(str(log_file), TimestampParser(['%Y-%m-%d %H:%M:%S']))
+
+    result = window.read(datetime(2024, 1, 1, 0, 10), datetime(2024, 1, 1, 0, 12))
+
+    assert result['content'] == '2024-01-01 00:10:00 line 10\n2024-01-01 00:11:00 line 11\n'